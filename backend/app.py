@@ -1,26 +1,50 @@
 import os
 import json
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, send_from_directory, make_response
+from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, send_from_directory, make_response, session
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from flask_login import LoginManager, UserMixin, login_user, logout_user, current_user, login_required
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
 import io
 import base64
 from datetime import datetime
-import zipfile
 from werkzeug.utils import secure_filename
 from uuid import uuid4
 import tempfile
 import warnings
 import math
+import hashlib
+import shutil
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from contextlib import contextmanager
+import parse_cache
+import survey_stats
+import imputation
+import sketches
+import data_export
+import type_inference
+import excel_reader
+import batch_upload
+import migrations
+import artifact_store
 warnings.filterwarnings('ignore')
 
 app = Flask(__name__, static_folder='static', static_url_path='')
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-here')
-app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# Uploads and everything derived from them (snapshots, spills, reports, artifacts) live under this folder
+app.config['UPLOAD_FOLDER'] = os.environ.get('UPLOAD_FOLDER', 'uploads')
+# Upload size cap (MB); uploads are streamed to disk so this no longer bounds memory. 0 disables the cap.
+app.config['MAX_CONTENT_LENGTH'] = (int(os.environ.get('MAX_UPLOAD_MB', '4096')) * 1024 * 1024) or None
+# Files above this size are summarized with a chunked pass instead of being parsed into memory on upload
+app.config['STREAMING_THRESHOLD_MB'] = int(os.environ.get('STREAMING_THRESHOLD_MB', '64'))
+app.config['CSV_CHUNK_ROWS'] = int(os.environ.get('CSV_CHUNK_ROWS', '100000'))
+app.config['UPLOAD_CHUNK_BYTES'] = 1024 * 1024
 
 # Enhanced CORS configuration for production - UPDATED FOR NETLIFY DEPLOYMENT
 CORS(app, 
@@ -40,13 +64,75 @@ CORS(app,
      ], 
      supports_credentials=True,
      methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
-     allow_headers=['Content-Type', 'Authorization', 'X-Requested-With'],
-     expose_headers=['Access-Control-Allow-Credentials'])
+     allow_headers=['Content-Type', 'Authorization', 'X-Requested-With', 'If-None-Match'],
+     expose_headers=['Access-Control-Allow-Credentials', 'ETag'])
 
 # Database and authentication setup
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///app.db'
+def _database_url(url):
+    # Hosted PostgreSQL often hands out postgres:// URLs, which SQLAlchemy no longer accepts
+    return 'postgresql://' + url[len('postgres://'):] if url.startswith('postgres://') else url
+
+
+app.config['SQLALCHEMY_DATABASE_URI'] = _database_url(os.environ.get('DATABASE_URL', 'sqlite:///app.db'))
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# SQLite: write-ahead log so readers never block the writer, and how long a writer waits for the lock (ms)
+app.config['SQLITE_WAL'] = os.environ.get('SQLITE_WAL', '1').lower() in ('1', 'true', 'yes')
+app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '30000'))
+# Connection pool for server databases (PostgreSQL etc.); SQLite keeps SQLAlchemy's defaults
+if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', '5')),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', '10')),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', '30')),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', '1800')),
+        'pool_pre_ping': True,
+    }
 app.config['AVATAR_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], 'avatars')
+# Per-dataset processor registry: bounded in-memory LRU, evicted entries spill to disk
+app.config['PROCESSOR_CACHE_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], 'processor_cache')
+app.config['PROCESSOR_CACHE_SIZE'] = int(os.environ.get('PROCESSOR_CACHE_SIZE', '8'))
+app.config['PROCESSOR_CACHE_MB'] = int(os.environ.get('PROCESSOR_CACHE_MB', '512'))
+# Background jobs: worker processes (0 runs jobs on a thread in the web process) and result files
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', '2'))
+app.config['JOB_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], 'jobs')
+# Memoized /clean pipeline step outputs kept per dataset
+app.config['PIPELINE_CACHE_STEPS'] = int(os.environ.get('PIPELINE_CACHE_STEPS', '12'))
+# KNN imputation: sklearn's exact KNNImputer up to this many rows, approximate search above it
+app.config['KNN_EXACT_MAX_ROWS'] = int(os.environ.get('KNN_EXACT_MAX_ROWS', '20000'))
+app.config['KNN_CHUNK_ROWS'] = int(os.environ.get('KNN_CHUNK_ROWS', '4096'))
+app.config['KNN_WORKERS'] = int(os.environ.get('KNN_WORKERS', str(min(4, os.cpu_count() or 1))))
+app.config['KNN_MAX_DONORS'] = int(os.environ.get('KNN_MAX_DONORS', '50000'))
+# Multivariate Isolation Forest: fit-sample size, cores used (-1 = all) and models cached per dataset
+app.config['ISOLATION_FOREST_FIT_ROWS'] = int(os.environ.get('ISOLATION_FOREST_FIT_ROWS', '100000'))
+app.config['ISOLATION_FOREST_JOBS'] = int(os.environ.get('ISOLATION_FOREST_JOBS', '-1'))
+app.config['ISOLATION_FOREST_CACHE_SIZE'] = int(os.environ.get('ISOLATION_FOREST_CACHE_SIZE', '4'))
+# /clean plots: 'data' returns aggregates the frontend draws, 'html' returns server-rendered Plotly HTML
+app.config['PLOT_MODE'] = os.environ.get('PLOT_MODE', 'data')
+# Rendered /report files, keyed by dataset and report fingerprint (the fingerprint doubles as the ETag)
+app.config['REPORT_CACHE_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], 'reports')
+app.config['REPORT_CACHE_SIZE'] = int(os.environ.get('REPORT_CACHE_SIZE', '32'))
+# Estimate rows per PDF table block (long tables are split into blocks rather than one huge table)
+app.config['REPORT_TABLE_ROWS'] = int(os.environ.get('REPORT_TABLE_ROWS', '200'))
+# /download_data encodes and streams the cleaned data this many rows at a time
+app.config['EXPORT_CHUNK_ROWS'] = int(os.environ.get('EXPORT_CHUNK_ROWS', '50000'))
+# Downcast numeric columns and store repetitive text as categoricals when loading data
+app.config['OPTIMIZE_DTYPES'] = os.environ.get('OPTIMIZE_DTYPES', '').lower() in ('1', 'true', 'yes')
+# /upload_batch: worker processes parsing files in parallel (0 parses in the web process) and ZIP limits
+app.config['BATCH_WORKERS'] = int(os.environ.get('BATCH_WORKERS', str(min(4, os.cpu_count() or 1))))
+app.config['BATCH_MAX_FILES'] = int(os.environ.get('BATCH_MAX_FILES', '200'))
+app.config['BATCH_MAX_UNCOMPRESSED_MB'] = int(os.environ.get('BATCH_MAX_UNCOMPRESSED_MB', '4096'))
+app.config['BATCH_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], 'batches')
+# Compressed, content-addressed run artifacts (estimates, logs, plots) referenced from processing_run rows
+app.config['ARTIFACT_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], 'artifacts')
+# Admin dashboard: page sizes for users and for uploads/runs, largest page a client may ask for, count cache (s)
+app.config['ADMIN_PAGE_SIZE'] = int(os.environ.get('ADMIN_PAGE_SIZE', '50'))
+app.config['ADMIN_RECENT_SIZE'] = int(os.environ.get('ADMIN_RECENT_SIZE', '10'))
+app.config['ADMIN_MAX_PAGE_SIZE'] = int(os.environ.get('ADMIN_MAX_PAGE_SIZE', '200'))
+app.config['ADMIN_COUNTS_TTL'] = int(os.environ.get('ADMIN_COUNTS_TTL', '60'))
+# Uploads identical to a stored file reuse it and its parse snapshot: 'user' (the signed-in uploader's files), 'global' or 'off'
+app.config['UPLOAD_DEDUP'] = os.environ.get('UPLOAD_DEDUP', 'user').lower()
+# Columnar snapshots of parsed uploads, stored next to the uploaded file
+app.config['PARSE_CACHE_ENABLED'] = os.environ.get('DISABLE_PARSE_CACHE', '').lower() not in ('1', 'true', 'yes')
 db = SQLAlchemy(app)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
@@ -54,6 +140,12 @@ login_manager.login_view = 'login'
 # Ensure upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['AVATAR_FOLDER'], exist_ok=True)
+os.makedirs(app.config['PROCESSOR_CACHE_FOLDER'], exist_ok=True)
+os.makedirs(app.config['JOB_FOLDER'], exist_ok=True)
+os.makedirs(app.config['REPORT_CACHE_FOLDER'], exist_ok=True)
+os.makedirs(app.config['BATCH_FOLDER'], exist_ok=True)
+os.makedirs(app.config['ARTIFACT_FOLDER'], exist_ok=True)
+run_artifacts = artifact_store.ArtifactStore(app.config['ARTIFACT_FOLDER'])
 
 # Lightweight health endpoint for Render
 @app.route('/healthz')
@@ -101,7 +193,7 @@ def deployment_status():
 @app.route('/<path:path>')
 def serve(path):
     # Skip API routes
-    if path in ['login', 'register', 'logout', 'me', 'upload', 'clean', 'report', 'download_data', 'admin', 'profile', 'avatars', 'healthz', 'test', 'deploy-test', 'deployment-status']:
+    if path in ['login', 'register', 'logout', 'me', 'upload', 'clean', 'report', 'download_data', 'admin', 'profile', 'avatars', 'healthz', 'test', 'deploy-test', 'deployment-status', 'jobs']:
         return jsonify({"message": "ASDP API ready. Use the React frontend."}), 404
     
     # Serve static files
@@ -117,8 +209,8 @@ class User(UserMixin, db.Model):
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True)
     password_hash = db.Column(db.String(255), nullable=False)
-    role = db.Column(db.String(20), default='user')  # 'admin' or 'user'
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    role = db.Column(db.String(20), default='user', index=True)  # 'admin' or 'user'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     profile_image = db.Column(db.String(512))  # relative path like /avatars/filename.png
 
     def set_password(self, password: str):
@@ -134,41 +226,119 @@ class Dataset(db.Model):
     filepath = db.Column(db.String(1024), nullable=False)
     rows = db.Column(db.Integer)
     columns = db.Column(db.Integer)
-    uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
-    owner_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    uploaded_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
     owner = db.relationship('User', backref='datasets')
+    # Excel sheet/header_row chosen at upload, reused whenever the file is reloaded
+    read_options = db.Column(db.JSON)
+    # SHA-256 of the stored file; datasets with the same contents share one filepath
+    content_hash = db.Column(db.String(64), index=True)
 
 
 class ProcessingRun(db.Model):
+    """One /clean run; its outputs live in the artifact store and ``artifacts`` points to them"""
+    ARTIFACTS = ('config', 'cleaning_log', 'estimates', 'domain_estimates', 'plots')
+
     id = db.Column(db.Integer, primary_key=True)
-    dataset_id = db.Column(db.Integer, db.ForeignKey('dataset.id'))
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    dataset_id = db.Column(db.Integer, db.ForeignKey('dataset.id'), index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
+    # Inline JSON of runs recorded before the artifact store (see `flask offload-runs`); empty for new runs
     config = db.Column(db.JSON)
     cleaning_log = db.Column(db.JSON)
     estimates = db.Column(db.JSON)
+    # {name: {'digest', 'bytes', 'stored'}} for each artifact in ARTIFACTS
+    artifacts = db.Column(db.JSON)
     plots_count = db.Column(db.Integer)
     success = db.Column(db.Boolean, default=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
     dataset = db.relationship('Dataset')
     user = db.relationship('User')
 
+    def store_artifacts(self, values):
+        """Write ``{name: value}`` to the artifact store and point this run at them"""
+        index = dict(self.artifacts or {})
+        for name, value in values.items():
+            index[name] = run_artifacts.put(value)
+        self.artifacts = index
+
+    def artifact(self, name):
+        """Stored value of artifact ``name`` (inline legacy columns are read as a fallback); KeyError if absent"""
+        entry = (self.artifacts or {}).get(name)
+        if entry is not None:
+            return run_artifacts.get(entry['digest'])
+        if name in ('config', 'cleaning_log', 'estimates') and getattr(self, name) is not None:
+            return getattr(self, name)
+        raise KeyError(name)
+
+    def to_dict(self):
+        index = self.artifacts or {}
+        legacy = [name for name in ('config', 'cleaning_log', 'estimates') if name not in index and getattr(self, name) is not None]
+        return {
+            'id': self.id,
+            'dataset_id': self.dataset_id,
+            'user_id': self.user_id,
+            'success': self.success,
+            'plots_count': self.plots_count,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'artifacts': {
+                name: {
+                    'bytes': (index[name]['bytes'] if name in index else None),
+                    'url': f"/runs/{self.id}/artifacts/{name}"
+                }
+                for name in self.ARTIFACTS if name in index or name in legacy
+            }
+        }
+
 
 class ReportRecord(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    dataset_id = db.Column(db.Integer, db.ForeignKey('dataset.id'))
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    dataset_id = db.Column(db.Integer, db.ForeignKey('dataset.id'), index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
     format = db.Column(db.String(10))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
     dataset = db.relationship('Dataset')
     user = db.relationship('User')
 
 
+class Job(db.Model):
+    """Background /clean or /report job, polled through /jobs/<id>"""
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # 'clean' or 'report'
+    dataset_id = db.Column(db.Integer, db.ForeignKey('dataset.id'), index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
+    status = db.Column(db.String(20), default='queued', index=True)  # queued, running, succeeded, failed
+    config = db.Column(db.JSON)
+    progress = db.Column(db.JSON)  # [{'step': ..., 'status': pending/running/done, 'cached': bool}]
+    error = db.Column(db.Text)
+    result_path = db.Column(db.String(1024))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        steps = self.progress or []
+        done = sum(1 for step in steps if step.get('status') == 'done')
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'dataset_id': self.dataset_id,
+            'status': self.status,
+            'progress': steps,
+            'percent': (100 if self.status == 'succeeded' else int(100 * done / len(steps)) if steps else 0),
+            'error': self.error,
+            'result_url': (f"/jobs/{self.id}/result" if self.status == 'succeeded' else None),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
 @login_manager.user_loader
 def load_user(user_id):
     try:
-        return User.query.get(int(user_id))
+        return db.session.get(User, int(user_id))
     except Exception:
         return None
 
@@ -184,37 +354,148 @@ def admin_required(view_func):
     return wrapped
 
 
+def _configure_sqlite(dbapi_connection, connection_record):
+    """Per-connection SQLite settings (gthread workers write from several threads at once)"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {int(app.config['SQLITE_BUSY_TIMEOUT_MS'])}")
+        if app.config['SQLITE_WAL']:
+            cursor.execute("PRAGMA journal_mode = WAL")
+            # Durable at every checkpoint; commits no longer wait for an fsync of the main file
+            cursor.execute("PRAGMA synchronous = NORMAL")
+    finally:
+        cursor.close()
+
+
 with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        from sqlalchemy import event
+        event.listen(db.engine, 'connect', _configure_sqlite)
     db.create_all()
-    # Ensure avatar column exists when migrating from older DB
-    try:
-        result = db.session.execute(db.text("PRAGMA table_info(user)"))
-        cols = [row[1] for row in result]
-        if 'profile_image' not in cols:
-            db.session.execute(db.text("ALTER TABLE user ADD COLUMN profile_image TEXT"))
-            db.session.commit()
-    except Exception:
-        db.session.rollback()
+    # Bring databases created by older releases up to the current schema
+    migrations.upgrade(db.engine)
     # Seed default admin if none exists
     if not User.query.filter_by(role='admin').first():
         default_admin = User(username='admin', email=None, role='admin')
         default_admin.set_password('admin123')
         db.session.add(default_admin)
-        db.session.commit()
-        print('[INIT] Created default admin user: admin / admin123')
+        try:
+            db.session.commit()
+            print('[INIT] Created default admin user: admin / admin123')
+        except IntegrityError:
+            # Another worker starting at the same time created it first
+            db.session.rollback()
+
+class PipelineStepError(Exception):
+    """A cleaning pipeline step failed; ``step`` names the step"""
+
+    def __init__(self, step, error):
+        super().__init__(str(error))
+        self.step = step
+
+
+class OutlierReport(Mapping):
+    """Per-column outlier flags from DataProcessor.detect_outliers
+
+    Flags are kept as one bitmap (8 rows per byte, packed per column) rather
+    than as lists of row labels. ``report[column]`` gives the count and
+    percentage; ``mask(column)`` and ``indices(column)`` expand the flags only
+    when asked for.
+    """
+
+    def __init__(self, mask, columns, index):
+        import numpy as np  # Lazy import
+        mask = np.asarray(mask, dtype=bool).reshape(len(index), len(columns))
+        self.columns = list(columns)
+        self.index = index
+        self.n_rows = int(mask.shape[0])
+        self.counts = mask.sum(axis=0)
+        self.bits = np.packbits(mask.T, axis=1)
+        self._positions = {column: i for i, column in enumerate(self.columns)}
+
+    def __getitem__(self, column):
+        i = self._positions[column]
+        count = int(self.counts[i])
+        return {
+            'count': count,
+            'percentage': (count / self.n_rows) * 100 if self.n_rows else 0.0
+        }
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __len__(self):
+        return len(self.columns)
+
+    def mask(self, column):
+        """Boolean row mask of the outliers in ``column``"""
+        import numpy as np  # Lazy import
+        return np.unpackbits(self.bits[self._positions[column]], count=self.n_rows).astype(bool)
+
+    def indices(self, column):
+        """Row labels of the outliers in ``column``"""
+        return self.index[self.mask(column)].tolist()
+
 
 class DataProcessor:
+    # Bump when the PDF/HTML report layout changes so cached report files are not served
+    REPORT_TEMPLATE_VERSION = 1
+
     def __init__(self):
         self.data = None
         self.cleaned_data = None
         self.weights = None
         self.cleaning_log = []
         self.estimates = {}
+        self.domain_estimates = None
+        # Pristine frame the cleaning pipeline always starts from, plus its cache key
+        self.source_data = None
+        self.source_key = None
+        self.source_log = []
+        self._step_cache = OrderedDict()
+        # Fitted multivariate Isolation Forests, keyed by data fingerprint and settings
+        self._models = OrderedDict()
+        # Streaming summaries (histograms, quantiles, correlations) of the loaded data
+        self.sketch = None
+        # Plots from the last pipeline run (reused by reports)
+        self.plots = None
+        # Step keys of the last completed run_pipeline, hashed (None before a run)
+        self.pipeline_key = None
+        # Id of the published pipeline state this processor reflects (see ProcessorRegistry.publish)
+        self.state_id = None
         
-    def load_data(self, file_path):
-        """Load data from CSV or Excel file"""
+    def load_data(self, file_path, use_cache=True, optimize=None, read_options=None, content_hash=None):
+        """Load data from CSV or Excel file
+
+        The first successful parse is stored as a columnar snapshot keyed by the
+        file's content hash and parser options; later loads read that instead.
+        ``optimize`` (default OPTIMIZE_DTYPES) runs optimize_memory on the parse.
+        ``read_options`` selects the Excel ``sheet`` (name or 0-based index) and
+        ``header_row`` (0-based). ``content_hash`` is the file's SHA-256 when the
+        caller already knows it, which saves hashing the file again.
+        """
+        if optimize is None:
+            optimize = app.config.get('OPTIMIZE_DTYPES', False)
         try:
             import pandas as pd  # Lazy import
+            cache_key = None
+            if use_cache and app.config.get('PARSE_CACHE_ENABLED', True):
+                try:
+                    cache_key = parse_cache.cache_key(
+                        content_hash or parse_cache.file_digest(file_path),
+                        self._parse_options(file_path, optimize, read_options)
+                    )
+                    cached = parse_cache.load_snapshot(file_path, cache_key)
+                except Exception:
+                    cached = None
+                if cached is not None:
+                    self.data, parse_log = cached
+                    self.cleaning_log.extend(parse_log)
+                    self.cleaning_log.append(f"Data loaded successfully: {len(self.data)} rows, {len(self.data.columns)} columns")
+                    self._set_source(cache_key)
+                    return True
+
+            parse_log = []
             if file_path.endswith('.csv'):
                 # Try fast path first, then fallbacks for tricky files
                 try:
@@ -233,44 +514,253 @@ class DataProcessor:
                             on_bad_lines='skip'
                         )
             elif file_path.endswith(('.xlsx', '.xls')):
+                options = excel_reader.normalize_options(
+                    **{name: value for name, value in (read_options or {}).items() if name != 'categories'}
+                )
                 try:
-                    self.data = pd.read_excel(file_path)
+                    self.data = excel_reader.read_excel(file_path, **options)
                 except ImportError as ie:
                     raise ImportError("Excel reading requires openpyxl. Install with: pip install openpyxl") from ie
+                parse_log.append(
+                    f"Read Excel sheet {options['sheet']!r} (header row {options['header_row']}) "
+                    f"with {excel_reader.engine_for(file_path) or 'the default engine'}"
+                )
             else:
                 raise ValueError("Unsupported file format")
+
+            # Columns recorded as categoricals (e.g. a batch's source_file) get their categories back
+            for col, values in ((read_options or {}).get('categories') or {}).items():
+                if col in self.data.columns:
+                    self.data[col] = pd.Categorical(self.data[col], categories=values)
             
-            # Attempt to coerce numeric-like object columns (e.g., values with commas or currency symbols)
+            # Attempt to coerce numeric-like text columns (e.g., values with commas or currency symbols);
+            # each column is screened on a sample first so plain text is never parsed in full
             try:
-                object_columns = self.data.select_dtypes(include=['object']).columns
-                converted_columns = []
-                for col in object_columns:
-                    original_series = self.data[col]
-                    # Remove common thousands separators and currency symbols then coerce
-                    cleaned = (
-                        original_series.astype(str)
-                        .str.replace(r"[\s,₹$]", "", regex=True)
-                        .str.replace(r"[^0-9eE+\-.]", "", regex=True)
-                    )
-                    numeric_series = pd.to_numeric(cleaned, errors='coerce')
-                    # If majority became numeric, accept conversion
-                    if numeric_series.notna().mean() >= 0.8:
-                        self.data[col] = numeric_series
-                        converted_columns.append(col)
+                converted_columns = type_inference.coerce_numeric_columns(
+                    self.data, threshold=type_inference.NUMERIC_THRESHOLD
+                )
                 if converted_columns:
-                    self.cleaning_log.append(
+                    parse_log.append(
                         f"Auto-converted numeric-like columns: {', '.join(converted_columns)}"
                     )
             except Exception:
                 # Non-fatal; proceed without coercion
                 pass
 
-            self.cleaning_log.append(f"Data loaded successfully: {len(self.data)} rows, {len(self.data.columns)} columns")
+            self._finish_load(file_path, parse_log, cache_key, optimize)
             return True
         except Exception as e:
             self.cleaning_log.append(f"Error loading data: {str(e)}")
             return False
+
+    def load_frame(self, frame, file_path, parse_log=None, optimize=None, read_options=None):
+        """Adopt an already parsed ``frame`` as if load_data had just read it from ``file_path``
+
+        Used for combined batch uploads, where ``file_path`` holds the frame as
+        CSV and ``read_options`` the load_data options that reproduce its
+        categoricals. The snapshot is stored under that file's cache key, so a
+        later load_data of the file skips the parse. Frames with date or time
+        columns are not snapshotted: a CSV reparse reads those back as text.
+        """
+        import pandas as pd  # Lazy import
+        if optimize is None:
+            optimize = app.config.get('OPTIMIZE_DTYPES', False)
+        self.data = frame
+        cache_key = None
+        reproducible = not any(
+            pd.api.types.is_datetime64_any_dtype(dtype) or pd.api.types.is_timedelta64_dtype(dtype)
+            for dtype in frame.dtypes
+        )
+        if reproducible and app.config.get('PARSE_CACHE_ENABLED', True):
+            try:
+                cache_key = parse_cache.cache_key(
+                    parse_cache.file_digest(file_path), self._parse_options(file_path, optimize, read_options)
+                )
+            except Exception:
+                cache_key = None
+        self._finish_load(file_path, list(parse_log or []), cache_key, optimize)
+        return True
+
+    def _finish_load(self, file_path, parse_log, cache_key, optimize):
+        if optimize:
+            self.optimize_memory(log=parse_log)
+
+        if cache_key is not None:
+            # Non-fatal if the snapshot cannot be written (e.g. read-only upload folder)
+            parse_cache.save_snapshot(self.data, file_path, cache_key, log=parse_log)
+
+        self.cleaning_log.extend(parse_log)
+        self.cleaning_log.append(f"Data loaded successfully: {len(self.data)} rows, {len(self.data.columns)} columns")
+        self._set_source(cache_key)
+
+    def summarize_file(self, file_path, chunksize=None):
+        """Compute the upload summary of a CSV in one bounded-memory pass over row chunks
+
+        Returns the same shape as the /upload summary (rows, columns, column_names,
+        data_types, missing_values, plots) without keeping the full dataset in memory.
+        Object columns are judged with the same numeric coercion rule as load_data, and
+        the plot aggregates are built from a sketch updated chunk by chunk. Types
+        are reported as parsed, before any OPTIMIZE_DTYPES downcasting.
+        """
+        import numpy as np  # Lazy import
+        import pandas as pd  # Lazy import
+        chunksize = chunksize or app.config.get('CSV_CHUNK_ROWS', 100000)
+        variants = [
+            {},
+            {'engine': 'python', 'sep': None},
+            {'engine': 'python', 'sep': None, 'encoding': 'latin1', 'on_bad_lines': 'skip'},
+        ]
+        last_error = None
+        for options in variants:
+            try:
+                rows = 0
+                column_names = None
+                dtypes = {}
+                null_counts = {}
+                coerced_valid = {}
+                sketch = None
+                for chunk in pd.read_csv(file_path, chunksize=chunksize, **options):
+                    if column_names is None:
+                        column_names = chunk.columns.tolist()
+                    rows += len(chunk)
+                    nulls = chunk.isnull().sum()
+                    numeric_values = {}
+                    for col in column_names:
+                        null_counts[col] = null_counts.get(col, 0) + int(nulls[col])
+                        series = chunk[col]
+                        # Promote dtypes across chunks the way a single read would
+                        previous = dtypes.get(col)
+                        if previous is None or previous == series.dtype:
+                            dtypes[col] = series.dtype
+                        elif pd.api.types.is_numeric_dtype(previous) and pd.api.types.is_numeric_dtype(series.dtype):
+                            dtypes[col] = np.result_type(previous, series.dtype)
+                        elif pd.api.types.is_numeric_dtype(previous):
+                            # Text anywhere in the column makes the whole column text
+                            dtypes[col] = series.dtype
+                        # Count values that would survive load_data's numeric coercion
+                        if pd.api.types.is_numeric_dtype(series.dtype):
+                            numeric = series
+                        else:
+                            numeric = type_inference.parse_numeric(series)
+                        valid = int(numeric.notna().sum())
+                        coerced_valid[col] = coerced_valid.get(col, 0) + valid
+                        numeric_values[col] = numeric
+                    if sketch is None:
+                        # Plot columns: the first few that look numeric in the first chunk
+                        candidates = [
+                            col for col in column_names
+                            if pd.api.types.is_numeric_dtype(chunk[col].dtype)
+                            or numeric_values[col].notna().sum() >= type_inference.NUMERIC_THRESHOLD * max(1, chunk[col].notna().sum())
+                        ][:sketches.PLOT_COLUMNS]
+                        sketch = sketches.FrameSketch(column_names, candidates)
+                    block = np.column_stack(
+                        [numeric_values[col].to_numpy(dtype='float64', na_value=np.nan) for col in sketch.numeric_columns]
+                    ) if sketch.numeric_columns else np.zeros((len(chunk), 0))
+                    sketch.update(chunk, numeric_values=block)
+                break
+            except Exception as e:
+                last_error = e
+                continue
+        else:
+            raise ValueError(f"Failed to read CSV: {last_error}")
+
+        column_names = column_names or []
+        data_types = {}
+        missing_counts = {}
+        numeric_columns = set()
+        for col in column_names:
+            dtype = dtypes.get(col)
+            missing = null_counts.get(col, 0)
+            if rows and dtype is not None and not pd.api.types.is_numeric_dtype(dtype):
+                if coerced_valid[col] / rows >= type_inference.NUMERIC_THRESHOLD:
+                    dtype = np.dtype('float64')
+                    missing = rows - coerced_valid[col]
+            data_types[col] = str(dtype)
+            missing_counts[col] = missing
+            if dtype is not None and pd.api.types.is_numeric_dtype(dtype):
+                numeric_columns.add(col)
+        missing_values = [
+            {
+                'Column': col,
+                'Missing_Count': int(missing_counts[col]),
+                'Missing_Percentage': float(missing_counts[col] / rows * 100) if rows else 0.0
+            }
+            for col in column_names if missing_counts[col] > 0
+        ]
+        plots = {}
+        if sketch is not None:
+            # Settle the sketch on the final types and missing counts
+            sketch.select([col for col in sketch.numeric_columns if col in numeric_columns])
+            sketch.missing = np.array([missing_counts[col] for col in column_names], dtype='int64')
+            plots = sketch.to_plots()
+        self.cleaning_log.append(f"Scanned {rows} rows, {len(column_names)} columns in chunks of {chunksize}")
+        return {
+            'rows': rows,
+            'columns': len(column_names),
+            'column_names': column_names,
+            'data_types': data_types,
+            'missing_values': missing_values,
+            'plots': plots
+        }
+
+    def _set_source(self, key=None):
+        """Remember the freshly loaded frame as the pipeline's starting point
+
+        The frame is also sketched here, once, over every row; plots of data no
+        cleaning step has changed are drawn from that sketch.
+        """
+        self.source_data = self.data
+        self.source_key = key
+        self.source_log = list(self.cleaning_log)
+        self._step_cache = OrderedDict()
+        self.plots = None
+        self.pipeline_key = None
+        try:
+            self.sketch = sketches.sketch_frame(self.data, chunk_rows=app.config.get('CSV_CHUNK_ROWS', 100000))
+        except Exception:
+            # Non-fatal; plots sketch the data on demand instead
+            self.sketch = None
+
+    def _parse_options(self, file_path, optimize=False, read_options=None):
+        """Parser settings that affect the parsed frame (part of the snapshot cache key)"""
+        extension = os.path.splitext(file_path)[1].lower()
+        read_options = dict(read_options or {})
+        categories = read_options.pop('categories', None)
+        options = {
+            'extension': extension,
+            'numeric_coercion_threshold': type_inference.NUMERIC_THRESHOLD,
+            'numeric_parser': 2,
+            'optimize_dtypes': bool(optimize),
+        }
+        if extension in ('.xlsx', '.xls'):
+            options.update(excel_reader.normalize_options(**read_options))
+        if categories:
+            options['categories'] = {col: list(values) for col, values in categories.items()}
+        return options
+
+    def optimize_memory(self, log=None):
+        """Downcast numbers and turn repetitive text into categoricals (values are unchanged)
+
+        Appends the before/after footprint to ``log`` (the cleaning log by
+        default) and returns the type_inference.optimize_dtypes summary.
+        """
+        log = self.cleaning_log if log is None else log
+        before = type_inference.frame_memory(self.data)
+        changes = type_inference.optimize_dtypes(self.data)
+        after = type_inference.frame_memory(self.data)
+        log.append(
+            f"Optimized memory: {before / 1024 ** 2:.2f} MB -> {after / 1024 ** 2:.2f} MB "
+            f"({len(changes['downcast'])} numeric columns downcast, "
+            f"{len(changes['categorical'])} text columns categorical)"
+        )
+        return changes
     
+    def _is_numeric_column(self, column):
+        """Numeric, non-boolean column of any width (optimize_dtypes may leave int8 or float32)"""
+        import pandas as pd  # Lazy import
+        dtype = self.data[column].dtype
+        return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
     def detect_missing_values(self):
         """Detect and report missing values as a list of dicts (no pandas dependency)."""
         total_rows = len(self.data)
@@ -292,7 +782,11 @@ class DataProcessor:
         if columns is None:
             numeric_columns = self.data.select_dtypes(include=['number']).columns
         else:
-            numeric_columns = [col for col in columns if col in self.data.columns and self.data[col].dtype in ['int64', 'float64']]
+            numeric_columns = [col for col in columns if col in self.data.columns and self._is_numeric_column(col)]
+        # Fills are float64 values; widen downcast float32 columns that will receive them
+        narrow = [col for col in numeric_columns if self.data[col].dtype == 'float32' and self.data[col].isna().any()]
+        if narrow:
+            self.data[narrow] = self.data[narrow].astype('float64')
 
         # Fast path without sklearn for mean/median
         if method in ('mean', 'median'):
@@ -303,95 +797,204 @@ class DataProcessor:
             self.cleaning_log.append(f"Imputed missing values using {method} method for {len(numeric_columns)} columns")
             return
 
-        # KNN requires scikit-learn
-        if method == 'knn':
-            try:
-                from sklearn.impute import KNNImputer  # type: ignore
-            except Exception as import_error:
-                # Fallback to mean imputation if scikit-learn is unavailable
-                self.data[numeric_columns] = self.data[numeric_columns].fillna(self.data[numeric_columns].mean())
-                self.cleaning_log.append("scikit-learn not installed; KNN imputation unavailable. Fell back to mean imputation.")
+        if method in ('knn', 'knn_approx'):
+            exact = method == 'knn' and len(self.data) <= app.config.get('KNN_EXACT_MAX_ROWS', 20000)
+            if exact:
+                try:
+                    from sklearn.impute import KNNImputer  # type: ignore
+                except Exception as import_error:
+                    self.cleaning_log.append("scikit-learn not installed; using approximate KNN imputation.")
+                    exact = False
+            if exact:
+                imputer = KNNImputer(n_neighbors=5)
+                self.data[numeric_columns] = imputer.fit_transform(self.data[numeric_columns])
+                self.cleaning_log.append(f"Imputed missing values using {method} method for {len(numeric_columns)} columns")
                 return
-            imputer = KNNImputer(n_neighbors=5)
-            self.data[numeric_columns] = imputer.fit_transform(self.data[numeric_columns])
-            self.cleaning_log.append(f"Imputed missing values using {method} method for {len(numeric_columns)} columns")
+            # Large files: complete-case donors, chunked nearest-neighbour search
+            import numpy as np  # Lazy import
+            filled, info = imputation.knn_impute(
+                self.data[numeric_columns].to_numpy(dtype=float, na_value=np.nan),
+                n_neighbors=5,
+                chunk_rows=app.config.get('KNN_CHUNK_ROWS', imputation.DEFAULT_CHUNK_ROWS),
+                workers=app.config.get('KNN_WORKERS', 1),
+                max_donors=app.config.get('KNN_MAX_DONORS') or None
+            )
+            self.data[numeric_columns] = filled
+            self.cleaning_log.append(
+                f"Imputed missing values using approximate KNN for {len(numeric_columns)} columns "
+                f"({info['receivers']} rows from {info['donors']} complete-case donors, {info['patterns']} missingness patterns)"
+            )
+            if info['mean_filled']:
+                self.cleaning_log.append(f"{info['mean_filled']} rows had no usable donors or observed values; filled with means")
             return
 
-        raise ValueError("Method must be 'mean', 'median', or 'knn'")
-    
-    def detect_outliers(self, method='iqr', threshold=1.5):
-        """Detect outliers using specified method"""
-        outliers_report = {}
-        numeric_columns = self.data.select_dtypes(include=['number']).columns
-        
-        for column in numeric_columns:
-            if method == 'iqr':
-                Q1 = self.data[column].quantile(0.25)
-                Q3 = self.data[column].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - threshold * IQR
-                upper_bound = Q3 + threshold * IQR
-                outliers = self.data[(self.data[column] < lower_bound) | (self.data[column] > upper_bound)]
-            elif method == 'zscore':
-                # Compute z-scores using pandas to avoid external dependencies and index misalignment
-                series = self.data[column]
-                mean = series.mean()
-                std = series.std(ddof=0)
-                if std == 0 or (std != std):  # handle zero or NaN std
-                    outliers = self.data.iloc[0:0]
-                else:
-                    z_scores = ((series - mean) / std).abs()
-                    outliers = self.data[z_scores > threshold]
-            elif method == 'isolation_forest':
-                try:
-                    from sklearn.ensemble import IsolationForest
-                except Exception as import_error:
-                    # Fallback to IQR if scikit-learn is unavailable
-                    self.cleaning_log.append("scikit-learn not installed; Isolation Forest unavailable. Fell back to IQR method.")
-                    Q1 = self.data[column].quantile(0.25)
-                    Q3 = self.data[column].quantile(0.75)
-                    IQR = Q3 - Q1
-                    lower_bound = Q1 - threshold * IQR
-                    upper_bound = Q3 + threshold * IQR
-                    outliers = self.data[(self.data[column] < lower_bound) | (self.data[column] > upper_bound)]
-                    outliers_report[column] = {
-                        'count': len(outliers),
-                        'percentage': (len(outliers) / len(self.data)) * 100,
-                        'indices': outliers.index.tolist()
-                    }
-                    continue
-                iso_forest = IsolationForest(contamination=0.1, random_state=42)
-                outliers = self.data[iso_forest.fit_predict(self.data[[column]]) == -1]
-            
-            outliers_report[column] = {
-                'count': len(outliers),
-                'percentage': (len(outliers) / len(self.data)) * 100,
-                'indices': outliers.index.tolist()
-            }
-        
-        return outliers_report
+        raise ValueError("Method must be 'mean', 'median', 'knn' or 'knn_approx'")
     
-    def handle_outliers(self, method='winsorize', columns=None, percentile=5):
-        """Handle outliers using specified method"""
+    def detect_outliers(self, method='iqr', threshold=1.5, columns=None):
+        """Detect outliers using specified method
+
+        IQR and z-score bounds are computed for all numeric columns in one pass
+        over a 2-D block (survey_stats.outlier_mask). Returns an OutlierReport;
+        row labels are only built when ``report.indices(column)`` is called.
+        ``isolation_forest_multivariate`` fits one forest across the columns
+        (see fit_isolation_forest) and flags whole rows in every column.
+        """
+        import numpy as np  # Lazy import
         if columns is None:
-            numeric_columns = self.data.select_dtypes(include=['number']).columns
+            numeric_columns = list(self.data.select_dtypes(include=['number']).columns)
         else:
-            numeric_columns = [col for col in columns if col in self.data.columns and self.data[col].dtype in ['int64', 'float64']]
-        
-        for column in numeric_columns:
+            numeric_columns = [col for col in columns if col in self.data.columns and self._is_numeric_column(col)]
+        values = self.data[numeric_columns].to_numpy(dtype='float64', na_value=np.nan)
+
+        if method in ('isolation_forest', 'isolation_forest_multivariate'):
+            try:
+                from sklearn.ensemble import IsolationForest
+            except Exception as import_error:
+                # Fallback to IQR if scikit-learn is unavailable
+                self.cleaning_log.append("scikit-learn not installed; Isolation Forest unavailable. Fell back to IQR method.")
+                method = 'iqr'
+            else:
+                if method == 'isolation_forest_multivariate':
+                    model = self.fit_isolation_forest(numeric_columns)
+                    # The cache key covers the data, so flags for it can be kept with the model
+                    flags = model.get('flags')
+                    if flags is None:
+                        flags = model['flags'] = self.score_outliers(model=model)
+                    self.cleaning_log.append(
+                        f"Isolation Forest flagged {int(flags.sum())} of {len(flags)} rows across {len(numeric_columns)} columns"
+                    )
+                    mask = np.repeat(flags[:, None], len(numeric_columns), axis=1)
+                    return OutlierReport(mask, numeric_columns, self.data.index)
+                mask = np.zeros(values.shape, dtype=bool)
+                for i in range(len(numeric_columns)):
+                    iso_forest = IsolationForest(contamination=0.1, random_state=42)
+                    mask[:, i] = iso_forest.fit_predict(self.data[[numeric_columns[i]]]) == -1
+                return OutlierReport(mask, numeric_columns, self.data.index)
+
+        return OutlierReport(
+            survey_stats.outlier_mask(values, method=method, threshold=threshold),
+            numeric_columns,
+            self.data.index
+        )
+
+    def fit_isolation_forest(self, columns=None, contamination=0.1):
+        """Fit one Isolation Forest across ``columns`` (all numeric by default)
+
+        Inputs larger than ISOLATION_FOREST_FIT_ROWS are fitted on a seeded row
+        sample, and trees are built on ISOLATION_FOREST_JOBS cores. Fitted
+        models are cached per data fingerprint, columns and contamination, so
+        a repeated /clean run on the same data reuses the model. Returns the
+        model entry used by score_outliers.
+        """
+        import numpy as np  # Lazy import
+        import pandas as pd  # Lazy import
+        from sklearn.ensemble import IsolationForest
+
+        if columns is None:
+            columns = self.data.select_dtypes(include=['number']).columns
+        columns = list(columns)
+        frame = self.data[columns]
+        fingerprint = hashlib.sha1(pd.util.hash_pandas_object(frame, index=False).values.tobytes()).hexdigest()
+        key = (fingerprint, tuple(str(col) for col in columns), float(contamination))
+        if key in self._models:
+            self._models.move_to_end(key)
+            return self._models[key]
+
+        values = frame.to_numpy(dtype='float64', na_value=np.nan)
+        # Trees cannot split on NaN: stand in the column medians, here and when scoring
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            fill = np.nanmedian(values, axis=0) if len(values) else np.zeros(len(columns))
+        fill = np.where(np.isnan(fill), 0.0, fill)
+        fit_rows = app.config.get('ISOLATION_FOREST_FIT_ROWS', 100000)
+        if fit_rows and len(values) > fit_rows:
+            sample = np.random.default_rng(42).choice(len(values), size=fit_rows, replace=False)
+            values = values[np.sort(sample)]
+        values = np.where(np.isnan(values), fill, values)
+        model = IsolationForest(
+            contamination=contamination,
+            random_state=42,
+            n_jobs=app.config.get('ISOLATION_FOREST_JOBS', -1)
+        ).fit(values)
+        entry = {'model': model, 'columns': columns, 'fill': fill, 'fit_rows': int(len(values))}
+        self._models[key] = entry
+        while len(self._models) > app.config.get('ISOLATION_FOREST_CACHE_SIZE', 4):
+            self._models.popitem(last=False)
+        return entry
+
+    def score_outliers(self, data=None, model=None):
+        """Flag outlying rows of ``data`` (default: the current data) with a fitted forest
+
+        ``model`` is an entry from fit_isolation_forest; by default the most
+        recently fitted one, so new batches are scored against the model fitted
+        on the survey. Returns a boolean array, one flag per row.
+        """
+        import numpy as np  # Lazy import
+        if model is None:
+            if not self._models:
+                raise ValueError("No Isolation Forest has been fitted for this dataset")
+            model = next(reversed(self._models.values()))
+        frame = self.data if data is None else data
+        missing = [col for col in model['columns'] if col not in frame.columns]
+        if missing:
+            raise ValueError(f"Columns missing from data: {', '.join(map(str, missing))}")
+        values = frame[model['columns']].to_numpy(dtype='float64', na_value=np.nan)
+        chunk = app.config.get('ISOLATION_FOREST_FIT_ROWS', 100000) or len(values)
+        flags = np.zeros(len(values), dtype=bool)
+        for start in range(0, len(values), chunk):
+            block = values[start:start + chunk]
+            block = np.where(np.isnan(block), model['fill'], block)
+            flags[start:start + chunk] = model['model'].predict(block) == -1
+        return flags
+
+    def handle_outliers(self, method='winsorize', columns=None, percentile=5, threshold=1.5):
+        """Handle outliers using specified method
+
+        The bounds of all columns come from one 2-D quantile pass over the data
+        as it was before handling (survey_stats.column_quantiles). ``winsorize``
+        clips only the columns with values beyond the ``percentile`` bounds;
+        ``remove`` drops every row with a value outside a column's IQR fences
+        using one combined mask and one copy, so the result no longer depends
+        on column order. Missing values are never treated as outliers. The
+        number of affected values per column is logged.
+        """
+        import numpy as np  # Lazy import
+        if columns is None:
+            numeric_columns = list(self.data.select_dtypes(include=['number']).columns)
+        else:
+            numeric_columns = [col for col in columns if col in self.data.columns and self._is_numeric_column(col)]
+
+        detail = ''
+        if method in ('winsorize', 'remove') and numeric_columns:
+            values = self.data[numeric_columns].to_numpy(dtype='float64', na_value=np.nan)
             if method == 'winsorize':
-                lower = self.data[column].quantile(percentile / 100.0)
-                upper = self.data[column].quantile(1 - percentile / 100.0)
-                self.data[column] = self.data[column].clip(lower, upper)
-            elif method == 'remove':
-                Q1 = self.data[column].quantile(0.25)
-                Q3 = self.data[column].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                self.data = self.data[(self.data[column] >= lower_bound) & (self.data[column] <= upper_bound)]
-        
-        self.cleaning_log.append(f"Handled outliers using {method} method for {len(numeric_columns)} columns")
+                lower, upper = survey_stats.column_quantiles(values, [percentile / 100.0, 1 - percentile / 100.0])
+            else:
+                lower, upper = survey_stats.iqr_bounds(values, threshold)
+            with np.errstate(invalid='ignore'):
+                outside = (values < lower) | (values > upper)
+            counts = outside.sum(axis=0)
+            affected = ', '.join(f"{col} {int(n)}" for col, n in zip(numeric_columns, counts) if n)
+            if method == 'winsorize':
+                clip = np.flatnonzero(counts)
+                # float64 columns are clipped together on the block already extracted;
+                # other dtypes go through Series.clip, which keeps integral columns integral
+                is_float = np.array([self.data[numeric_columns[i]].dtype == np.float64 for i in clip], dtype=bool)
+                block = clip[is_float]
+                if len(block):
+                    self.data[[numeric_columns[i] for i in block]] = np.clip(values[:, block], lower[block], upper[block])
+                for i in clip[~is_float]:
+                    column = numeric_columns[i]
+                    self.data[column] = self.data[column].clip(lower[i], upper[i])
+                detail = f" (values clipped: {affected})" if affected else " (no values clipped)"
+            else:
+                rows = outside.any(axis=1)
+                removed = int(rows.sum())
+                if removed:
+                    self.data = self.data[~rows]
+                detail = f" (removed {removed} rows; values outside the IQR fences: {affected})" if removed else " (no rows removed)"
+
+        self.cleaning_log.append(f"Handled outliers using {method} method for {len(numeric_columns)} columns{detail}")
     
     def apply_weights(self, weight_column):
         """Apply survey weights"""
@@ -429,72 +1032,173 @@ class DataProcessor:
             self.cleaning_log.append(f"Weight column {weight_column} not found")
             return False
     
-    def calculate_estimates(self, columns=None):
-        """Calculate weighted and unweighted estimates"""
+    def calculate_estimates(self, columns=None, design=None):
+        """Calculate weighted and unweighted estimates
+
+        All selected columns are reduced together on one 2-D NumPy block
+        (see survey_stats.column_statistics) rather than column by column.
+        ``design`` optionally describes the survey design (strata, cluster,
+        replicate weights); the SE of the weighted estimate (or of the unweighted
+        one when no weights are applied) is then design-based.
+        """
+        replicate_columns = self._replicate_weight_columns(design) if design else []
         if columns is None:
             numeric_columns = self.data.select_dtypes(include=['number']).columns
+            numeric_columns = [col for col in numeric_columns if col not in replicate_columns]
         else:
-            numeric_columns = [col for col in columns if col in self.data.columns and self.data[col].dtype in ['int64', 'float64']]
-        
+            numeric_columns = [col for col in columns if col in self.data.columns and self._is_numeric_column(col)]
+        numeric_columns = list(numeric_columns)
+
+        import numpy as np  # Lazy import
+        import pandas as pd  # Lazy import
+        values = self.data[numeric_columns].to_numpy(dtype='float64', na_value=np.nan)
+        weights = None
+        if self.weights is not None:
+            try:
+                weights = pd.to_numeric(self.weights, errors='coerce').reindex(self.data.index).to_numpy(dtype='float64', na_value=np.nan)
+            except Exception:
+                weights = None
+                self.cleaning_log.append("Weighted estimates failed; using unweighted only.")
+        stats = survey_stats.column_statistics(values, weights=weights, n_total=len(self.data))
+
         estimates = {}
-        for column in numeric_columns:
-            # Unweighted estimates
-            unweighted_mean = self.data[column].mean()
-            unweighted_std = self.data[column].std()
-            unweighted_se = unweighted_std / math.sqrt(len(self.data))
-            
+        for i, column in enumerate(numeric_columns):
             estimates[column] = {
-                'unweighted': {
-                    'mean': unweighted_mean,
-                    'std': unweighted_std,
-                    'se': unweighted_se,
-                    'ci_95_lower': unweighted_mean - 1.96 * unweighted_se,
-                    'ci_95_upper': unweighted_mean + 1.96 * unweighted_se
-                }
+                'unweighted': survey_stats.estimate_entry(stats['mean'][i], stats['std'][i], stats['se'][i])
             }
-            
-            # Weighted estimates (guard numeric and positive weights; align masks)
-            if self.weights is not None:
-                try:
-                    import pandas as pd  # Lazy import
-                    x = self.data[column]
-                    w = pd.to_numeric(self.weights, errors='coerce')
-                    mask = x.notna() & w.notna()
-                    x = x[mask]
-                    w = w[mask]
-                    # Positive weights only
-                    mask_pos = w > 0
-                    x = x[mask_pos]
-                    w = w[mask_pos]
-                    weight_sum = w.sum()
-                    if weight_sum <= 0 or len(x) == 0:
-                        weighted_mean = float('nan')
-                        weighted_std = float('nan')
-                        weighted_se = float('nan')
-                    else:
-                        weighted_mean = (x * w).sum() / weight_sum
-                        weighted_variance = (((x - weighted_mean) ** 2) * w).sum() / weight_sum
-                        weighted_std = math.sqrt(float(weighted_variance))
-                        weighted_se = weighted_std / math.sqrt(len(x))
-                    estimates[column]['weighted'] = {
-                        'mean': weighted_mean,
-                        'std': weighted_std,
-                        'se': weighted_se,
-                        'ci_95_lower': weighted_mean - 1.96 * weighted_se,
-                        'ci_95_upper': weighted_mean + 1.96 * weighted_se
-                    }
-                except Exception:
-                    # If weighted calc fails, continue with unweighted only
-                    self.cleaning_log.append(
-                        f"Weighted estimate failed for '{column}'; using unweighted only."
-                    )
+            if weights is not None:
+                estimates[column]['weighted'] = survey_stats.estimate_entry(stats['w_mean'][i], stats['w_std'][i], stats['w_se'][i])
+
+        if design and numeric_columns:
+            try:
+                self._apply_design_variance(estimates, numeric_columns, values, weights, design, replicate_columns)
+            except Exception as e:
+                self.cleaning_log.append(f"Design-based variance failed ({str(e)}); reporting simple standard errors.")
         
         self.estimates = estimates
         self.cleaning_log.append(f"Calculated estimates for {len(numeric_columns)} columns")
         return estimates
     
-    def generate_visualizations(self):
-        """Generate data visualizations"""
+    def calculate_domain_estimates(self, group_by, columns=None):
+        """Weighted and unweighted estimates for every domain (e.g. state x gender)
+
+        Domains are hashed to integer codes with one groupby and all statistics
+        come from a single sorted pass (survey_stats.grouped_statistics). The
+        result is columnar: ``keys`` holds one list per grouping column and each
+        statistic is a list aligned with those keys.
+        """
+        import numpy as np  # Lazy import
+        import pandas as pd  # Lazy import
+        group_by = [group_by] if isinstance(group_by, str) else list(group_by or [])
+        missing = [col for col in group_by if col not in self.data.columns]
+        if not group_by or missing:
+            raise ValueError(f"Group-by columns not found: {', '.join(map(str, missing)) or 'none given'}")
+        if columns is None:
+            numeric_columns = self.data.select_dtypes(include=['number']).columns
+        else:
+            numeric_columns = [col for col in columns if col in self.data.columns and self._is_numeric_column(col)]
+        numeric_columns = [col for col in numeric_columns if col not in group_by]
+
+        # observed=True: categorical domains only yield the combinations present in the data
+        grouper = self.data.groupby(group_by, sort=True, dropna=False, observed=True)
+        codes = grouper.ngroup().to_numpy()
+        keys = grouper.size().index
+        values = self.data[numeric_columns].to_numpy(dtype='float64', na_value=np.nan)
+        weights = None
+        if self.weights is not None:
+            weights = pd.to_numeric(self.weights, errors='coerce').reindex(self.data.index).to_numpy(dtype='float64', na_value=np.nan)
+        stats = survey_stats.grouped_statistics(values, codes, len(keys), weights=weights)
+
+        estimates = {}
+        for i, column in enumerate(numeric_columns):
+            estimates[column] = {'unweighted': survey_stats.domain_entry(stats['mean'][:, i], stats['std'][:, i], stats['se'][:, i])}
+            if weights is not None:
+                estimates[column]['weighted'] = survey_stats.domain_entry(stats['w_mean'][:, i], stats['w_std'][:, i], stats['w_se'][:, i])
+        domain_estimates = {
+            'group_by': group_by,
+            # Rows with a missing grouping value form their own domain, keyed None
+            'keys': {
+                col: [None if pd.isna(key) else key for key in keys.get_level_values(j).tolist()]
+                for j, col in enumerate(group_by)
+            },
+            'rows': stats['rows'].tolist(),
+            'estimates': estimates
+        }
+        self.domain_estimates = domain_estimates
+        self.cleaning_log.append(f"Calculated domain estimates for {len(keys)} domains of {', '.join(map(str, group_by))}")
+        return domain_estimates
+
+    def _replicate_weight_columns(self, design):
+        """Replicate weight columns named in a design spec (a list, or a column-name prefix)"""
+        spec = design.get('replicate_weights')
+        if not spec:
+            return []
+        if isinstance(spec, str):
+            return [col for col in self.data.columns if str(col).startswith(spec)]
+        return [col for col in spec if col in self.data.columns]
+
+    def _apply_design_variance(self, estimates, numeric_columns, values, weights, design, replicate_columns):
+        """Replace simple SEs with design-based ones (Taylor linearization or replicates)"""
+        import numpy as np  # Lazy import
+        import pandas as pd  # Lazy import
+        target = 'weighted' if weights is not None else 'unweighted'
+        design_weights = weights if weights is not None else np.ones(len(self.data))
+
+        def codes(column):
+            if not column:
+                return None
+            if column not in self.data.columns:
+                raise ValueError(f"design column '{column}' not found")
+            return pd.factorize(self.data[column])[0]
+
+        strata = codes(design.get('strata'))
+        clusters = codes(design.get('cluster'))
+        method = design.get('method') or ('jackknife' if replicate_columns else 'taylor')
+        if method == 'taylor':
+            result = survey_stats.taylor_variance(values, design_weights, strata=strata, clusters=clusters)
+        else:
+            replicate_weights = None
+            if replicate_columns:
+                replicate_weights = self.data[replicate_columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+            result = survey_stats.replicate_variance(
+                values, design_weights,
+                replicate_weights=replicate_weights,
+                strata=strata,
+                clusters=clusters,
+                method=method,
+                n_replicates=int(design.get('replicates', 100)),
+                rho=float(design.get('rho', 0.5)),
+                scale=design.get('scale'),
+                rscales=design.get('rscales'),
+                workers=int(design.get('workers', 1))
+            )
+
+        for i, column in enumerate(numeric_columns):
+            entry = estimates[column][target]
+            simple_se = entry['se']
+            updated = survey_stats.estimate_entry(entry['mean'], entry['std'], result['se'][i])
+            updated['se_method'] = result['method']
+            updated['design_effect'] = float((updated['se'] / simple_se) ** 2) if simple_se else float('nan')
+            estimates[column][target] = updated
+
+        details = [f"{key}={result[key]}" for key in ('n_strata', 'n_psu', 'n_replicates') if key in result]
+        self.cleaning_log.append(f"Design-based standard errors ({result['method']}): {', '.join(details)}")
+        if result.get('singleton_strata'):
+            self.cleaning_log.append(f"{result['singleton_strata']} strata have a single PSU and contribute no variance")
+
+    def generate_visualizations(self, mode=None):
+        """Generate data visualizations
+
+        ``mode='data'`` (the default, see PLOT_MODE) returns compact aggregates
+        for the frontend to draw (generate_plot_data); ``mode='html'`` returns
+        Plotly HTML fragments rendered on the server from a row sample.
+        """
+        mode = mode or app.config.get('PLOT_MODE', 'data')
+        if mode == 'data':
+            if os.environ.get('DISABLE_PLOTS', '').lower() in ('1', 'true', 'yes'):
+                self.cleaning_log.append("Visualizations disabled by DISABLE_PLOTS env var.")
+                return {}
+            return self.generate_plot_data()
         plots = {}
         # Lazy import plotly when needed
         try:
@@ -542,25 +1246,255 @@ class DataProcessor:
             plots['missing'] = fig.to_html(full_html=False)
         
         return plots
-    
-    def generate_report(self, format='pdf'):
-        """Generate comprehensive report"""
+
+    def generate_plot_data(self):
+        """Plot aggregates over the full data, as JSON-ready dicts keyed like the Plotly plots
+
+        Histograms (``dist_<column>``, first five numeric columns) carry bin edges,
+        counts and t-digest quantiles, ``correlation`` the pairwise correlation
+        matrix of those columns and ``missing`` the per-column missing counts
+        (see sketches.FrameSketch). Data straight from load_data reuses the
+        sketch built at load; cleaned data is sketched in row chunks.
+        """
+        if self.sketch is not None and self.data is self.source_data:
+            sketch = self.sketch
+        else:
+            sketch = sketches.sketch_frame(self.data, chunk_rows=app.config.get('CSV_CHUNK_ROWS', 100000))
+        return sketch.to_plots()
+
+    def _step_key(self, name, upstream, config):
+        payload = json.dumps({'step': name, 'upstream': upstream, 'config': config}, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _run_step(self, name, upstream, config, func, steps, on_step=None):
+        """Run one pipeline step, or reuse its output when (upstream, config) was seen before
+
+        ``func`` performs the step against the processor state and returns its
+        output; the log lines it appends are cached with the output so a cached
+        rerun reports the same cleaning log.
+        """
+        key = self._step_key(name, upstream, config)
+        cache = self._step_cache
+        if key in cache:
+            cache.move_to_end(key)
+            output, log_lines = cache[key]
+            self.cleaning_log.extend(log_lines)
+            steps.append({'step': name, 'cached': True})
+            if on_step:
+                on_step(name, 'done', True)
+            return key, output
+        if on_step:
+            on_step(name, 'running', False)
+        log_start = len(self.cleaning_log)
+        output = func()
+        cache[key] = (output, self.cleaning_log[log_start:])
+        while len(cache) > app.config['PIPELINE_CACHE_STEPS']:
+            cache.popitem(last=False)
+        steps.append({'step': name, 'cached': False})
+        if on_step:
+            on_step(name, 'done', False)
+        return key, output
+
+    @staticmethod
+    def pipeline_steps(config):
+        """Names of the steps run_pipeline will execute for ``config``, in order"""
+        config = config or {}
+        steps = []
+        if config.get('imputation') is not None:
+            steps.append('impute')
+        if config.get('outliers') is not None:
+            steps.append('outliers')
+        if (config.get('weights') or {}).get('column'):
+            steps.append('weights')
+        steps.append('estimates')
+        if config.get('group_by') or config.get('domains'):
+            steps.append('domains')
+        steps.append('plots')
+        return steps
+
+    def run_pipeline(self, config, on_step=None):
+        """Run the /clean pipeline as a chain of memoized steps
+
+        load -> impute -> outliers -> (weights, estimates, domains, plots). Every
+        step starts from its upstream output rather than the current state, so
+        repeated runs are idempotent, and a step whose (upstream key, config) is
+        unchanged is served from the step cache. Changing only
+        ``estimate_columns`` or the weight column therefore skips imputation,
+        outlier handling and plotting. ``on_step(name, status, cached)`` is called
+        as each step starts and finishes (used for job progress).
+        """
+        import pandas as pd  # Lazy import
+        config = config or {}
+        if self.source_data is None:
+            # Data assigned directly (not via load_data): adopt it as the source
+            self.source_data = self.data
+            self.source_key = None
+            self.source_log = list(self.cleaning_log)
+        if self.source_key is None:
+            self.source_key = hashlib.sha1(pd.util.hash_pandas_object(self.source_data, index=True).values.tobytes()).hexdigest()
+
+        steps = []
+        self.cleaning_log = list(self.source_log)
+        self.weights = None
+        self.pipeline_key = None
+        key = self.source_key
+
+        def transform(step_config, apply):
+            # Transforming steps work on a copy so cached upstream frames stay untouched
+            def run():
+                self.data = self.data.copy()
+                apply(step_config)
+                return self.data
+            return run
+
+        self.data = self.source_data
+        imputation = config.get('imputation')
+        if imputation is not None:
+            key, self.data = self._run_step('impute', key, imputation, transform(
+                imputation,
+                lambda c: self.impute_missing_values(method=c.get('method', 'mean'), columns=c.get('columns', None))
+            ), steps, on_step)
+
+        outliers = config.get('outliers')
+        if outliers is not None:
+            def handle(c):
+                self.detect_outliers(method=c.get('detection_method', 'iqr'), columns=c.get('columns', None))
+                self.handle_outliers(method=c.get('handling_method', 'winsorize'), columns=c.get('columns', None))
+            key, self.data = self._run_step('outliers', key, outliers, transform(outliers, handle), steps, on_step)
+        data_key = key
+
+        weight_column = (config.get('weights') or {}).get('column')
+        weights_key = None
+        if weight_column:
+            def weigh():
+                self.apply_weights(weight_column)
+                return self.weights
+            weights_key, self.weights = self._run_step('weights', data_key, {'column': weight_column}, weigh, steps, on_step)
+
+        estimate_columns = config.get('estimate_columns', None)
+        design = config.get('design')
+        try:
+            estimates_key, self.estimates = self._run_step(
+                'estimates', [data_key, weights_key], {'columns': estimate_columns, 'design': design},
+                lambda: self.calculate_estimates(columns=estimate_columns, design=design), steps, on_step
+            )
+        except Exception as e:
+            raise PipelineStepError('estimates', e) from e
+
+        self.domain_estimates = None
+        domains_key = None
+        group_by = config.get('group_by') or config.get('domains')
+        if group_by:
+            try:
+                domains_key, self.domain_estimates = self._run_step(
+                    'domains', [data_key, weights_key], {'group_by': group_by, 'columns': estimate_columns},
+                    lambda: self.calculate_domain_estimates(group_by, columns=estimate_columns), steps, on_step
+                )
+            except Exception as e:
+                raise PipelineStepError('domains', e) from e
+
+        plot_mode = config.get('plot_mode') or app.config.get('PLOT_MODE', 'data')
+
+        def plot():
+            try:
+                return self.generate_visualizations(mode=plot_mode)
+            except Exception:
+                # Non-fatal for processing; continue without plots
+                return {}
+        plots_key, plots = self._run_step('plots', data_key, {'mode': plot_mode}, plot, steps, on_step)
+        self.plots = plots
+        self.pipeline_key = self._step_key(
+            'pipeline', [data_key, weights_key, estimates_key, domains_key, plots_key], None
+        )
+
+        return {
+            'cleaning_log': list(self.cleaning_log),
+            'estimates': self.estimates,
+            'domain_estimates': self.domain_estimates,
+            'plots': plots,
+            'steps': steps
+        }
+
+    def generate_report(self, format='pdf', output=None, include_plots=False):
+        """Generate comprehensive report
+
+        With ``output`` (a path or binary file object) the report is written
+        there as it is produced and ``output`` is returned; otherwise a PDF
+        comes back as a BytesIO and HTML as a string. ``include_plots`` adds
+        the charts of the last pipeline run.
+        """
         if format == 'pdf':
-            return self._generate_pdf_report()
+            return self._generate_pdf_report(output=output, include_plots=include_plots)
         else:
-            return self._generate_html_report()
+            return self._generate_html_report(output=output, include_plots=include_plots)
+
+    def report_key(self, format='pdf', include_plots=False):
+        """Fingerprint of everything a report shows, used as its cache key and ETag
+
+        Built from identities only, never from computed output, so a
+        conditional GET costs no pass over the data: the loaded source, the
+        step keys of the last pipeline run (which fix the cleaning log,
+        estimates and plots), the plot setting and REPORT_TEMPLATE_VERSION.
+        """
+        payload = json.dumps({
+            'format': format,
+            'template': self.REPORT_TEMPLATE_VERSION,
+            'source': self.source_key,
+            'pipeline': self.pipeline_key,
+            'rows': len(self.data),
+            'columns': len(self.data.columns),
+            'cleaning_log': self.cleaning_log if self.pipeline_key is None else None,
+            'include_plots': bool(include_plots),
+        }, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def report_plots(self):
+        """Plot aggregates for reports: the last run's, or drawn from the current data
+
+        Plotly HTML from ``plot_mode='html'`` cannot be embedded in a PDF, so
+        in that case the aggregates are computed (from the load-time sketch
+        while the data is unchanged).
+        """
+        plots = self.plots
+        if not plots or not all(isinstance(plot, dict) for plot in plots.values()):
+            try:
+                plots = self.generate_plot_data()
+            except Exception:
+                plots = {}
+        return plots
+
+    def _report_context(self):
+        """Values shown by both the PDF and the HTML report"""
+        rows = []
+        for var, est in (self.estimates or {}).items():
+            values = est['weighted'] if 'weighted' in est else est['unweighted']
+            rows.append([var] + [values[name] for name in ('mean', 'std', 'se', 'ci_95_lower', 'ci_95_upper')])
+        return {
+            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'rows': len(self.data),
+            'columns': len(self.data.columns),
+            'cleaning_log': list(self.cleaning_log),
+            'estimate_header': ['Variable', 'Mean', 'Std Dev', 'Standard Error', '95% CI Lower', '95% CI Upper'],
+            'estimates': rows,
+        }
     
-    def _generate_pdf_report(self):
-        """Generate PDF report"""
+    def _generate_pdf_report(self, output=None, include_plots=False):
+        """Generate PDF report
+
+        The estimates table is emitted in blocks of REPORT_TABLE_ROWS rows:
+        ReportLab re-lays out the remainder of a table every time it splits it
+        across pages, which is quadratic for one table with thousands of rows.
+        """
         # Lazy import reportlab only when generating PDF
         try:
             from reportlab.lib.pagesizes import A4
-            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, KeepTogether
             from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
             from reportlab.lib import colors
         except Exception as import_error:
             raise ImportError("Missing reportlab for PDF reports. Install with: pip install reportlab or request HTML report instead.") from import_error
-        buffer = io.BytesIO()
+        context = self._report_context()
+        buffer = io.BytesIO() if output is None else output
         doc = SimpleDocTemplate(buffer, pagesize=A4)
         styles = getSampleStyleSheet()
         story = []
@@ -578,45 +1512,21 @@ class DataProcessor:
         
         # Summary
         story.append(Paragraph("Executive Summary", styles['Heading2']))
-        story.append(Paragraph(f"Data Processing completed on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
-        story.append(Paragraph(f"Total records processed: {len(self.data)}", styles['Normal']))
-        story.append(Paragraph(f"Total variables: {len(self.data.columns)}", styles['Normal']))
+        story.append(Paragraph(f"Data Processing completed on {context['generated_at']}", styles['Normal']))
+        story.append(Paragraph(f"Total records processed: {context['rows']}", styles['Normal']))
+        story.append(Paragraph(f"Total variables: {context['columns']}", styles['Normal']))
         story.append(Spacer(1, 12))
         
         # Cleaning Log
         story.append(Paragraph("Data Cleaning Log", styles['Heading2']))
-        for log_entry in self.cleaning_log:
+        for log_entry in context['cleaning_log']:
             story.append(Paragraph(f"• {log_entry}", styles['Normal']))
         story.append(Spacer(1, 12))
         
         # Estimates Table
-        if self.estimates:
+        if context['estimates']:
             story.append(Paragraph("Statistical Estimates", styles['Heading2']))
-            estimate_data = [['Variable', 'Mean', 'Std Dev', 'Standard Error', '95% CI Lower', '95% CI Upper']]
-            
-            for var, est in self.estimates.items():
-                if 'weighted' in est:
-                    row = [
-                        var,
-                        f"{est['weighted']['mean']:.4f}",
-                        f"{est['weighted']['std']:.4f}",
-                        f"{est['weighted']['se']:.4f}",
-                        f"{est['weighted']['ci_95_lower']:.4f}",
-                        f"{est['weighted']['ci_95_upper']:.4f}"
-                    ]
-                else:
-                    row = [
-                        var,
-                        f"{est['unweighted']['mean']:.4f}",
-                        f"{est['unweighted']['std']:.4f}",
-                        f"{est['unweighted']['se']:.4f}",
-                        f"{est['unweighted']['ci_95_lower']:.4f}",
-                        f"{est['unweighted']['ci_95_upper']:.4f}"
-                    ]
-                estimate_data.append(row)
-            
-            table = Table(estimate_data)
-            table.setStyle(TableStyle([
+            table_style = TableStyle([
                 ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
                 ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
                 ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -625,96 +1535,596 @@ class DataProcessor:
                 ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
                 ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
                 ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            story.append(table)
+            ])
+            block_rows = max(1, app.config.get('REPORT_TABLE_ROWS', 200))
+            estimates = context['estimates']
+            for start in range(0, len(estimates), block_rows):
+                estimate_data = [context['estimate_header']]
+                for var, *values in estimates[start:start + block_rows]:
+                    estimate_data.append([var] + [f"{value:.4f}" for value in values])
+                table = Table(estimate_data, repeatRows=1)
+                table.setStyle(table_style)
+                story.append(table)
+
+        # Charts
+        if include_plots:
+            import report_charts  # Lazy import (needs reportlab)
+            charts = report_charts.chart_drawings(self.report_plots())
+            if charts:
+                story.append(Spacer(1, 12))
+                story.append(Paragraph("Visualizations", styles['Heading2']))
+                for title, drawing in charts:
+                    story.append(KeepTogether([Paragraph(title, styles['Heading4']), drawing, Spacer(1, 12)]))
         
         doc.build(story)
+        if output is not None:
+            return output
         buffer.seek(0)
         return buffer
     
-    def _generate_html_report(self):
-        """Generate HTML report"""
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Survey Data Processing Report</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 40px; }}
-                .header {{ text-align: center; color: #2c3e50; }}
-                .section {{ margin: 20px 0; }}
-                .log-entry {{ margin: 5px 0; padding: 5px; background-color: #f8f9fa; }}
-                table {{ border-collapse: collapse; width: 100%; }}
-                th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-                th {{ background-color: #4CAF50; color: white; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>ASDP (AI Survey Data Processor) Report</h1>
-                <p>Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-            </div>
-            
-            <div class="section">
-                <h2>Executive Summary</h2>
-                <p>Total records processed: {len(self.data)}</p>
-                <p>Total variables: {len(self.data.columns)}</p>
-            </div>
-            
-            <div class="section">
-                <h2>Data Cleaning Log</h2>
-                {''.join([f'<div class="log-entry">• {entry}</div>' for entry in self.cleaning_log])}
-            </div>
-            
-            <div class="section">
-                <h2>Statistical Estimates</h2>
-                <table>
-                    <tr>
-                        <th>Variable</th>
-                        <th>Mean</th>
-                        <th>Std Dev</th>
-                        <th>Standard Error</th>
-                        <th>95% CI Lower</th>
-                        <th>95% CI Upper</th>
-                    </tr>
+    def _generate_html_report(self, output=None, include_plots=False):
+        """Generate HTML report from templates/report.html (compiled once by Jinja and cached)
+
+        With ``output`` the template is rendered incrementally into the file
+        rather than built up as one string.
         """
-        
-        if self.estimates:
-            for var, est in self.estimates.items():
-                if 'weighted' in est:
-                    html_content += f"""
-                    <tr>
-                        <td>{var}</td>
-                        <td>{est['weighted']['mean']:.4f}</td>
-                        <td>{est['weighted']['std']:.4f}</td>
-                        <td>{est['weighted']['se']:.4f}</td>
-                        <td>{est['weighted']['ci_95_lower']:.4f}</td>
-                        <td>{est['weighted']['ci_95_upper']:.4f}</td>
-                    </tr>
-                    """
-                else:
-                    html_content += f"""
-                    <tr>
-                        <td>{var}</td>
-                        <td>{est['unweighted']['mean']:.4f}</td>
-                        <td>{est['unweighted']['std']:.4f}</td>
-                        <td>{est['unweighted']['se']:.4f}</td>
-                        <td>{est['unweighted']['ci_95_lower']:.4f}</td>
-                        <td>{est['unweighted']['ci_95_upper']:.4f}</td>
-                    </tr>
-                    """
-        
-        html_content += """
-                </table>
-            </div>
-        </body>
-        </html>
+        context = self._report_context()
+        context['charts'] = []
+        if include_plots:
+            from markupsafe import Markup
+            import report_charts  # Lazy import (needs reportlab)
+            context['charts'] = [
+                (title, Markup(report_charts.to_svg(drawing, i)))
+                for i, (title, drawing) in enumerate(report_charts.chart_drawings(self.report_plots()))
+            ]
+        template = app.jinja_env.get_template('report.html')
+        if output is None:
+            return template.render(**context)
+        if isinstance(output, (str, os.PathLike)):
+            with open(output, 'w', encoding='utf-8') as fh:
+                for part in template.generate(**context):
+                    fh.write(part)
+        else:
+            for part in template.generate(**context):
+                output.write(part.encode('utf-8'))
+        return output
+
+    def memory_usage_bytes(self):
+        """Approximate in-memory footprint of the loaded data and cached step frames (used for cache accounting)"""
+        frames = {}
+        for frame in [self.data, self.source_data] + [output for output, _ in self._step_cache.values()]:
+            if hasattr(frame, 'memory_usage') and hasattr(frame, 'columns'):
+                frames[id(frame)] = frame
+        try:
+            return int(sum(frame.memory_usage(index=True, deep=False).sum() for frame in frames.values()))
+        except Exception:
+            return 0
+
+
+class ProcessorRegistry:
+    """Keyed store of DataProcessor instances, one per dataset.
+
+    Keeps at most ``max_entries`` processors (and roughly ``max_bytes`` of loaded
+    data) in memory. Least-recently-used processors are pickled to ``spill_folder``
+    on eviction and restored transparently on the next access, so any worker that
+    shares the upload folder can pick up a dataset without re-parsing the file.
+    Keys are hashed onto a fixed set of lock stripes, so requests for different
+    datasets rarely contend and the lock table never grows.
+
+    A /clean publishes only its pipeline config (``publish``), never the frames.
+    A process whose copy of the dataset predates the published state replays
+    that pipeline from its own source frame on the next access.
+    """
+
+    LOCK_STRIPES = 64
+
+    def __init__(self, spill_folder, max_entries=8, max_bytes=512 * 1024 * 1024):
+        self.spill_folder = spill_folder
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()
+        self._locks = [threading.RLock() for _ in range(self.LOCK_STRIPES)]
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key):
+        return self._locks[hash(key) % len(self._locks)]
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_folder, f"{secure_filename(str(key))}.pkl")
+
+    def _state_path(self, key):
+        return os.path.join(self.spill_folder, f"{secure_filename(str(key))}.state.json")
+
+    def __contains__(self, key):
+        key = str(key)
+        with self._lock:
+            return key in self._entries or os.path.exists(self._spill_path(key))
+
+    def put(self, key, processor):
+        """Register (or replace) the processor for ``key``"""
+        key = str(key)
+        with self._key_lock(key):
+            with self._lock:
+                self._entries[key] = processor
+                self._entries.move_to_end(key)
+        self._evict(keep=key)
+        return processor
+
+    def get(self, key, loader=None):
+        """Return the processor for ``key``, restoring it from disk or ``loader`` on a miss.
+
+        ``loader`` is called with a fresh DataProcessor and must return True when it
+        managed to load data into it. Returns None if the key cannot be resolved.
         """
-        
-        return html_content
+        key = str(key)
+        with self._key_lock(key):
+            with self._lock:
+                processor = self._entries.get(key)
+            if processor is None:
+                processor = self._restore(key)
+            if processor is None and loader is not None:
+                candidate = DataProcessor()
+                if loader(candidate):
+                    processor = candidate
+            if processor is None:
+                return None
+            self._catch_up(key, processor)
+            with self._lock:
+                self._entries[key] = processor
+                self._entries.move_to_end(key)
+        self._evict(keep=key)
+        return processor
+
+    def publish(self, key, config):
+        """Record that ``key`` was last cleaned with ``config``; returns True once written
+
+        Only the small config file is written, so this is cheap enough to call
+        on every /clean however large the dataset is.
+        """
+        key = str(key)
+        state = {'id': uuid4().hex, 'config': config or {}}
+        path = self._state_path(key)
+        tmp_path = f"{path}.{uuid4().hex[:8]}.tmp"
+        try:
+            os.makedirs(self.spill_folder, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as fh:
+                json.dump(state, fh, default=str)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        with self._lock:
+            processor = self._entries.get(key)
+        if processor is not None:
+            processor.state_id = state['id']
+        return True
+
+    def _catch_up(self, key, processor):
+        """Replay the last published pipeline on ``processor`` if it has not seen it yet"""
+        try:
+            with open(self._state_path(key), 'r', encoding='utf-8') as fh:
+                state = json.load(fh)
+        except (OSError, ValueError):
+            return
+        if getattr(processor, 'state_id', None) == state.get('id') or processor.data is None:
+            return
+        try:
+            processor.run_pipeline(state.get('config') or {})
+        except Exception:
+            pass  # The publishing request reported the failure; keep serving the data as loaded
+        processor.state_id = state.get('id')
+
+    @contextmanager
+    def checkout(self, key, loader=None):
+        """Hold the per-dataset lock while the caller works with the processor"""
+        key = str(key)
+        lock = self._key_lock(key)
+        with lock:
+            yield self.get(key, loader=loader)
+
+    def discard(self, key):
+        key = str(key)
+        with self._key_lock(key):
+            with self._lock:
+                self._entries.pop(key, None)
+            for path in (self._spill_path(key), self._state_path(key)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
 
-# Global processor instance
-processor = DataProcessor()
+    def _restore(self, key):
+        path = self._spill_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as fh:
+                processor = pickle.load(fh)
+            return processor if isinstance(processor, DataProcessor) else None
+        except Exception:
+            return None
+
+    def _spill(self, key, processor):
+        path = self._spill_path(key)
+        tmp_path = f"{path}.{uuid4().hex[:8]}.tmp"
+        try:
+            os.makedirs(self.spill_folder, exist_ok=True)
+            with open(tmp_path, 'wb') as fh:
+                pickle.dump(processor, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            return True
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+
+    def _evict(self, keep=None):
+        """Spill least-recently-used processors until the registry is within bounds"""
+        while True:
+            with self._lock:
+                total_bytes = sum(p.memory_usage_bytes() for p in self._entries.values())
+                if len(self._entries) <= self.max_entries and (total_bytes <= self.max_bytes or len(self._entries) <= 1):
+                    return
+                victim = None
+                for key in self._entries:
+                    if key == keep:
+                        continue
+                    lock = self._key_lock(key)
+                    # Skip datasets that another request is working on right now
+                    if lock.acquire(blocking=False):
+                        victim = (key, lock)
+                        break
+                if victim is None:
+                    return
+                key, lock = victim
+                processor = self._entries.pop(key)
+            try:
+                self._spill(key, processor)
+            finally:
+                lock.release()
+
+
+# Per-dataset processor registry (replaces the former module-level singleton)
+processors = ProcessorRegistry(
+    app.config['PROCESSOR_CACHE_FOLDER'],
+    max_entries=app.config['PROCESSOR_CACHE_SIZE'],
+    max_bytes=app.config['PROCESSOR_CACHE_MB'] * 1024 * 1024
+)
+
+
+def _current_user_id():
+    return current_user.id if hasattr(current_user, 'id') and current_user.is_authenticated else None
+
+
+def _can_access_dataset(ds):
+    """Owners and admins may use a dataset; an anonymous upload only in the session that made it"""
+    if getattr(current_user, 'role', 'user') == 'admin':
+        return True
+    if ds.owner_id is not None:
+        return ds.owner_id == _current_user_id()
+    return ds.id in (session.get('dataset_ids') or [])
+
+
+def _resolve_dataset(data=None):
+    """Find the Dataset a request refers to; returns (dataset, error response)
+
+    An explicit dataset_id, or else this session's upload, must be an integer
+    (400) of a dataset the caller may use (404 otherwise, also for other
+    users' datasets). Without either, a signed-in user gets their latest
+    upload; the dataset is None when there is nothing to use.
+    """
+    dataset_id = data.get('dataset_id') if data else None
+    if dataset_id is None or dataset_id == '':
+        dataset_id = request.args.get('dataset_id') or None
+    from_session = dataset_id is None
+    if from_session:
+        dataset_id = session.get('dataset_id')
+    try:
+        if dataset_id is None:
+            owner_id = _current_user_id()
+            if owner_id is None:
+                return None, None
+            latest = (Dataset.query.filter(Dataset.owner_id == owner_id)
+                      .order_by(Dataset.uploaded_at.desc()).first())
+            return latest, None
+        try:
+            dataset_id = int(dataset_id)
+        except (TypeError, ValueError):
+            return None, (jsonify({'error': f"Invalid dataset_id: {dataset_id!r}"}), 400)
+        ds = db.session.get(Dataset, dataset_id)
+    except SQLAlchemyError:
+        db.session.rollback()
+        return None, None
+    if ds is None or not _can_access_dataset(ds):
+        if from_session:
+            # Stale session (e.g. the database was reset or the user changed); forget it
+            session.pop('dataset_id', None)
+        return None, (jsonify({'error': f"Dataset {dataset_id} not found"}), 404)
+    return ds, None
+
+
+_job_executor = None
+_job_executor_lock = threading.Lock()
+
+
+def _get_job_executor():
+    """Lazily start the local worker pool (spawned, so workers never inherit web threads or DB connections)"""
+    global _job_executor
+    with _job_executor_lock:
+        if _job_executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            _job_executor = ProcessPoolExecutor(
+                max_workers=app.config['JOB_WORKERS'],
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _job_executor
+
+
+_batch_executor = None
+_batch_executor_lock = threading.Lock()
+
+
+def _get_batch_executor():
+    """Lazily start the /upload_batch parser pool (spawned, like the job pool)"""
+    global _batch_executor
+    with _batch_executor_lock:
+        if _batch_executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            _batch_executor = ProcessPoolExecutor(
+                max_workers=app.config['BATCH_WORKERS'],
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _batch_executor
+
+
+def parse_batch_file(file_path, read_options=None):
+    """Parse one batch member (runs in a worker process); returns ``(frame, parse log)``
+
+    Raises ValueError with load_data's reason when the file cannot be read.
+    Members are temporary, so no parse snapshot is written for them.
+    """
+    processor = DataProcessor()
+    if not processor.load_data(file_path, use_cache=False, optimize=False, read_options=read_options):
+        raise ValueError(processor.cleaning_log[-1] if processor.cleaning_log else 'Failed to load data')
+    # Drop the trailing "Data loaded successfully" line; the combined load logs its own
+    return processor.data, processor.cleaning_log[:-1]
+
+
+def _parse_batch(files, read_options=None):
+    """Parse ``[(name, path)]`` concurrently; returns ``(results, errors)`` keyed by name"""
+    global _batch_executor
+    results = {}
+    errors = {}
+    excel_options = {
+        path: (read_options if path.lower().endswith(('.xlsx', '.xls')) else None) for _, path in files
+    }
+    if app.config['BATCH_WORKERS'] <= 0 or len(files) == 1:
+        for name, path in files:
+            try:
+                results[name] = parse_batch_file(path, excel_options[path])
+            except Exception as e:
+                errors[name] = str(e)
+        return results, errors
+    from concurrent.futures.process import BrokenProcessPool
+    executor = _get_batch_executor()
+    futures = {name: executor.submit(parse_batch_file, path, excel_options[path]) for name, path in files}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except BrokenProcessPool as e:
+            with _batch_executor_lock:
+                _batch_executor = None  # Start a fresh pool for the next batch
+            errors[name] = f'Worker failed: {str(e) or e.__class__.__name__}'
+        except Exception as e:
+            errors[name] = str(e)
+    return results, errors
+
+
+def submit_job(kind, ds, config):
+    """Record a job and hand it to the worker pool; returns the Job row"""
+    if kind == 'clean':
+        steps = DataProcessor.pipeline_steps(config)
+    else:
+        steps = ['report']
+    job = Job(
+        id=uuid4().hex,
+        kind=kind,
+        dataset_id=ds.id,
+        user_id=_current_user_id(),
+        status='queued',
+        config=config,
+        progress=[{'step': step, 'status': 'pending', 'cached': False} for step in steps]
+    )
+    db.session.add(job)
+    db.session.commit()
+    try:
+        if app.config['JOB_WORKERS'] > 0:
+            future = _get_job_executor().submit(run_job, job.id)
+            future.add_done_callback(lambda f, job_id=job.id: _job_future_done(job_id, f))
+        else:
+            threading.Thread(target=run_job, args=(job.id,), daemon=True).start()
+    except Exception as e:
+        job.status = 'failed'
+        job.error = f'Failed to start job: {str(e)}'
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    return job
+
+
+def _job_future_done(job_id, future):
+    """Mark a job failed if its worker died before recording an outcome"""
+    global _job_executor
+    error = future.exception()
+    if error is None:
+        return
+    from concurrent.futures.process import BrokenProcessPool
+    if isinstance(error, BrokenProcessPool):
+        with _job_executor_lock:
+            _job_executor = None  # Start a fresh pool for the next job
+    with app.app_context():
+        job = db.session.get(Job, job_id)
+        if job is not None and job.status in ('queued', 'running'):
+            job.status = 'failed'
+            job.error = f'Worker failed: {str(error) or error.__class__.__name__}'
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+
+
+def run_job(job_id):
+    """Execute a queued job (runs in a worker process or thread)"""
+    with app.app_context():
+        job = db.session.get(Job, job_id)
+        if job is None or job.status != 'queued':
+            return
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        db.session.commit()
+        try:
+            ds = db.session.get(Dataset, job.dataset_id)
+            if ds is None:
+                raise ValueError('Dataset not found')
+
+            def on_step(step, status, cached):
+                progress = [dict(item) for item in (job.progress or [])]
+                for item in progress:
+                    if item['step'] == step:
+                        item['status'] = status
+                        item['cached'] = cached
+                job.progress = progress
+                db.session.commit()
+
+            with processors.checkout(ds.id, loader=_dataset_loader(ds)) as processor:
+                if processor is None or processor.data is None:
+                    raise ValueError('No dataset loaded. Please upload a CSV/Excel file first.')
+                if job.kind == 'clean':
+                    result = processor.run_pipeline(job.config or {}, on_step=on_step)
+                    result_path = os.path.join(app.config['JOB_FOLDER'], f"{job.id}.json")
+                    with open(result_path, 'w', encoding='utf-8') as fh:
+                        json.dump({
+                            'success': True,
+                            'dataset_id': ds.id,
+                            'cleaning_log': result['cleaning_log'],
+                            'estimates': result['estimates'],
+                            'domain_estimates': result['domain_estimates'],
+                            'plots': result['plots'],
+                            'pipeline': result['steps']
+                        }, fh, default=str)
+                    record_run(ds.id, job.user_id, job.config, result)
+                    # Web workers replay this config to pick up the cleaned state
+                    processors.publish(ds.id, job.config)
+                else:
+                    on_step('report', 'running', False)
+                    report_format = (job.config or {}).get('format', 'pdf')
+                    report_path, _ = cached_report(ds, processor, report_format, bool((job.config or {}).get('include_plots')))
+                    # Copied so the job result outlives eviction from the report cache
+                    result_path = os.path.join(app.config['JOB_FOLDER'], f"{job.id}{os.path.splitext(report_path)[1]}")
+                    shutil.copyfile(report_path, result_path)
+                    db.session.add(ReportRecord(dataset_id=ds.id, user_id=job.user_id, format=report_format))
+                    on_step('report', 'done', False)
+            job.result_path = result_path
+            job.status = 'succeeded'
+        except Exception as e:
+            db.session.rollback()
+            job.status = 'failed'
+            job.error = f"{e.step}: {str(e)}" if isinstance(e, PipelineStepError) else str(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+
+
+def record_run(ds_id, user_id, config, result):
+    """Add a ProcessingRun for a pipeline ``result`` to the session, its outputs offloaded to the artifact store"""
+    run = ProcessingRun(dataset_id=ds_id, user_id=user_id, plots_count=len(result['plots']), success=True)
+    run.store_artifacts({
+        'config': config or {},
+        'cleaning_log': result['cleaning_log'],
+        'estimates': result['estimates'],
+        'domain_estimates': result['domain_estimates'],
+        'plots': result['plots'],
+    })
+    db.session.add(run)
+    return run
+
+
+def _wants_async(data):
+    flag = (data or {}).get('async', request.args.get('async'))
+    return str(flag).lower() in ('1', 'true', 'yes')
+
+
+def _dataset_loader(ds):
+    """Build a registry loader that re-reads the dataset file from disk"""
+    def loader(processor):
+        if ds is None or not ds.filepath or not os.path.exists(ds.filepath):
+            return False
+        return processor.load_data(ds.filepath, read_options=ds.read_options, content_hash=ds.content_hash)
+    return loader
+
+def report_etag(ds, processor, report_format, include_plots=False):
+    """ETag of the report ``processor`` would render now for dataset ``ds``"""
+    extension = 'pdf' if report_format == 'pdf' else 'html'
+    return f"{ds.id}-{processor.report_key(extension, include_plots=include_plots)}"
+
+
+def cached_report(ds, processor, report_format, include_plots=False):
+    """Return ``(path, etag)`` of the rendered report, rendering it only on a cache miss
+
+    Files live in REPORT_CACHE_FOLDER as ``<etag>.<pdf|html>``, so every worker
+    and job process shares them; the least recently used beyond
+    REPORT_CACHE_SIZE are removed. A miss is rendered straight into a spool
+    file next to the cache entry, never into memory.
+    """
+    etag = report_etag(ds, processor, report_format, include_plots)
+    extension = 'pdf' if report_format == 'pdf' else 'html'
+    folder = app.config['REPORT_CACHE_FOLDER']
+    path = os.path.join(folder, f"{etag}.{extension}")
+    if os.path.exists(path):
+        try:
+            os.utime(path)  # mark as recently used
+            return path, etag
+        except OSError:
+            pass  # evicted meanwhile; render it again
+    tmp_path = f"{path}.{uuid4().hex}.tmp"
+    try:
+        processor.generate_report(format=report_format, output=tmp_path, include_plots=include_plots)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    _prune_report_cache(folder, keep=path)
+    return path, etag
+
+
+def _stream_html_json(fh, chunk_chars=64 * 1024):
+    """Yield ``{"html_content": ...}`` from an open HTML file without reading it into memory at once"""
+    yield '{"html_content": "'
+    with fh:
+        while True:
+            chunk = fh.read(chunk_chars)
+            if not chunk:
+                break
+            yield json.dumps(chunk)[1:-1]
+    yield '"}'
+
+
+def _prune_report_cache(folder, keep=None):
+    try:
+        entries = [entry for entry in os.scandir(folder) if entry.name.endswith(('.pdf', '.html'))]
+    except OSError:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[max(1, app.config['REPORT_CACHE_SIZE']):]:
+        if entry.path == keep:
+            continue
+        try:
+            os.unlink(entry.path)
+        except OSError:
+            pass
 
 # Removed conflicting route - React app will handle root
 
@@ -783,61 +2193,188 @@ def logout():
 # Deprecated duplicate JSON-only login/logout removed (handled above by GET/POST routes)
 
 
+# Aggregate counts for the admin dashboard, refreshed at most every ADMIN_COUNTS_TTL seconds per worker
+_admin_counts = {'at': 0.0, 'counts': None}
+_admin_counts_lock = threading.Lock()
+
+
+def admin_counts(max_age=None):
+    """Row counts of the catalog tables, cached for ``max_age`` seconds (default ADMIN_COUNTS_TTL)"""
+    max_age = app.config['ADMIN_COUNTS_TTL'] if max_age is None else max_age
+    with _admin_counts_lock:
+        if _admin_counts['counts'] is not None and time.time() - _admin_counts['at'] < max_age:
+            return _admin_counts['counts']
+    tables = {'users': User, 'datasets': Dataset, 'runs': ProcessingRun, 'reports': ReportRecord}
+    # One round trip: a scalar COUNT(*) subquery per table
+    row = db.session.execute(db.select(*[
+        db.select(db.func.count()).select_from(model).scalar_subquery().label(name) for name, model in tables.items()
+    ])).one()
+    counts = dict(row._mapping)
+    with _admin_counts_lock:
+        _admin_counts.update(at=time.time(), counts=counts)
+    return counts
+
+
+def _page_limit(default):
+    try:
+        limit = int(request.args.get('limit', default))
+    except (TypeError, ValueError):
+        raise ValueError('limit must be a number')
+    return max(1, min(limit, app.config['ADMIN_MAX_PAGE_SIZE']))
+
+
+def _keyset_page(query, model, limit, cursor=None):
+    """One page of ``query``, newest first, and the cursor of the next page (None on the last)
+
+    The cursor is the id of the last row returned, so a page costs one index
+    range scan however deep it is (no OFFSET) and rows added meanwhile never
+    shift later pages.
+    """
+    if cursor not in (None, ''):
+        try:
+            query = query.filter(model.id < int(cursor))
+        except (TypeError, ValueError):
+            raise ValueError('Invalid cursor')
+    rows = query.order_by(model.id.desc()).limit(limit + 1).all()
+    next_cursor = str(rows[limit - 1].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def _like(term):
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def _users_query(args):
+    from sqlalchemy import or_
+    query = User.query.options(db.load_only(
+        User.id, User.username, User.email, User.role, User.profile_image, User.created_at
+    ))
+    term = (args.get('q') or '').strip()
+    if term:
+        query = query.filter(or_(User.username.ilike(_like(term), escape='\\'), User.email.ilike(_like(term), escape='\\')))
+    if args.get('role'):
+        query = query.filter(User.role == args['role'])
+    return query
+
+
+def _datasets_query(args):
+    query = Dataset.query.options(
+        db.load_only(Dataset.id, Dataset.filename, Dataset.rows, Dataset.columns, Dataset.uploaded_at, Dataset.owner_id),
+        db.joinedload(Dataset.owner).load_only(User.username, User.profile_image)
+    )
+    term = (args.get('q') or '').strip()
+    if term:
+        query = query.filter(Dataset.filename.ilike(_like(term), escape='\\'))
+    if args.get('owner'):
+        query = query.filter(Dataset.owner.has(User.username == args['owner']))
+    return query
+
+
+def _runs_query(args):
+    # The JSON columns (config, cleaning_log, estimates) are never loaded for the listing
+    query = ProcessingRun.query.options(
+        db.load_only(ProcessingRun.id, ProcessingRun.success, ProcessingRun.plots_count, ProcessingRun.created_at,
+                     ProcessingRun.dataset_id, ProcessingRun.user_id),
+        db.joinedload(ProcessingRun.dataset).load_only(Dataset.filename),
+        db.joinedload(ProcessingRun.user).load_only(User.username, User.profile_image)
+    )
+    term = (args.get('q') or '').strip()
+    if term:
+        query = query.filter(ProcessingRun.dataset.has(Dataset.filename.ilike(_like(term), escape='\\')))
+    if args.get('success') in ('true', 'false'):
+        query = query.filter(ProcessingRun.success == (args['success'] == 'true'))
+    return query
+
+
+def _user_row(u):
+    return {
+        'id': u.id,
+        'username': u.username,
+        'email': u.email,
+        'role': u.role,
+        'profile_image': u.profile_image,
+        'created_at': u.created_at.isoformat() if u.created_at else None
+    }
+
+
+def _dataset_row(d):
+    return {
+        'id': d.id,
+        'filename': d.filename,
+        'rows': d.rows,
+        'columns': d.columns,
+        'owner': (d.owner.username if d.owner else None),
+        'owner_profile_image': (d.owner.profile_image if d.owner else None),
+        'uploaded_at': d.uploaded_at.isoformat() if d.uploaded_at else None
+    }
+
+
+def _run_row(r):
+    return {
+        'id': r.id,
+        'dataset': (r.dataset.filename if r.dataset else None),
+        'user': (r.user.username if r.user else None),
+        'user_profile_image': (r.user.profile_image if r.user else None),
+        'success': r.success,
+        'plots_count': r.plots_count,
+        'created_at': r.created_at.isoformat() if r.created_at else None
+    }
+
+
+# Admin listings: (query builder, row serializer, default page size)
+_ADMIN_LISTINGS = {
+    'users': (_users_query, _user_row, 'ADMIN_PAGE_SIZE'),
+    'datasets': (_datasets_query, _dataset_row, 'ADMIN_RECENT_SIZE'),
+    'runs': (_runs_query, _run_row, 'ADMIN_RECENT_SIZE'),
+}
+_ADMIN_MODELS = {'users': User, 'datasets': Dataset, 'runs': ProcessingRun}
+
+
+def _admin_page(kind, args, cursor=None, limit=None):
+    build, row, size_key = _ADMIN_LISTINGS[kind]
+    rows, next_cursor = _keyset_page(build(args), _ADMIN_MODELS[kind], limit or app.config[size_key], cursor)
+    return [row(item) for item in rows], next_cursor
+
+
 @app.route('/admin/summary')
 @login_required
 @admin_required
 def admin_summary():
-    users_count = User.query.count()
-    datasets_count = Dataset.query.count()
-    runs_count = ProcessingRun.query.count()
-    reports_count = ReportRecord.query.count()
-    latest_datasets = Dataset.query.order_by(Dataset.uploaded_at.desc()).limit(10).all()
-    recent_runs = ProcessingRun.query.order_by(ProcessingRun.created_at.desc()).limit(10).all()
-    all_users = User.query.order_by(User.created_at.desc()).all()
-    payload = {
-        'users': users_count,
-        'datasets': datasets_count,
-        'runs': runs_count,
-        'reports': reports_count,
-        'latest': [
-            {
-                'id': d.id,
-                'filename': d.filename,
-                'rows': d.rows,
-                'columns': d.columns,
-                'owner': (d.owner.username if d.owner else None),
-                'owner_profile_image': (d.owner.profile_image if d.owner else None),
-                'uploaded_at': d.uploaded_at.isoformat()
-            }
-            for d in latest_datasets
-        ],
-        'recent_runs': [
-            {
-                'id': r.id,
-                'dataset': (r.dataset.filename if r.dataset else None),
-                'user': (r.user.username if r.user else None),
-                'user_profile_image': (r.user.profile_image if r.user else None),
-                'success': r.success,
-                'plots_count': r.plots_count,
-                'created_at': r.created_at.isoformat()
-            }
-            for r in recent_runs
-        ],
-        'all_users': [
-            {
-                'id': u.id,
-                'username': u.username,
-                'email': u.email,
-                'role': u.role,
-                'profile_image': u.profile_image,
-                'created_at': u.created_at.isoformat() if u.created_at else None
-            }
-            for u in all_users
-        ]
-    }
+    """Dashboard counts plus the first page of users, uploads and runs
+
+    Counts come from admin_counts (cached); each list is one query with its
+    relationships joined in. Further pages come from /admin/users,
+    /admin/datasets and /admin/runs using the returned ``next_cursors``.
+    """
+    latest, latest_cursor = _admin_page('datasets', {})
+    recent_runs, runs_cursor = _admin_page('runs', {})
+    users, users_cursor = _admin_page('users', {})
+    payload = dict(admin_counts())
+    payload.update({
+        'latest': latest,
+        'recent_runs': recent_runs,
+        'all_users': users,
+        'next_cursors': {'latest': latest_cursor, 'recent_runs': runs_cursor, 'all_users': users_cursor}
+    })
     return jsonify(payload)
 
 
+@app.route('/admin/<any(users, datasets, runs):kind>')
+@login_required
+@admin_required
+def admin_listing(kind):
+    """Paginated, filterable listing: ``cursor``, ``limit`` and ``q`` (username/email, filename or
+    run dataset filename); ``role`` for users, ``owner`` for datasets, ``success`` for runs"""
+    try:
+        items, next_cursor = _admin_page(kind, request.args, request.args.get('cursor'), _page_limit(
+            app.config[_ADMIN_LISTINGS[kind][2]]
+        ))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'items': items, 'next_cursor': next_cursor})
+
+
 @app.route('/admin')
 @login_required
 @admin_required
@@ -916,207 +2453,525 @@ def me():
         return jsonify({'authenticated': True, 'user': {'id': current_user.id, 'username': current_user.username, 'role': current_user.role, 'email': current_user.email, 'profile_image': current_user.profile_image}})
     return jsonify({'authenticated': False})
 
+def _save_upload_stream(stream, filepath):
+    """Copy an upload stream to disk in fixed-size chunks (never buffers the whole file)
+
+    Returns the SHA-256 of the contents, computed in the same pass.
+    """
+    chunk_size = app.config['UPLOAD_CHUNK_BYTES']
+    digest = hashlib.sha256()
+    with open(filepath, 'wb') as out:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            out.write(chunk)
+    return digest.hexdigest()
+
+
+def _stored_upload(content_hash, extension):
+    """Dataset whose stored file has these contents and file extension, or None
+
+    UPLOAD_DEDUP limits the search to the signed-in user's own datasets
+    ('user'), widens it to every dataset ('global') or turns it off. Stored
+    files are never deleted while a dataset points to them, so several
+    datasets can share one.
+    """
+    scope = app.config['UPLOAD_DEDUP']
+    owner_id = _current_user_id()
+    if scope not in ('global', 'user') or (scope == 'user' and owner_id is None):
+        return None
+    try:
+        query = (Dataset.query.options(db.load_only(Dataset.filepath, Dataset.owner_id))
+                 .filter(Dataset.content_hash == content_hash))
+        if scope == 'user':
+            query = query.filter(Dataset.owner_id == owner_id)
+        for ds in query.order_by(Dataset.id.desc()).limit(10):
+            if os.path.splitext(ds.filepath)[1].lower() == extension and os.path.exists(ds.filepath):
+                return ds
+    except SQLAlchemyError as e:
+        # e.g. dataset.content_hash missing because migrations have not run
+        db.session.rollback()
+        app.logger.warning('Upload deduplication skipped: %s', e)
+    return None
+
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
-    if 'file' not in request.files:
-        return jsonify({'error': 'No file provided'}), 400
-    
-    file = request.files['file']
-    if file.filename == '':
+    # Raw-body uploads (Content-Type: application/octet-stream, ?filename=survey.csv) are
+    # streamed straight to disk; multipart uploads are spooled by Werkzeug and copied in chunks
+    raw_upload = not request.mimetype.startswith('multipart/') and request.args.get('filename')
+    if raw_upload:
+        file = None
+        client_name = request.args.get('filename', '')
+    else:
+        if 'file' not in request.files:
+            return jsonify({'error': 'No file provided'}), 400
+        file = request.files['file']
+        client_name = file.filename
+    if client_name == '':
         return jsonify({'error': 'No file selected'}), 400
     
-    if file and allowed_file(file.filename):
-        original_name = secure_filename(file.filename)
+    if allowed_file(client_name):
+        read_options = None
+        if client_name.lower().endswith(('.xlsx', '.xls')):
+            # Sheet and header row may come as form fields or query parameters
+            try:
+                read_options = excel_reader.normalize_options(
+                    sheet=request.values.get('sheet'), header_row=request.values.get('header_row')
+                )
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        original_name = secure_filename(client_name)
         unique_prefix = datetime.now().strftime('%Y%m%d%H%M%S') + '_' + uuid4().hex[:8]
         filename = f"{unique_prefix}_{original_name}"
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        if raw_upload:
+            content_hash = _save_upload_stream(request.stream, filepath)
+        else:
+            content_hash = _save_upload_stream(file.stream, filepath)
+        # An identical file is already stored: point at it so its parse snapshot is reused
+        stored = _stored_upload(content_hash, os.path.splitext(filepath)[1].lower())
+        if stored is not None:
+            os.remove(filepath)
+            filepath = stored.filepath
         
-        # Load data
-        if processor.load_data(filepath):
+        processor = DataProcessor()
+        # Large CSVs are summarized in one chunked pass; the full frame is loaded on first /clean
+        streamed = (
+            filepath.endswith('.csv')
+            and os.path.getsize(filepath) > app.config['STREAMING_THRESHOLD_MB'] * 1024 * 1024
+        )
+        if streamed:
+            try:
+                summary = processor.summarize_file(filepath)
+            except Exception:
+                return jsonify({'error': 'Failed to load data'}), 400
+        elif processor.load_data(filepath, read_options=read_options, content_hash=content_hash):
             # Get initial data summary (guard against unexpected errors)
             try:
-                # Track dataset in DB (if DB is initialized)
-                try:
-                    rows_count = len(processor.data)
-                    cols_count = len(processor.data.columns)
-                    ds = Dataset(
-                        filename=filename,
-                        filepath=filepath,
-                        rows=rows_count,
-                        columns=cols_count,
-                        owner_id=(current_user.id if hasattr(current_user, 'id') and current_user.is_authenticated else None)
-                    )
-                    db.session.add(ds)
-                    db.session.commit()
-                except Exception:
-                    db.session.rollback()
-                    # Non-fatal: continue without recording
-                    pass
-                summary = {
-                    'rows': len(processor.data),
-                    'columns': len(processor.data.columns),
-                    'column_names': processor.data.columns.tolist(),
-                    'data_types': processor.data.dtypes.astype(str).to_dict(),
-                    'missing_values': processor.detect_missing_values()
-                }
-                # Return dataset_id if available so clients can include it in follow-up requests
-                try:
-                    ds_id = ds.id
-                except Exception:
-                    ds_id = None
-                return jsonify({'success': True, 'summary': summary, 'dataset_id': ds_id})
+                summary = _data_summary(processor)
+                if read_options is not None:
+                    summary['sheet'] = read_options['sheet']
+                    summary['sheets'] = excel_reader.sheet_names(filepath)
             except Exception as e:
                 return jsonify({'error': f'Failed to summarize data: {str(e)}'}), 400
         else:
-            return jsonify({'error': 'Failed to load data'}), 400
+            # load_data logs the reason (e.g. an unknown sheet name) as its last entry
+            reason = processor.cleaning_log[-1] if processor.cleaning_log else ''
+            return jsonify({'error': 'Failed to load data', 'details': reason}), 400
+
+        ds_id = _register_upload(
+            filename, filepath, summary, None if streamed else processor, read_options, content_hash
+        )
+        return jsonify({
+            'success': True,
+            'summary': summary,
+            'dataset_id': ds_id,
+            'streamed': bool(streamed),
+            # Reported only for the caller's own files: never reveal what other users uploaded
+            'deduplicated': stored is not None and stored.owner_id is not None and stored.owner_id == _current_user_id()
+        })
     
     return jsonify({'error': 'Invalid file type'}), 400
 
+
+@app.route('/upload_batch', methods=['POST'])
+def upload_batch():
+    """Combine several survey files, or ZIP archives of them, into one dataset
+
+    Files come as repeated multipart ``files`` fields and are parsed in
+    parallel by the batch worker pool. Every file must have the same columns
+    with the same numeric/text types (order may differ). The combined rows
+    are tagged with their file name in ``source_file``. ``sheet`` and
+    ``header_row`` apply to every Excel file.
+    """
+    uploads = [upload for upload in request.files.getlist('files') + request.files.getlist('file') if upload.filename]
+    if not uploads:
+        return jsonify({'error': 'No files provided'}), 400
+    read_options = None
+    if any(not upload.filename.lower().endswith('.csv') for upload in uploads):
+        try:
+            read_options = excel_reader.normalize_options(
+                sheet=request.values.get('sheet'), header_row=request.values.get('header_row')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    max_files = app.config['BATCH_MAX_FILES']
+    unique_prefix = datetime.now().strftime('%Y%m%d%H%M%S') + '_' + uuid4().hex[:8]
+    batch_folder = os.path.join(app.config['BATCH_FOLDER'], unique_prefix)
+    os.makedirs(batch_folder, exist_ok=True)
+    try:
+        files = []
+        for upload in uploads:
+            path = os.path.join(batch_folder, batch_upload.unique_name(secure_filename(upload.filename) or 'upload', batch_folder))
+            if batch_upload.is_archive(upload.filename):
+                _save_upload_stream(upload.stream, path)
+                try:
+                    files.extend(batch_upload.extract_archive(
+                        path, batch_folder, max_files - len(files),
+                        app.config['BATCH_MAX_UNCOMPRESSED_MB'] * 1024 * 1024
+                    ))
+                except ValueError as e:
+                    return jsonify({'error': str(e)}), 400
+                os.remove(path)
+            elif allowed_file(upload.filename):
+                _save_upload_stream(upload.stream, path)
+                files.append((upload.filename, path))
+            else:
+                return jsonify({'error': f'Invalid file type: {upload.filename}'}), 400
+        if not files:
+            return jsonify({'error': 'No CSV or Excel files found in the upload'}), 400
+        if len(files) > max_files:
+            return jsonify({'error': f'{len(files)} files uploaded; the limit is {max_files}'}), 400
+        # Names label rows in source_file, so two uploads with the same name are told apart
+        seen = {}
+        for index, (name, path) in enumerate(files):
+            seen[name] = seen.get(name, 0) + 1
+            if seen[name] > 1:
+                files[index] = (f"{name} ({seen[name]})", path)
+        names = [name for name, _ in files]
+
+        results, errors = _parse_batch(files, read_options)
+        if errors:
+            return jsonify({'error': 'Failed to load data', 'details': errors}), 400
+        aligned = batch_upload.align_numeric_columns([results[name][0] for name in names])
+        conflicts = batch_upload.schema_conflicts(
+            [(name, batch_upload.column_kinds(results[name][0])) for name in names]
+        )
+        if conflicts:
+            return jsonify({'error': 'Files do not share the same columns', 'details': conflicts}), 400
+
+        combined = batch_upload.combine([results[name][0] for name in names], names)
+        parse_log = [f"{name}: {entry}" for name in names for entry in results[name][1]]
+        if aligned:
+            parse_log.append(f"Converted {aligned} text columns to numbers to match the other files")
+        parse_log.append(f"Combined {len(names)} files: {len(combined)} rows")
+        file_rows = [{'name': name, 'rows': len(results[name][0])} for name in names]
+        del results
+        filename = f"{unique_prefix}_batch_{len(names)}_files.csv"
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        combined.to_csv(filepath, index=False)
+        # A reload of the CSV must give source_file back as the same categorical
+        combined_options = None
+        if combined[batch_upload.SOURCE_COLUMN].dtype.name == 'category':
+            combined_options = {
+                'categories': {batch_upload.SOURCE_COLUMN: combined[batch_upload.SOURCE_COLUMN].cat.categories.tolist()}
+            }
+        processor = DataProcessor()
+        processor.load_frame(combined, filepath, parse_log, read_options=combined_options)
+        try:
+            summary = _data_summary(processor)
+        except Exception as e:
+            return jsonify({'error': f'Failed to summarize data: {str(e)}'}), 400
+        summary['files'] = file_rows
+    finally:
+        shutil.rmtree(batch_folder, ignore_errors=True)
+
+    ds_id = _register_upload(filename, filepath, summary, processor, combined_options)
+    return jsonify({'success': True, 'summary': summary, 'dataset_id': ds_id, 'streamed': False})
+
+
+def _data_summary(processor):
+    """Upload summary of the data loaded into ``processor``"""
+    return {
+        'rows': len(processor.data),
+        'columns': len(processor.data.columns),
+        'column_names': processor.data.columns.tolist(),
+        'data_types': processor.data.dtypes.astype(str).to_dict(),
+        'missing_values': processor.detect_missing_values(),
+        'plots': processor.sketch.to_plots() if processor.sketch is not None else {}
+    }
+
+
+def _register_upload(filename, filepath, summary, processor=None, read_options=None, content_hash=None):
+    """Record an uploaded dataset and make it this session's dataset; returns its id (None without a DB)
+
+    ``processor`` (None for streamed uploads, which load on first use) is put
+    in the registry so the next request does not parse the file again.
+    """
+    # Track dataset in DB (if DB is initialized)
+    ds = None
+    try:
+        ds = Dataset(
+            filename=filename,
+            filepath=filepath,
+            rows=summary['rows'],
+            columns=summary['columns'],
+            owner_id=_current_user_id(),
+            read_options=read_options,
+            content_hash=content_hash
+        )
+        db.session.add(ds)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        ds = None
+        # Non-fatal: continue without recording
+        pass
+    # Return dataset_id if available so clients can include it in follow-up requests
+    ds_id = ds.id if ds is not None else None
+    if ds_id is not None:
+        if processor is not None:
+            processors.put(ds_id, processor)
+        session['dataset_id'] = ds_id
+        # Uploads this session may use without an owner (anonymous uploads), most recent last
+        session['dataset_ids'] = (session.get('dataset_ids') or [])[-49:] + [ds_id]
+    return ds_id
+
 @app.route('/clean', methods=['POST'])
 def clean_data():
     data = request.json or {}
-    # Ensure data is loaded in this process; on Render free, only one worker is used, but guard anyway
-    if processor.data is None:
-        try:
-            dataset_id = data.get('dataset_id')
-            ds = None
-            if dataset_id is not None:
-                ds = Dataset.query.get(dataset_id)
-            if ds is None:
-                ds = Dataset.query.order_by(Dataset.uploaded_at.desc()).first()
-            if ds and ds.filepath and os.path.exists(ds.filepath):
-                processor.load_data(ds.filepath)
-        except Exception:
-            ds = None
-        if processor.data is None:
-            return jsonify({'error': 'No dataset loaded. Please upload a CSV/Excel file first.'}), 400
+    ds, error = _resolve_dataset(data)
+    if error:
+        return error
+    if ds is None:
+        return jsonify({'error': 'No dataset loaded. Please upload a CSV/Excel file first.'}), 400
     cleaning_config = data.get('config', {})
-    
-    try:
-        # Missing value imputation
-        if 'imputation' in cleaning_config:
-            method = cleaning_config['imputation'].get('method', 'mean')
-            columns = cleaning_config['imputation'].get('columns', None)
-            processor.impute_missing_values(method=method, columns=columns)
-        
-        # Outlier detection and handling
-        if 'outliers' in cleaning_config:
-            detection_method = cleaning_config['outliers'].get('detection_method', 'iqr')
-            handling_method = cleaning_config['outliers'].get('handling_method', 'winsorize')
-            columns = cleaning_config['outliers'].get('columns', None)
-            
-            outliers_report = processor.detect_outliers(method=detection_method)
-            processor.handle_outliers(method=handling_method, columns=columns)
-        
-        # Apply weights
-        if 'weights' in cleaning_config:
-            weight_column = cleaning_config['weights'].get('column', None)
-            if weight_column:
-                processor.apply_weights(weight_column)
-        
-        # Calculate estimates (guard when specific columns are provided but missing)
-        estimate_columns = cleaning_config.get('estimate_columns', None)
-        try:
-            estimates = processor.calculate_estimates(columns=estimate_columns)
-        except Exception as calc_error:
-            return jsonify({'error': f'Failed to calculate estimates: {str(calc_error)}'}), 400
-        
-        # Generate visualizations
-        try:
-            plots = processor.generate_visualizations()
-        except Exception:
-            # Non-fatal for processing; continue without plots
-            plots = {}
+    if _wants_async(data):
+        job = submit_job('clean', ds, cleaning_config)
+        return jsonify({'success': True, 'job_id': job.id, 'status_url': f'/jobs/{job.id}'}), 202
 
-        # Persist processing run details
+    # Only this dataset is locked, other datasets are processed in parallel
+    with processors.checkout(ds.id, loader=_dataset_loader(ds)) as processor:
+        if processor is None or processor.data is None:
+            return jsonify({'error': 'No dataset loaded. Please upload a CSV/Excel file first.'}), 400
         try:
-            # Attach to the most recent dataset from this session if available
-            ds = Dataset.query.order_by(Dataset.uploaded_at.desc()).first()
-            run = ProcessingRun(
-                dataset_id=(ds.id if ds else None),
-                user_id=(current_user.id if hasattr(current_user, 'id') and current_user.is_authenticated else None),
-                config=cleaning_config,
-                cleaning_log=processor.cleaning_log,
-                estimates=estimates,
-                plots_count=len(plots),
-                success=True
-            )
-            db.session.add(run)
-            db.session.commit()
-        except Exception:
-            db.session.rollback()
-            pass
+            result = processor.run_pipeline(cleaning_config)
+        except PipelineStepError as step_error:
+            if step_error.step == 'estimates':
+                return jsonify({'error': f'Failed to calculate estimates: {str(step_error)}'}), 400
+            if step_error.step == 'domains':
+                return jsonify({'error': f'Failed to calculate domain estimates: {str(step_error)}'}), 400
+            return jsonify({'error': f'Processing failed: {str(step_error)}'}), 400
+        except Exception as e:
+            # Ensure we always return JSON, never HTML error pages
+            return jsonify({'error': f'Processing failed: {str(e)}'}), 400
+        # Other web workers replay this config to pick up the cleaned state
+        processors.publish(ds.id, cleaning_config)
+    cleaning_log = result['cleaning_log']
+    estimates = result['estimates']
+    plots = result['plots']
+
+    # Persist processing run details
+    run_id = None
+    try:
+        run = record_run(ds.id, _current_user_id(), cleaning_config, result)
+        db.session.commit()
+        run_id = run.id
+    except Exception:
+        db.session.rollback()
 
-        return jsonify({
-            'success': True,
-            'cleaning_log': processor.cleaning_log,
-            'estimates': estimates,
-            'plots': plots
-        })
-    
-    except Exception as e:
-        # Ensure we always return JSON, never HTML error pages
-        return jsonify({'error': f'Processing failed: {str(e)}'}), 400
+    return jsonify({
+        'success': True,
+        'dataset_id': ds.id,
+        'cleaning_log': cleaning_log,
+        'estimates': estimates,
+        'domain_estimates': result['domain_estimates'],
+        'plots': plots,
+        'pipeline': result['steps'],
+        'run_id': run_id
+    })
 
 @app.route('/report', methods=['POST'])
 def generate_report():
-    data = request.json
+    data = request.json or {}
     report_format = data.get('format', 'pdf')
+    include_plots = bool(data.get('include_plots', False))
+    ds, error = _resolve_dataset(data)
+    if error:
+        return error
+    
+    if ds is not None and _wants_async(data):
+        job = submit_job('report', ds, {'format': report_format, 'include_plots': include_plots})
+        return jsonify({'success': True, 'job_id': job.id, 'status_url': f'/jobs/{job.id}'}), 202
     
     try:
-        report_content = processor.generate_report(format=report_format)
+        if ds is None:
+            return jsonify({'error': 'No dataset loaded. Please upload a CSV/Excel file first.'}), 400
+        with processors.checkout(ds.id, loader=_dataset_loader(ds)) as processor:
+            if processor is None or processor.data is None:
+                return jsonify({'error': 'No dataset loaded. Please upload a CSV/Excel file first.'}), 400
+            etag = report_etag(ds, processor, report_format, include_plots)
+            if request.if_none_match.contains(etag):
+                # The client already holds this exact report
+                response = make_response('', 304)
+                response.set_etag(etag)
+                return response
+            report_path, etag = cached_report(ds, processor, report_format, include_plots)
         
         if report_format == 'pdf':
-            # Ensure a valid PDF bytes response
-            pdf_bytes = report_content.getvalue() if hasattr(report_content, 'getvalue') else bytes(report_content)
-            return send_file(
-                io.BytesIO(pdf_bytes),
+            response = send_file(
+                os.path.abspath(report_path),
                 mimetype='application/pdf',
                 as_attachment=True,
-                download_name=f'survey_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
+                download_name=f'survey_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf',
+                etag=etag
             )
         else:
-            return jsonify({'html_content': report_content})
+            # Opened now so cache eviction cannot remove the file before it is sent
+            response = app.response_class(_stream_html_json(open(report_path, 'r', encoding='utf-8')), mimetype='application/json')
+            response.set_etag(etag)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
-    finally:
-        # Log the report generation attempt
-        try:
-            ds = Dataset.query.order_by(Dataset.uploaded_at.desc()).first()
-            rec = ReportRecord(
-                dataset_id=(ds.id if ds else None),
-                user_id=(current_user.id if hasattr(current_user, 'id') and current_user.is_authenticated else None),
-                format=report_format
-            )
-            db.session.add(rec)
-            db.session.commit()
-        except Exception:
-            db.session.rollback()
-            pass
+    # Log only reports actually sent; 304 revalidations and failures are not recorded
+    try:
+        db.session.add(ReportRecord(dataset_id=ds.id, user_id=_current_user_id(), format=report_format))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+    return response
 
 @app.route('/download_data', methods=['POST'])
 def download_processed_data():
     try:
-        if processor.data is not None:
-            # Stream CSV from memory to avoid leaving temp files on disk
-            csv_buffer = io.StringIO()
-            processor.data.to_csv(csv_buffer, index=False)
-            csv_buffer.seek(0)
-            return send_file(
-                io.BytesIO(csv_buffer.getvalue().encode('utf-8')),
-                mimetype='text/csv',
-                as_attachment=True,
-                download_name=f'processed_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-            )
-        else:
+        params = request.get_json(silent=True) or request.form
+        ds, error = _resolve_dataset(params)
+        if error:
+            return error
+        if ds is None:
             return jsonify({'error': 'No data available'}), 400
+        with processors.checkout(ds.id, loader=_dataset_loader(ds)) as processor:
+            if processor is not None and processor.data is not None:
+                # Pipeline steps replace processor.data rather than mutating it, so
+                # this frame stays consistent while it streams outside the lock
+                frame = processor.data
+            else:
+                return jsonify({'error': 'No data available'}), 400
+        chunks, mimetype, extension = data_export.open_export(
+            frame,
+            fmt=params.get('format', 'csv'),
+            compression=params.get('compression'),
+            chunk_rows=app.config['EXPORT_CHUNK_ROWS']
+        )
+        response = app.response_class(chunks, mimetype=mimetype, direct_passthrough=True)
+        response.headers['Content-Disposition'] = (
+            f'attachment; filename=processed_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}'
+        )
+        return response
     
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+def _job_for_request(job_id):
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return None, (jsonify({'error': 'Job not found'}), 404)
+    if job.user_id is not None and job.user_id != _current_user_id() and getattr(current_user, 'role', 'user') != 'admin':
+        return None, (jsonify({'error': 'Job not found'}), 404)
+    return job, None
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job, error = _job_for_request(job_id)
+    if error:
+        return error
+    return jsonify(job.to_dict())
+
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    job, error = _job_for_request(job_id)
+    if error:
+        return error
+    if job.status != 'succeeded':
+        return jsonify({'error': f'Job is {job.status}', 'job': job.to_dict()}), 409
+    if not job.result_path or not os.path.exists(job.result_path):
+        return jsonify({'error': 'Job result is no longer available'}), 410
+    if job.result_path.endswith('.pdf'):
+        return send_file(
+            os.path.abspath(job.result_path),
+            mimetype='application/pdf',
+            as_attachment=True,
+            download_name=f'survey_report_{job.finished_at.strftime("%Y%m%d_%H%M%S")}.pdf'
+        )
+    if job.result_path.endswith('.html'):
+        return app.response_class(_stream_html_json(open(job.result_path, 'r', encoding='utf-8')), mimetype='application/json')
+    return send_file(os.path.abspath(job.result_path), mimetype='application/json')
+
+
+def _run_for_request(run_id):
+    run = db.session.get(ProcessingRun, run_id)
+    if run is None:
+        return None, (jsonify({'error': 'Run not found'}), 404)
+    if run.user_id is not None and run.user_id != _current_user_id() and getattr(current_user, 'role', 'user') != 'admin':
+        return None, (jsonify({'error': 'Run not found'}), 404)
+    return run, None
+
+
+@app.route('/runs/<int:run_id>')
+def run_details(run_id):
+    """Run metadata and the URLs of its artifacts (nothing large is read)"""
+    run, error = _run_for_request(run_id)
+    if error:
+        return error
+    return jsonify(run.to_dict())
+
+
+@app.route('/runs/<int:run_id>/artifacts/<name>')
+def run_artifact(run_id, name):
+    """One artifact of a run as JSON
+
+    The digest is the ETag and never changes for a given content. Clients
+    that accept gzip receive the stored file as it is, without decompressing
+    it.
+    """
+    run, error = _run_for_request(run_id)
+    if error:
+        return error
+    if name not in ProcessingRun.ARTIFACTS:
+        return jsonify({'error': f"Unknown artifact '{name}'. Use one of: {', '.join(ProcessingRun.ARTIFACTS)}"}), 404
+    entry = (run.artifacts or {}).get(name)
+    if entry is None:
+        try:
+            return jsonify(run.artifact(name))
+        except KeyError:
+            return jsonify({'error': f"Run {run_id} has no {name} artifact"}), 404
+    digest = entry['digest']
+    if request.if_none_match.contains(digest):
+        return '', 304
+    if not run_artifacts.exists(digest):
+        return jsonify({'error': 'Artifact is no longer available'}), 410
+    if 'gzip' in request.accept_encodings:
+        response = send_file(run_artifacts.open_compressed(digest), mimetype='application/json', etag=digest, conditional=False)
+        response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Content-Length'] = str(entry['stored'])
+    else:
+        response = app.response_class(artifact_store.encode(run.artifact(name)), mimetype='application/json')
+        response.set_etag(digest)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.cache_control.private = True
+    response.cache_control.max_age = 31536000
+    return response
+
+
+@app.cli.command('offload-runs')
+def offload_runs_command():
+    """Move the inline JSON of older processing runs into the artifact store"""
+    moved = 0
+    while True:
+        batch = (ProcessingRun.query
+                 .filter(db.or_(ProcessingRun.config.isnot(None), ProcessingRun.cleaning_log.isnot(None),
+                                ProcessingRun.estimates.isnot(None)))
+                 .order_by(ProcessingRun.id).limit(200).all())
+        if not batch:
+            break
+        for run in batch:
+            run.store_artifacts({
+                name: getattr(run, name) for name in ('config', 'cleaning_log', 'estimates')
+                if getattr(run, name) is not None
+            })
+            # SQL NULL rather than JSON null, so the filter above stops matching the row
+            run.config = run.cleaning_log = run.estimates = db.null()
+        db.session.commit()
+        moved += len(batch)
+    print(f"Offloaded {moved} runs. Run VACUUM on SQLite to return the freed space to the filesystem.")
+
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in {'csv', 'xlsx', 'xls'}
 
@@ -0,0 +1,66 @@
+"""
+Run artifact store for ASDP (AI Survey Data Processor) Application
+Ministry of Statistics and Programme Implementation (MoSPI)
+
+Keeps the bulky outputs of a processing run (estimates, cleaning log, plot
+aggregates) out of the database. Each artifact is serialized as canonical
+JSON, gzip-compressed and written once under its SHA-256 digest. Identical
+artifacts, such as the config or estimates of a re-run, are therefore
+stored once however many runs point to them. The database row keeps only
+the digest and sizes. Files are written to a temporary name and renamed
+into place, so concurrent workers can store the same artifact safely.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from uuid import uuid4
+
+COMPRESS_LEVEL = 6
+
+
+def encode(value):
+    """Canonical JSON bytes for ``value`` (sorted keys, no whitespace), the basis of its digest"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+
+
+class ArtifactStore:
+    """Content-addressed, gzip-compressed JSON files under ``root``"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, digest):
+        # Two-character fan-out keeps directories small
+        return os.path.join(self.root, digest[:2], f"{digest}.json.gz")
+
+    def put(self, value):
+        """Store ``value``; returns ``{'digest', 'bytes', 'stored'}`` (JSON and compressed sizes)"""
+        data = encode(value)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{uuid4().hex[:8]}.tmp"
+            try:
+                with open(tmp_path, 'wb') as fh:
+                    # mtime=0 makes the compressed file depend on the content only
+                    fh.write(gzip.compress(data, compresslevel=COMPRESS_LEVEL, mtime=0))
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        return {'digest': digest, 'bytes': len(data), 'stored': os.path.getsize(path)}
+
+    def exists(self, digest):
+        return os.path.exists(self.path(digest))
+
+    def open_compressed(self, digest):
+        """Binary file object over the stored gzip stream (for sending it as it is)"""
+        return open(self.path(digest), 'rb')
+
+    def get(self, digest):
+        """Decoded value of the artifact ``digest``; raises FileNotFoundError if it is missing"""
+        with gzip.open(self.path(digest), 'rb') as fh:
+            return json.loads(fh.read().decode('utf-8'))
@@ -0,0 +1,159 @@
+"""
+Batch ingestion for ASDP (AI Survey Data Processor) Application
+Ministry of Statistics and Programme Implementation (MoSPI)
+
+Helpers for /upload_batch, which takes several district files (or a ZIP of
+them) from one survey round and registers them as a single dataset. ZIP
+members are extracted with path and size checks. Each file is parsed
+separately, in worker processes. Columns that one file left as text while
+others parsed them as numbers are reconciled. The schemas are then compared
+before anything is combined, and every incompatibility is reported by file
+and column.
+"""
+
+import os
+import zipfile
+
+from werkzeug.utils import secure_filename
+
+import type_inference
+
+BATCH_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+# Column added to the combined frame naming the file each row came from
+SOURCE_COLUMN = 'source_file'
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+def is_archive(filename):
+    return filename.lower().endswith('.zip')
+
+
+def extract_archive(zip_path, dest_folder, max_files, max_bytes):
+    """Extract the survey files in ``zip_path`` into ``dest_folder``; returns ``[(name, path)]``
+
+    Folders, hidden files, macOS resource forks and unsupported extensions are
+    skipped. Member names are flattened with secure_filename, so nothing is
+    written outside ``dest_folder``. Raises ValueError for an unreadable
+    archive, for more than ``max_files`` members, or for more than
+    ``max_bytes`` once uncompressed. Sizes are counted as the data is
+    written, not taken from the archive headers.
+    """
+    try:
+        archive = zipfile.ZipFile(zip_path)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"{os.path.basename(zip_path)} is not a valid ZIP archive") from e
+    extracted = []
+    written = 0
+    with archive:
+        members = []
+        for info in archive.infolist():
+            base = os.path.basename(info.filename)
+            if info.is_dir() or not base or base.startswith('.') or info.filename.startswith('__MACOSX/'):
+                continue
+            if os.path.splitext(base)[1].lower() not in BATCH_EXTENSIONS:
+                continue
+            members.append(info)
+        if len(members) > max_files:
+            raise ValueError(f"Archive holds {len(members)} survey files; the limit is {max_files}")
+        for info in members:
+            name = unique_name(secure_filename(os.path.basename(info.filename)), dest_folder)
+            path = os.path.join(dest_folder, name)
+            with archive.open(info) as source, open(path, 'wb') as out:
+                for chunk in iter(lambda: source.read(COPY_CHUNK_BYTES), b''):
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise ValueError(f"Archive expands beyond {max_bytes // (1024 * 1024)} MB")
+                    out.write(chunk)
+            extracted.append((info.filename, path))
+    return extracted
+
+
+def unique_name(name, folder):
+    """``name``, or ``name`` with a counter before the extension if it already exists in ``folder``"""
+    stem, extension = os.path.splitext(name)
+    candidate = name
+    counter = 1
+    while os.path.exists(os.path.join(folder, candidate)):
+        candidate = f"{stem}_{counter}{extension}"
+        counter += 1
+    return candidate
+
+
+def column_kinds(frame):
+    """``{column: 'numeric' | 'text' | 'empty'}``; all-missing columns are 'empty' and match either kind"""
+    import pandas as pd  # Lazy import
+    kinds = {}
+    for col in frame.columns:
+        series = frame[col]
+        if series.notna().sum() == 0:
+            kinds[col] = 'empty'
+        elif pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            kinds[col] = 'numeric'
+        else:
+            kinds[col] = 'text'
+    return kinds
+
+
+def align_numeric_columns(frames):
+    """Convert text columns to numbers where the same column is numeric in another file
+
+    Each file is coerced on its own, so a district with many blanks can
+    keep "₹45,000" as text while its neighbours were converted. Such a column
+    is converted when at least NUMERIC_THRESHOLD of its non-missing values
+    parse as numbers. Modifies ``frames`` in place and returns the number of
+    columns converted.
+    """
+    kinds = [column_kinds(frame) for frame in frames]
+    numeric = {col for file_kinds in kinds for col, kind in file_kinds.items() if kind == 'numeric'}
+    converted = 0
+    for frame, file_kinds in zip(frames, kinds):
+        for col, kind in file_kinds.items():
+            if kind != 'text' or col not in numeric:
+                continue
+            values = type_inference.parse_numeric(frame[col])
+            present = int(frame[col].notna().sum())
+            if values.notna().sum() >= type_inference.NUMERIC_THRESHOLD * present:
+                frame[col] = values
+                converted += 1
+    return converted
+
+
+def schema_conflicts(schemas):
+    """Differences between each file's columns and the first file's; ``schemas`` is ``[(name, kinds)]``
+
+    Column order may differ between files. Returns a list of messages, which
+    is empty when the files can be combined.
+    """
+    if not schemas:
+        return []
+    reference_name, reference = schemas[0]
+    conflicts = []
+    for name, kinds in schemas[1:]:
+        missing = [col for col in reference if col not in kinds]
+        extra = [col for col in kinds if col not in reference]
+        if missing:
+            conflicts.append(f"{name}: missing columns {', '.join(map(str, missing))} (present in {reference_name})")
+        if extra:
+            conflicts.append(f"{name}: unexpected columns {', '.join(map(str, extra))} (not in {reference_name})")
+        for col, kind in kinds.items():
+            expected = reference.get(col)
+            if expected is None or 'empty' in (kind, expected) or kind == expected:
+                continue
+            conflicts.append(f"{name}: column {col} is {kind} but {expected} in {reference_name}")
+    return conflicts
+
+
+def combine(frames, names):
+    """Stack ``frames`` in the first frame's column order, tagging rows with their file name"""
+    import pandas as pd  # Lazy import
+    columns = list(frames[0].columns)
+    parts = []
+    for frame, name in zip(frames, names):
+        part = frame[columns]
+        if SOURCE_COLUMN not in columns:
+            part = part.assign(**{SOURCE_COLUMN: name})
+        parts.append(part)
+    combined = pd.concat(parts, ignore_index=True)
+    if SOURCE_COLUMN not in columns:
+        combined[SOURCE_COLUMN] = pd.Categorical(combined[SOURCE_COLUMN], categories=list(dict.fromkeys(names)))
+    return combined
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for ASDP (AI Survey Data Processor) Application
+Ministry of Statistics and Programme Implementation (MoSPI)
+
+Usage: python benchmark.py [name ...]   (runs every benchmark when no name is given)
+"""
+
+import math
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, DataProcessor
+
+
+def _timed(func, repeat=3):
+    """Best wall-clock time of ``repeat`` runs, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _survey_frame(rows, cols, missing=0.05, seed=42):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(50, 10, size=(rows, cols))
+    values[rng.random((rows, cols)) < missing] = np.nan
+    frame = pd.DataFrame(values, columns=[f"q{i}" for i in range(cols)])
+    frame['weight'] = rng.uniform(0.5, 2.0, size=rows)
+    return frame
+
+
+def _per_column_estimates(data, weights):
+    """The original column-by-column implementation, kept as the baseline"""
+    estimates = {}
+    for column in data.columns:
+        mean = data[column].mean()
+        std = data[column].std()
+        se = std / math.sqrt(len(data))
+        estimates[column] = {'unweighted': (mean, std, se)}
+        x = data[column]
+        w = pd.to_numeric(weights, errors='coerce')
+        mask = x.notna() & w.notna()
+        x, w = x[mask], w[mask]
+        mask_pos = w > 0
+        x, w = x[mask_pos], w[mask_pos]
+        w_mean = (x * w).sum() / w.sum()
+        w_std = math.sqrt(float((((x - w_mean) ** 2) * w).sum() / w.sum()))
+        estimates[column]['weighted'] = (w_mean, w_std, w_std / math.sqrt(len(x)))
+    return estimates
+
+
+def bench_estimates(rows=100000, column_counts=(10, 50, 200, 500)):
+    """calculate_estimates: batched kernel vs. the per-column loop"""
+    print(f"calculate_estimates on {rows} rows (weighted + unweighted)")
+    print(f"{'columns':>8} {'per-column ms':>15} {'batched ms':>12} {'speedup':>8}")
+    for cols in column_counts:
+        frame = _survey_frame(rows, cols)
+        processor = DataProcessor()
+        processor.data = frame.drop(columns=['weight'])
+        processor.weights = frame['weight']
+        baseline = _timed(lambda: _per_column_estimates(processor.data, processor.weights))
+        batched = _timed(lambda: processor.calculate_estimates())
+        print(f"{cols:>8} {baseline:>15.1f} {batched:>12.1f} {baseline / batched:>7.1f}x")
+
+
+def bench_variance(rows=1000000, cols=10, replicate_counts=(80, 200)):
+    """Design-based SEs: Taylor linearization and replicate weights on a large file"""
+    import survey_stats
+    rng = np.random.default_rng(42)
+    values = rng.normal(50, 10, size=(rows, cols))
+    weights = rng.uniform(0.5, 2.0, size=rows)
+    clusters = rng.integers(0, 2000, size=rows)
+    strata = clusters % 50
+    print(f"Design-based variance on {rows} rows x {cols} columns (50 strata, 2000 PSUs)")
+    ms = _timed(lambda: survey_stats.taylor_variance(values, weights, strata, clusters), repeat=1)
+    print(f"{'taylor':>28} {ms:>10.1f} ms")
+    ms = _timed(lambda: survey_stats.replicate_variance(values, weights, strata=strata, clusters=clusters, method='jackknife'), repeat=1)
+    print(f"{'jackknife (2000 replicates)':>28} {ms:>10.1f} ms")
+    for reps in replicate_counts:
+        ms = _timed(lambda: survey_stats.replicate_variance(values, weights, strata=strata, clusters=clusters, method='bootstrap', n_replicates=reps), repeat=1)
+        print(f"{f'bootstrap ({reps} replicates)':>28} {ms:>10.1f} ms")
+        replicate_weights = weights[:, None] * rng.uniform(0.0, 2.0, size=(rows, reps))
+        ms = _timed(lambda: survey_stats.replicate_variance(values, weights, replicate_weights=replicate_weights, method='bootstrap'), repeat=1)
+        print(f"{f'supplied ({reps} columns)':>28} {ms:>10.1f} ms")
+        del replicate_weights
+
+
+def bench_domains(rows=1000000, cols=10, domain_counts=(10, 1000, 50000)):
+    """calculate_domain_estimates: one sorted pass regardless of the number of domains"""
+    print(f"calculate_domain_estimates on {rows} rows x {cols} columns (weighted + unweighted)")
+    frame = _survey_frame(rows, cols)
+    rng = np.random.default_rng(0)
+    for domains in domain_counts:
+        frame['district'] = rng.integers(0, domains, size=rows)
+        processor = DataProcessor()
+        processor.data = frame.drop(columns=['weight'])
+        processor.weights = frame['weight']
+        ms = _timed(lambda: processor.calculate_domain_estimates('district'), repeat=1)
+        print(f"{domains:>8} domains {ms:>10.1f} ms")
+
+
+def _correlated_frame(rows, cols, missing=0.05, seed=42):
+    """Low-rank survey-like data so neighbours carry information; returns (truth, masked, mask)"""
+    rng = np.random.default_rng(seed)
+    truth = rng.normal(size=(rows, 3)) @ rng.normal(size=(3, cols)) + 0.3 * rng.normal(size=(rows, cols))
+    mask = rng.random((rows, cols)) < missing
+    masked = pd.DataFrame(np.where(mask, np.nan, truth), columns=[f"q{i}" for i in range(cols)])
+    return truth, masked, mask
+
+
+def bench_knn(row_counts=(5000, 20000, 50000), large_rows=1000000, cols=10):
+    """KNN imputation: sklearn KNNImputer vs. approximate complete-case search"""
+    from sklearn.impute import KNNImputer
+    import imputation
+
+    def rmse(filled, truth, mask):
+        return float(np.sqrt(np.mean((filled[mask] - truth[mask]) ** 2)))
+
+    print(f"KNN imputation (k=5), {cols} columns, 5% missing; RMSE on the masked cells")
+    print(f"{'rows':>9} {'KNNImputer ms':>14} {'RMSE':>7} {'approx ms':>10} {'RMSE':>7}")
+    workers = min(4, os.cpu_count() or 1)
+    for rows in list(row_counts) + [large_rows]:
+        truth, masked, mask = _correlated_frame(rows, cols)
+        values = masked.to_numpy()
+        start = time.perf_counter()
+        approx, _ = imputation.knn_impute(values, n_neighbors=5, workers=workers, max_donors=50000)
+        approx_ms = (time.perf_counter() - start) * 1000
+        if rows <= max(row_counts):
+            start = time.perf_counter()
+            exact = KNNImputer(n_neighbors=5).fit_transform(values)
+            exact_ms = (time.perf_counter() - start) * 1000
+            exact_cols = f"{exact_ms:>14.1f} {rmse(exact, truth, mask):>7.3f}"
+        else:
+            exact_cols = f"{'skipped':>14} {'-':>7}"
+        print(f"{rows:>9} {exact_cols} {approx_ms:>10.1f} {rmse(approx, truth, mask):>7.3f}")
+
+
+def _per_column_outliers(data, threshold=1.5):
+    """The original detect_outliers IQR loop, kept as the baseline"""
+    report = {}
+    for column in data.select_dtypes(include=['number']).columns:
+        q1 = data[column].quantile(0.25)
+        q3 = data[column].quantile(0.75)
+        iqr = q3 - q1
+        outliers = data[(data[column] < q1 - threshold * iqr) | (data[column] > q3 + threshold * iqr)]
+        report[column] = {
+            'count': len(outliers),
+            'percentage': (len(outliers) / len(data)) * 100,
+            'indices': outliers.index.tolist()
+        }
+    return report
+
+
+def bench_outliers(rows=100000, column_counts=(10, 50, 200)):
+    """detect_outliers: one 2-D pass with bitmaps vs. per-column DataFrame filtering"""
+    print(f"detect_outliers (IQR) on {rows} rows")
+    print(f"{'columns':>8} {'per-column ms':>15} {'vectorized ms':>14} {'speedup':>8}")
+    for cols in column_counts:
+        processor = DataProcessor()
+        processor.data = _survey_frame(rows, cols)
+        baseline = _timed(lambda: _per_column_outliers(processor.data))
+        vectorized = _timed(lambda: processor.detect_outliers())
+        print(f"{cols:>8} {baseline:>15.1f} {vectorized:>14.1f} {baseline / vectorized:>7.1f}x")
+
+
+def _per_column_handling(data, method, percentile=5):
+    """The original handle_outliers loop (one quantile call and, for remove, one frame copy per column)"""
+    for column in data.select_dtypes(include=['number']).columns:
+        if method == 'winsorize':
+            lower = data[column].quantile(percentile / 100.0)
+            upper = data[column].quantile(1 - percentile / 100.0)
+            data[column] = data[column].clip(lower, upper)
+        else:
+            q1 = data[column].quantile(0.25)
+            q3 = data[column].quantile(0.75)
+            iqr = q3 - q1
+            data = data[(data[column] >= q1 - 1.5 * iqr) & (data[column] <= q3 + 1.5 * iqr)]
+    return data
+
+
+def bench_handle_outliers(rows=100000, column_counts=(50, 200, 500)):
+    """handle_outliers: bounds from one 2-D quantile pass and one row mask vs. the per-column loop"""
+    print(f"handle_outliers on {rows} rows of wide survey data")
+    print(f"{'method':>10} {'columns':>8} {'per-column ms':>15} {'batched ms':>11} {'speedup':>8}")
+    for method in ('winsorize', 'remove'):
+        for cols in column_counts:
+            frame = _survey_frame(rows, cols)
+            processor = DataProcessor()
+
+            def batched():
+                processor.data = frame.copy()
+                processor.handle_outliers(method=method)
+
+            baseline = _timed(lambda: _per_column_handling(frame.copy(), method), repeat=1)
+            vectorized = _timed(batched, repeat=1)
+            print(f"{method:>10} {cols:>8} {baseline:>15.1f} {vectorized:>11.1f} {baseline / vectorized:>7.1f}x")
+
+
+def bench_isolation_forest(rows=200000, cols=10):
+    """Isolation Forest: one forest per column vs. one multivariate forest (cold and cached)"""
+    print(f"Isolation Forest outlier detection on {rows} rows x {cols} columns")
+    processor = DataProcessor()
+    processor.data = _survey_frame(rows, cols, missing=0.0).drop(columns=['weight'])
+    per_column = _timed(lambda: processor.detect_outliers(method='isolation_forest'), repeat=1)
+    print(f"{'per-column forests':>28} {per_column:>10.1f} ms")
+
+    def cold():
+        processor._models.clear()
+        processor.detect_outliers(method='isolation_forest_multivariate')
+    print(f"{'multivariate (fit + score)':>28} {_timed(cold, repeat=1):>10.1f} ms")
+    cached = _timed(lambda: processor.detect_outliers(method='isolation_forest_multivariate'), repeat=1)
+    print(f"{'multivariate (cached model)':>28} {cached:>10.1f} ms")
+
+
+def bench_report(variable_counts=(500, 2000, 5000)):
+    """PDF report: estimates in one table vs. REPORT_TABLE_ROWS blocks, written to a spool file"""
+    import tempfile
+    import tracemalloc
+    print("PDF report with N estimate rows (written straight to a file)")
+    print(f"{'rows':>6} {'one table ms':>13} {'blocks ms':>10} {'speedup':>8} {'peak MB':>8}")
+    default_rows = app.config['REPORT_TABLE_ROWS']
+    processor = DataProcessor()
+    processor.data = _survey_frame(1000, 5)
+    path = os.path.join(tempfile.mkdtemp(), 'report.pdf')
+    try:
+        for count in variable_counts:
+            stats = {'mean': 50.0, 'std': 10.0, 'se': 0.1, 'ci_95_lower': 49.8, 'ci_95_upper': 50.2}
+            processor.estimates = {f"q{i}": {'unweighted': stats} for i in range(count)}
+            app.config['REPORT_TABLE_ROWS'] = count
+            single = _timed(lambda: processor.generate_report('pdf', output=path), repeat=1)
+            app.config['REPORT_TABLE_ROWS'] = default_rows
+            blocked = _timed(lambda: processor.generate_report('pdf', output=path), repeat=1)
+            tracemalloc.start()
+            processor.generate_report('pdf', output=path)
+            peak = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+            print(f"{count:>6} {single:>13.1f} {blocked:>10.1f} {single / blocked:>7.1f}x {peak:>8.1f}")
+    finally:
+        app.config['REPORT_TABLE_ROWS'] = default_rows
+        os.unlink(path)
+
+
+def _mixed_survey_csv(path, rows, text_cols, money_cols, numeric_cols, seed=42):
+    """Wide survey extract: free-text columns, rupee amounts with lakh grouping, plain numbers"""
+    rng = np.random.default_rng(seed)
+    names = np.array(['Asha', 'Ravi', 'Meena', 'Arjun', 'Kiran', 'Lakshmi', 'Suresh', 'Fatima'])
+    districts = np.array(['Pune', 'Nagpur', 'Patna', 'Gaya', 'Mysuru', 'Kochi', 'Agra', 'Surat'])
+    columns = {}
+    for i in range(text_cols):
+        pool = names if i % 2 == 0 else districts
+        columns[f"text{i}"] = np.char.add(pool[rng.integers(0, len(pool), rows)], rng.integers(0, 999, rows).astype(str))
+    for i in range(money_cols):
+        amounts = rng.integers(100, 50_00_000, rows)
+        columns[f"amount{i}"] = [f"₹{_lakh(a)}" for a in amounts]
+    for i in range(numeric_cols):
+        columns[f"q{i}"] = rng.normal(50, 10, rows).round(2)
+    pd.DataFrame(columns).to_csv(path, index=False)
+
+
+def _lakh(value):
+    """Indian digit grouping: 12,34,567"""
+    digits = str(value)
+    head, tail = digits[:-3], digits[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    if head:
+        groups.insert(0, head)
+    return ','.join(groups + [tail]) if groups else tail
+
+
+def _regex_coercion(frame, threshold=0.8):
+    """The previous load_data coercion: two regex passes and to_numeric over every text column"""
+    converted = []
+    for col in frame.select_dtypes(include=['object', 'string']).columns:
+        cleaned = (
+            frame[col].astype(str)
+            .str.replace(r"[\s,₹$]", "", regex=True)
+            .str.replace(r"[^0-9eE+\-.]", "", regex=True)
+        )
+        numeric = pd.to_numeric(cleaned, errors='coerce')
+        if numeric.notna().mean() >= threshold:
+            frame[col] = numeric
+            converted.append(col)
+    return converted
+
+
+def bench_type_inference(rows=200000, shapes=((20, 5, 5), (60, 10, 10))):
+    """load_data numeric coercion: sample screening + one-pass parser vs. two regexes on every text column"""
+    import tempfile
+    import type_inference
+    print(f"Numeric coercion of text columns on {rows} rows (text / rupee amount / numeric columns)")
+    print(f"{'shape':>12} {'regex ms':>10} {'sampled ms':>11} {'speedup':>8}")
+    folder = tempfile.mkdtemp()
+    try:
+        for text_cols, money_cols, numeric_cols in shapes:
+            path = os.path.join(folder, 'mixed.csv')
+            _mixed_survey_csv(path, rows, text_cols, money_cols, numeric_cols)
+            frame = pd.read_csv(path)
+            # The regex rule also turns IDs such as "Ravi123" into numbers; the new one must not
+            expected = [f"amount{i}" for i in range(money_cols)]
+            assert type_inference.coerce_numeric_columns(frame.copy()) == expected
+            baseline = _timed(lambda: _regex_coercion(frame.copy()), repeat=1)
+            sampled = _timed(lambda: type_inference.coerce_numeric_columns(frame.copy()), repeat=1)
+            shape = f"{text_cols}/{money_cols}/{numeric_cols}"
+            print(f"{shape:>12} {baseline:>10.1f} {sampled:>11.1f} {baseline / sampled:>7.1f}x")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+BENCHMARKS = {
+    'estimates': bench_estimates,
+    'variance': bench_variance,
+    'domains': bench_domains,
+    'knn': bench_knn,
+    'outliers': bench_outliers,
+    'handle_outliers': bench_handle_outliers,
+    'isolation_forest': bench_isolation_forest,
+    'report': bench_report,
+    'type_inference': bench_type_inference,
+}
+
+
+def main(names):
+    for name in names or BENCHMARKS:
+        print("=" * 60)
+        BENCHMARKS[name]()
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
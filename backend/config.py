@@ -11,12 +11,60 @@ class Config:
     
     # Flask Configuration
     SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-here')
-    UPLOAD_FOLDER = 'uploads'
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///app.db'
+    UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'uploads')
+    # Uploads are streamed to disk, so the cap only guards disk usage (0 disables it)
+    MAX_CONTENT_LENGTH = (int(os.environ.get('MAX_UPLOAD_MB', '4096')) * 1024 * 1024) or None
+    STREAMING_THRESHOLD_MB = int(os.environ.get('STREAMING_THRESHOLD_MB', '64'))
+    CSV_CHUNK_ROWS = int(os.environ.get('CSV_CHUNK_ROWS', '100000'))
+    # Downcast numbers and store repetitive text as categoricals on load
+    OPTIMIZE_DTYPES = os.environ.get('OPTIMIZE_DTYPES', '').lower() in ('1', 'true', 'yes')
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # SQLite write-ahead log and lock wait (ms); pool settings apply to server databases only
+    SQLITE_WAL = os.environ.get('SQLITE_WAL', '1').lower() in ('1', 'true', 'yes')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '30000'))
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', '1800'))
     AVATAR_FOLDER = os.path.join(UPLOAD_FOLDER, 'avatars')
     
+    # Per-dataset processor registry (LRU in memory, evicted entries spill to disk)
+    PROCESSOR_CACHE_FOLDER = os.path.join(UPLOAD_FOLDER, 'processor_cache')
+    PROCESSOR_CACHE_SIZE = int(os.environ.get('PROCESSOR_CACHE_SIZE', '8'))
+    PROCESSOR_CACHE_MB = int(os.environ.get('PROCESSOR_CACHE_MB', '512'))
+    PIPELINE_CACHE_STEPS = int(os.environ.get('PIPELINE_CACHE_STEPS', '12'))
+    
+    # Background jobs for /clean and /report (0 workers runs jobs on a thread)
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+    JOB_FOLDER = os.path.join(UPLOAD_FOLDER, 'jobs')
+    
+    # Rendered reports cached per dataset and report fingerprint (served with ETags)
+    REPORT_CACHE_FOLDER = os.path.join(UPLOAD_FOLDER, 'reports')
+    REPORT_CACHE_SIZE = int(os.environ.get('REPORT_CACHE_SIZE', '32'))
+    REPORT_TABLE_ROWS = int(os.environ.get('REPORT_TABLE_ROWS', '200'))
+    
+    # /download_data streams the cleaned data in chunks of this many rows
+    EXPORT_CHUNK_ROWS = int(os.environ.get('EXPORT_CHUNK_ROWS', '50000'))
+    
+    # /upload_batch parser pool (0 parses in the web process) and ZIP limits
+    BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', str(min(4, os.cpu_count() or 1))))
+    BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', '200'))
+    BATCH_MAX_UNCOMPRESSED_MB = int(os.environ.get('BATCH_MAX_UNCOMPRESSED_MB', '4096'))
+    BATCH_FOLDER = os.path.join(UPLOAD_FOLDER, 'batches')
+    
+    # Reuse stored uploads with identical contents: 'user' (the signed-in uploader's files), 'global' or 'off'
+    UPLOAD_DEDUP = os.environ.get('UPLOAD_DEDUP', 'user').lower()
+    
+    # Compressed, content-addressed run artifacts referenced from processing_run rows
+    ARTIFACT_FOLDER = os.path.join(UPLOAD_FOLDER, 'artifacts')
+    
+    # Admin dashboard page sizes and count cache (seconds)
+    ADMIN_PAGE_SIZE = int(os.environ.get('ADMIN_PAGE_SIZE', '50'))
+    ADMIN_RECENT_SIZE = int(os.environ.get('ADMIN_RECENT_SIZE', '10'))
+    ADMIN_MAX_PAGE_SIZE = int(os.environ.get('ADMIN_MAX_PAGE_SIZE', '200'))
+    ADMIN_COUNTS_TTL = int(os.environ.get('ADMIN_COUNTS_TTL', '60'))
+    
     # CORS settings
     CORS_ORIGINS = ['http://localhost:3000', 'http://localhost:5173', 'http://127.0.0.1:3000', 'http://127.0.0.1:5173']
     
@@ -33,15 +81,21 @@ class Config:
     IMPUTATION_METHODS = {
         'mean': 'Mean Imputation',
         'median': 'Median Imputation', 
-        'knn': 'K-Nearest Neighbors (KNN)'
+        'knn': 'K-Nearest Neighbors (KNN)',
+        'knn_approx': 'Approximate KNN (large files)'
     }
     KNN_NEIGHBORS = 5
+    KNN_EXACT_MAX_ROWS = int(os.environ.get('KNN_EXACT_MAX_ROWS', '20000'))
+    KNN_CHUNK_ROWS = int(os.environ.get('KNN_CHUNK_ROWS', '4096'))
+    KNN_WORKERS = int(os.environ.get('KNN_WORKERS', str(min(4, os.cpu_count() or 1))))
+    KNN_MAX_DONORS = int(os.environ.get('KNN_MAX_DONORS', '50000'))
     
     # Outlier Detection
     OUTLIER_DETECTION_METHODS = {
         'iqr': 'Interquartile Range (IQR)',
         'zscore': 'Z-Score',
-        'isolation_forest': 'Isolation Forest (AI-based)'
+        'isolation_forest': 'Isolation Forest (AI-based)',
+        'isolation_forest_multivariate': 'Isolation Forest across columns (AI-based)'
     }
     OUTLIER_HANDLING_METHODS = {
         'winsorize': 'Winsorization',
@@ -50,8 +104,18 @@ class Config:
     IQR_THRESHOLD = 1.5
     ZSCORE_THRESHOLD = 3.0
     ISOLATION_FOREST_CONTAMINATION = 0.1
+    ISOLATION_FOREST_FIT_ROWS = int(os.environ.get('ISOLATION_FOREST_FIT_ROWS', '100000'))
+    ISOLATION_FOREST_JOBS = int(os.environ.get('ISOLATION_FOREST_JOBS', '-1'))
+    ISOLATION_FOREST_CACHE_SIZE = int(os.environ.get('ISOLATION_FOREST_CACHE_SIZE', '4'))
     
     # Statistical Analysis
+    VARIANCE_METHODS = {
+        'taylor': 'Taylor Linearization',
+        'jackknife': 'Jackknife (delete-one-PSU)',
+        'brr': 'Balanced Repeated Replication',
+        'fay': "Fay's BRR",
+        'bootstrap': 'Rao-Wu Bootstrap'
+    }
     CONFIDENCE_LEVEL = 0.95
     Z_SCORE_95 = 1.96
     
@@ -93,8 +157,9 @@ class Config:
             'imputation_methods': Config.IMPUTATION_METHODS,
             'outlier_detection_methods': Config.OUTLIER_DETECTION_METHODS,
             'outlier_handling_methods': Config.OUTLIER_HANDLING_METHODS,
+            'variance_methods': Config.VARIANCE_METHODS,
             'supported_file_types': list(Config.SUPPORTED_FILE_TYPES),
-            'max_file_size_mb': Config.MAX_CONTENT_LENGTH // (1024 * 1024)
+            'max_file_size_mb': (Config.MAX_CONTENT_LENGTH or 0) // (1024 * 1024)
         }
 
 class DevelopmentConfig(Config):
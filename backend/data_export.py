@@ -0,0 +1,127 @@
+"""
+Data export for ASDP (AI Survey Data Processor) Application
+Ministry of Statistics and Programme Implementation (MoSPI)
+
+Streams a DataFrame as CSV (optionally gzip or zstd compressed), Parquet or
+Feather. Every format is produced in row chunks and yielded as bytes as soon
+as a chunk is encoded, so a download holds one chunk in memory at a time
+rather than whole-file copies. Parquet and Feather need pyarrow and use their
+own internal compression codecs; zstd for CSV needs the zstandard package.
+"""
+
+import io
+
+FORMATS = ('csv', 'parquet', 'feather')
+COMPRESSIONS = {
+    'csv': ('none', 'gzip', 'zstd'),
+    'parquet': ('none', 'snappy', 'gzip', 'zstd'),
+    'feather': ('none', 'lz4', 'zstd'),
+}
+DEFAULT_COMPRESSION = {'csv': 'none', 'parquet': 'snappy', 'feather': 'lz4'}
+DEFAULT_CHUNK_ROWS = 50000
+
+_MIMETYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'feather': 'application/vnd.apache.arrow.file',
+}
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file object that hands its bytes back on ``drain``"""
+
+    def __init__(self):
+        super().__init__()
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def _csv_chunks(frame, chunk_rows):
+    for start in range(0, max(len(frame), 1), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0).encode('utf-8')
+
+
+def _compressed(chunks, compressor):
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _arrow_chunks(frame, schema, chunk_rows, open_writer):
+    import pyarrow as pa  # Lazy import
+    sink = _Sink()
+    writer = open_writer(sink, schema)
+    for start in range(0, len(frame), chunk_rows):
+        chunk = frame.iloc[start:start + chunk_rows]
+        writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+
+
+def open_export(frame, fmt='csv', compression=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Validate the options and return ``(chunks, mimetype, extension)`` for ``frame``
+
+    ``chunks`` is a generator of bytes. Unknown formats or codecs raise
+    ValueError and missing optional packages raise ImportError here, before
+    anything is streamed, so callers can still answer with an error.
+    """
+    fmt = (fmt or 'csv').lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+    compression = (compression or DEFAULT_COMPRESSION[fmt]).lower()
+    if compression not in COMPRESSIONS[fmt]:
+        raise ValueError(f"Unsupported compression '{compression}' for {fmt}. Use one of: {', '.join(COMPRESSIONS[fmt])}")
+    chunk_rows = max(1, int(chunk_rows or DEFAULT_CHUNK_ROWS))
+
+    if fmt == 'csv':
+        chunks = _csv_chunks(frame, chunk_rows)
+        if compression == 'gzip':
+            import zlib
+            return _compressed(chunks, zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)), 'application/gzip', 'csv.gz'
+        if compression == 'zstd':
+            try:
+                import zstandard  # type: ignore
+            except Exception as import_error:
+                raise ImportError("zstd compression needs the zstandard package. Install with: pip install zstandard or use gzip.") from import_error
+            return _compressed(chunks, zstandard.ZstdCompressor(level=3).compressobj()), 'application/zstd', 'csv.zst'
+        return chunks, _MIMETYPES['csv'], 'csv'
+
+    try:
+        import pyarrow as pa  # Lazy import
+    except Exception as import_error:
+        raise ImportError(f"{fmt.capitalize()} export needs pyarrow. Install with: pip install pyarrow or download CSV instead.") from import_error
+    # One schema for every chunk, so a chunk that is all-null in a column still matches.
+    # Inferred up front: columns arrow cannot type fail here rather than mid-download.
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+    codec = None if compression == 'none' else compression
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+
+        def open_writer(sink, schema):
+            return pq.ParquetWriter(sink, schema, compression=codec or 'none')
+    else:
+        def open_writer(sink, schema):
+            return pa.ipc.new_file(sink, schema, options=pa.ipc.IpcWriteOptions(compression=codec))
+    return _arrow_chunks(frame, schema, chunk_rows, open_writer), _MIMETYPES[fmt], fmt
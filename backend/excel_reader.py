@@ -0,0 +1,75 @@
+"""
+Excel ingestion for ASDP (AI Survey Data Processor) Application
+Ministry of Statistics and Programme Implementation (MoSPI)
+
+Reads one worksheet of an .xlsx/.xls upload with an explicit sheet and header
+row. The Rust-based calamine engine (python-calamine) is used when it is
+installed; it parses large workbooks about ten times faster than openpyxl.
+Without it, pandas' openpyxl reader is used, which already opens workbooks in
+read-only mode and streams rows rather than building the full object model.
+"""
+
+import os
+
+
+def _calamine_available():
+    try:
+        import python_calamine  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+def engine_for(file_path):
+    """pandas engine used for ``file_path`` (None lets pandas pick, e.g. xlrd for .xls)"""
+    if _calamine_available():
+        return 'calamine'
+    if os.path.splitext(file_path)[1].lower() == '.xlsx':
+        return 'openpyxl'
+    return None
+
+
+def sheet_names(file_path):
+    """Worksheet names in workbook order (read without loading any cells)"""
+    import pandas as pd  # Lazy import
+    with pd.ExcelFile(file_path, engine=engine_for(file_path)) as workbook:
+        return list(workbook.sheet_names)
+
+
+def normalize_options(sheet=None, header_row=None):
+    """Validated ``{'sheet', 'header_row'}``; sheet is a name or 0-based index, header_row 0-based
+
+    Raises ValueError for a negative or non-integer header row.
+    """
+    if isinstance(sheet, str):
+        sheet = sheet.strip()
+        if sheet.isdigit():
+            sheet = int(sheet)
+        elif not sheet:
+            sheet = None
+    try:
+        header_row = 0 if header_row in (None, '') else int(header_row)
+    except (TypeError, ValueError):
+        raise ValueError(f"header_row must be a row number, got {header_row!r}")
+    if header_row < 0:
+        raise ValueError("header_row must be 0 or greater")
+    return {'sheet': 0 if sheet is None else sheet, 'header_row': header_row}
+
+
+def read_excel(file_path, sheet=None, header_row=None):
+    """Read one worksheet into a DataFrame, using row ``header_row`` as the column names"""
+    import pandas as pd  # Lazy import
+    options = normalize_options(sheet, header_row)
+    engine = engine_for(file_path)
+    try:
+        return pd.read_excel(file_path, sheet_name=options['sheet'], header=options['header_row'], engine=engine)
+    except (ValueError, IndexError) as e:
+        # Name the available sheets when the requested one does not exist
+        try:
+            names = sheet_names(file_path)
+        except Exception:
+            raise e
+        sheet = options['sheet']
+        if (isinstance(sheet, int) and sheet >= len(names)) or (isinstance(sheet, str) and sheet not in names):
+            raise ValueError(f"Sheet {sheet!r} not found. Available sheets: {', '.join(names)}") from e
+        raise
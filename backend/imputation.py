@@ -0,0 +1,159 @@
+"""
+Nearest-neighbour imputation for ASDP (AI Survey Data Processor) Application
+Ministry of Statistics and Programme Implementation (MoSPI)
+
+Approximate KNN imputation for files too large for scikit-learn's KNNImputer.
+Only complete-case rows act as donors. Rows with missing values are grouped by
+missingness pattern, so each group searches the donors on one fixed set of
+observed columns (KD-tree when SciPy is available, blocked BLAS distances
+otherwise). Patterns run on a thread pool and each searches its receivers in
+fixed-size chunks, so only a few searchers and distance buffers are alive at
+once regardless of the file size.
+"""
+
+import numpy as np
+
+DEFAULT_CHUNK_ROWS = 4096
+# Distance buffer size for the blocked search (rows x donors, float64)
+BLOCK_ELEMENTS = 4 * 1024 * 1024
+# KD-trees only pay off for larger groups in a low number of dimensions
+TREE_MIN_QUERIES = 64
+TREE_MAX_DIMS = 16
+
+
+def _cKDTree():
+    try:
+        from scipy.spatial import cKDTree  # type: ignore
+        return cKDTree
+    except Exception:
+        return None
+
+
+def nearest_blocked(queries, donors, k, donor_norms=None):
+    """Indices of the ``k`` nearest donors for each query row (squared Euclidean)
+
+    Donors are scanned in blocks sized so the distance buffer stays under
+    ``BLOCK_ELEMENTS``; only the running top-k survives between blocks.
+    """
+    if donor_norms is None:
+        donor_norms = np.einsum('ij,ij->i', donors, donors)
+    query_norms = np.einsum('ij,ij->i', queries, queries)
+    block = max(k, BLOCK_ELEMENTS // max(len(queries), 1))
+    best_dist = best_idx = None
+    for start in range(0, len(donors), block):
+        stop = min(start + block, len(donors))
+        dist = query_norms[:, None] - 2.0 * (queries @ donors[start:stop].T) + donor_norms[None, start:stop]
+        kk = min(k, stop - start)
+        idx = np.argpartition(dist, kk - 1, axis=1)[:, :kk]
+        dist = np.take_along_axis(dist, idx, axis=1)
+        idx += start
+        if best_dist is not None:
+            dist = np.concatenate([best_dist, dist], axis=1)
+            idx = np.concatenate([best_idx, idx], axis=1)
+            keep = np.argpartition(dist, k - 1, axis=1)[:, :k]
+            dist = np.take_along_axis(dist, keep, axis=1)
+            idx = np.take_along_axis(idx, keep, axis=1)
+        best_dist, best_idx = dist, idx
+    return best_idx
+
+
+def _searcher(donors, n_queries, eps=0.0):
+    """Return ``search(queries, k) -> indices`` for one set of observed columns"""
+    cKDTree = _cKDTree()
+    if cKDTree is not None and n_queries >= TREE_MIN_QUERIES and donors.shape[1] <= TREE_MAX_DIMS:
+        # Built once per pattern and discarded, so skip the slower balanced build
+        tree = cKDTree(donors, balanced_tree=False, compact_nodes=False)
+
+        def search(queries, k):
+            _, idx = tree.query(queries, k=k, eps=eps)
+            return np.asarray(idx).reshape(len(queries), k)
+        return search
+
+    norms = np.einsum('ij,ij->i', donors, donors)
+    return lambda queries, k: nearest_blocked(queries, donors, k, norms)
+
+
+def knn_impute(values, n_neighbors=5, chunk_rows=DEFAULT_CHUNK_ROWS, workers=1,
+               max_donors=None, eps=0.5, seed=0):
+    """Fill NaNs in a 2-D array with the mean of the k nearest complete-case donors
+
+    Distances use the columns observed in the receiving row, as in
+    KNNImputer. ``max_donors`` caps the donor pool with a seeded random sample;
+    ``eps`` lets the KD-tree return neighbours within ``(1 + eps)`` of the true
+    k-th distance, which halves query time at no measurable cost in accuracy.
+    Columns with no observed values are left as they are. Returns
+    ``(filled, info)``, where ``info`` counts donors, receivers, patterns and
+    rows filled with donor means (rows with nothing observed).
+    """
+    filled = np.array(values, dtype=float)
+    info = {'donors': 0, 'receivers': 0, 'patterns': 0, 'mean_filled': 0}
+    missing = np.isnan(filled)
+    usable = np.flatnonzero(~missing.all(axis=0))
+    if usable.size == 0:
+        return filled, info
+    data = filled[:, usable]
+    missing = missing[:, usable]
+    incomplete = missing.any(axis=1)
+    receiver_rows = np.flatnonzero(incomplete)
+    if receiver_rows.size == 0:
+        return filled, info
+    donor_rows = np.flatnonzero(~incomplete)
+    if max_donors and donor_rows.size > max_donors:
+        rng = np.random.default_rng(seed)
+        donor_rows = np.sort(rng.choice(donor_rows, size=int(max_donors), replace=False))
+    donors = data[donor_rows]
+    info['donors'] = int(donor_rows.size)
+    info['receivers'] = int(receiver_rows.size)
+
+    if donors.shape[0] == 0:
+        # Nothing to borrow from: column means of the observed values
+        means = np.nanmean(data, axis=0)
+        data[missing] = np.take(means, np.nonzero(missing)[1])
+        info['mean_filled'] = int(receiver_rows.size)
+        filled[:, usable] = data
+        return filled, info
+
+    k = max(1, min(int(n_neighbors), donors.shape[0]))
+    patterns, inverse = np.unique(missing[receiver_rows], axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.searchsorted(inverse[order], np.arange(len(patterns) + 1))
+    info['patterns'] = int(len(patterns))
+
+    groups = []
+    for p, pattern in enumerate(patterns):
+        rows = receiver_rows[order[bounds[p]:bounds[p + 1]]]
+        observed = np.flatnonzero(~pattern)
+        targets = np.flatnonzero(pattern)
+        if observed.size == 0:
+            data[np.ix_(rows, targets)] = donors[:, targets].mean(axis=0)
+            info['mean_filled'] += int(rows.size)
+            continue
+        groups.append((rows, observed, targets))
+
+    chunk_rows = max(1, int(chunk_rows or DEFAULT_CHUNK_ROWS))
+
+    def fill(group):
+        # One pattern at a time, so only ``workers`` searchers are alive at once
+        rows, observed, targets = group
+        search = _searcher(np.ascontiguousarray(donors[:, observed]), rows.size, eps)
+        donor_targets = donors[:, targets]
+        for start in range(0, rows.size, chunk_rows):
+            chunk = rows[start:start + chunk_rows]
+            idx = search(data[np.ix_(chunk, observed)], k)
+            # Groups own disjoint rows, so concurrent writes never overlap
+            data[np.ix_(chunk, targets)] = donor_targets[idx].mean(axis=1)
+
+    # Largest groups first so the pool is not left waiting on one big pattern at the end
+    groups.sort(key=lambda group: -group[0].size)
+    if workers and workers > 1 and len(groups) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=int(workers)) as pool:
+            list(pool.map(fill, groups))
+    else:
+        for group in groups:
+            fill(group)
+
+    filled[:, usable] = data
+    return filled, info
+
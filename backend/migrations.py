@@ -0,0 +1,125 @@
+"""
+Schema migrations for ASDP (AI Survey Data Processor) Application
+Ministry of Statistics and Programme Implementation (MoSPI)
+
+db.create_all() creates missing tables but never changes existing ones, so
+databases created by older releases are brought up to date here. Each
+migration runs once and is recorded in the schema_migrations table. Every
+step is also idempotent: it checks for the column or uses CREATE INDEX IF
+NOT EXISTS. That makes it safe on a fresh database that create_all has
+already built, and when several workers start at the same time. The SQL is
+portable between SQLite and PostgreSQL.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+MIGRATIONS_TABLE = 'schema_migrations'
+
+# (table, column) pairs queried by hot request paths; the models declare the same
+# indexes (index=True), so create_all and migration 3 produce identical names
+INDEXED_COLUMNS = [
+    ('user', 'role'),
+    ('user', 'created_at'),
+    ('dataset', 'uploaded_at'),
+    ('dataset', 'owner_id'),
+    ('processing_run', 'dataset_id'),
+    ('processing_run', 'user_id'),
+    ('processing_run', 'created_at'),
+    ('report_record', 'dataset_id'),
+    ('report_record', 'user_id'),
+    ('report_record', 'created_at'),
+    ('job', 'dataset_id'),
+    ('job', 'user_id'),
+]
+
+
+def _quote(conn, name):
+    return conn.dialect.identifier_preparer.quote(name)
+
+
+def add_column(conn, table, column, ddl_type):
+    """Add ``column`` to ``table`` unless it is already there"""
+    existing = {col['name'] for col in inspect(conn).get_columns(table)}
+    if column not in existing:
+        conn.execute(text(f"ALTER TABLE {_quote(conn, table)} ADD COLUMN {_quote(conn, column)} {ddl_type}"))
+
+
+def create_index(conn, table, column):
+    """Create SQLAlchemy's default ``ix_<table>_<column>`` index if it does not exist"""
+    name = f"ix_{table}_{column}"
+    conn.execute(text(
+        f"CREATE INDEX IF NOT EXISTS {_quote(conn, name)} ON {_quote(conn, table)} ({_quote(conn, column)})"
+    ))
+
+
+def _user_profile_image(conn):
+    add_column(conn, 'user', 'profile_image', 'VARCHAR(512)')
+
+
+def _dataset_read_options(conn):
+    add_column(conn, 'dataset', 'read_options', 'JSON')
+
+
+def _processing_run_artifacts(conn):
+    add_column(conn, 'processing_run', 'artifacts', 'JSON')
+
+
+def _dataset_content_hash(conn):
+    add_column(conn, 'dataset', 'content_hash', 'VARCHAR(64)')
+    create_index(conn, 'dataset', 'content_hash')
+
+
+def _lookup_indexes(conn):
+    for table, column in INDEXED_COLUMNS:
+        create_index(conn, table, column)
+
+
+# Append new migrations with the next version number; never renumber or edit applied ones
+MIGRATIONS = [
+    (1, 'add user.profile_image', _user_profile_image),
+    (2, 'add dataset.read_options', _dataset_read_options),
+    (3, 'index hot lookup columns', _lookup_indexes),
+    (4, 'add processing_run.artifacts', _processing_run_artifacts),
+    (5, 'add dataset.content_hash', _dataset_content_hash),
+]
+
+
+def applied_versions(engine):
+    with engine.connect() as conn:
+        if not inspect(conn).has_table(MIGRATIONS_TABLE):
+            return set()
+        return {row[0] for row in conn.execute(text(f"SELECT version FROM {MIGRATIONS_TABLE}"))}
+
+
+def upgrade(engine, migrations=None):
+    """Apply every migration not yet recorded; returns the versions applied by this call
+
+    Each migration runs in its own transaction together with its record, so a
+    failure leaves the database at the last completed version. If another
+    process records a version first, its primary key stops this one.
+    """
+    migrations = MIGRATIONS if migrations is None else migrations
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} "
+            "(version INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL, applied_at TIMESTAMP NOT NULL)"
+        ))
+    done = applied_versions(engine)
+    applied = []
+    for version, name, migrate in migrations:
+        if version in done:
+            continue
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text(f"INSERT INTO {MIGRATIONS_TABLE} (version, name, applied_at) VALUES (:version, :name, :applied_at)"),
+                    {'version': version, 'name': name, 'applied_at': datetime.utcnow()}
+                )
+                migrate(conn)
+        except IntegrityError:
+            continue  # Recorded by a concurrently starting worker
+        applied.append(version)
+    return applied
@@ -0,0 +1,153 @@
+"""
+Parsed upload cache for ASDP (AI Survey Data Processor) Application
+Ministry of Statistics and Programme Implementation (MoSPI)
+
+Stores the result of a successful parse as a typed columnar snapshot next to the
+uploaded file, keyed by the file content hash and the parser options. Later loads
+in any worker read the snapshot (memory-mapped where possible) instead of running
+the CSV/Excel parser and the numeric coercion pass again.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from uuid import uuid4
+
+# Bump when the parser or coercion logic changes so old snapshots are ignored
+PARSE_CACHE_VERSION = 3
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(file_path):
+    """SHA-256 of the file contents, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(content_hash, options=None):
+    """Combine the content hash with the parser options into a snapshot key"""
+    payload = json.dumps(
+        {'hash': content_hash, 'options': options or {}, 'version': PARSE_CACHE_VERSION},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+def snapshot_root(file_path):
+    """Directory that holds all snapshots for an uploaded file"""
+    return f"{file_path}.cache"
+
+
+def _pyarrow_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+def save_snapshot(df, file_path, key, log=None):
+    """Persist ``df`` as a columnar snapshot; returns the snapshot directory or None
+
+    Frames whose column names are not unique strings are not cached: the
+    snapshot could not give them back under the same names.
+    """
+    import numpy as np  # Lazy import
+
+    if not df.columns.is_unique or not all(isinstance(c, str) for c in df.columns):
+        return None
+    root = snapshot_root(file_path)
+    final_dir = os.path.join(root, key)
+    if os.path.isdir(final_dir):
+        return final_dir
+    tmp_dir = os.path.join(root, f".{key}.{uuid4().hex[:8]}.tmp")
+    try:
+        os.makedirs(tmp_dir, exist_ok=True)
+        meta = {
+            'version': PARSE_CACHE_VERSION,
+            'columns': list(df.columns),
+            'log': list(log or []),
+            'rows': int(len(df)),
+        }
+        written = False
+        if _pyarrow_available():
+            try:
+                df.to_parquet(os.path.join(tmp_dir, 'data.parquet'), index=False)
+                meta['format'] = 'parquet'
+                written = True
+            except Exception:
+                written = False
+        if not written:
+            # One .npy per plain numeric/bool/datetime column (memory-mappable),
+            # everything else (strings, categoricals, mixed objects) pickled together
+            array_columns = []
+            other_columns = []
+            for i, col in enumerate(df.columns):
+                values = df[col].to_numpy()
+                if isinstance(values, np.ndarray) and values.dtype.kind in 'biufcmM':
+                    np.save(os.path.join(tmp_dir, f"c{i}.npy"), values, allow_pickle=False)
+                    array_columns.append(i)
+                else:
+                    other_columns.append(i)
+            if other_columns:
+                with open(os.path.join(tmp_dir, 'objects.pkl'), 'wb') as fh:
+                    pickle.dump(df.iloc[:, other_columns], fh, protocol=pickle.HIGHEST_PROTOCOL)
+            meta['format'] = 'npy'
+            meta['array_columns'] = array_columns
+            meta['other_columns'] = other_columns
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as fh:
+            json.dump(meta, fh)
+        try:
+            os.rename(tmp_dir, final_dir)
+        except OSError:
+            # Another worker won the race; its snapshot is equivalent
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return final_dir
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return None
+
+
+def load_snapshot(file_path, key):
+    """Load a snapshot written by :func:`save_snapshot`; returns (df, log) or None"""
+    snap_dir = os.path.join(snapshot_root(file_path), key)
+    meta_path = os.path.join(snap_dir, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        import numpy as np  # Lazy import
+        import pandas as pd  # Lazy import
+
+        with open(meta_path, 'r', encoding='utf-8') as fh:
+            meta = json.load(fh)
+        if meta.get('version') != PARSE_CACHE_VERSION:
+            return None
+        if meta.get('format') == 'parquet':
+            df = pd.read_parquet(os.path.join(snap_dir, 'data.parquet'), memory_map=True)
+            # Parquet stores missing values of object columns as None; a fresh parse has NaN
+            for col in df.columns[df.dtypes == object]:
+                df[col] = df[col].where(df[col].notna(), np.nan)
+        else:
+            columns = {}
+            for i in meta.get('array_columns', []):
+                # Copy-on-write mapping: pages are shared until a cleaning step writes to them
+                columns[i] = np.load(os.path.join(snap_dir, f"c{i}.npy"), mmap_mode='c', allow_pickle=False)
+            if meta.get('other_columns'):
+                with open(os.path.join(snap_dir, 'objects.pkl'), 'rb') as fh:
+                    others = pickle.load(fh)
+                for pos, i in enumerate(meta['other_columns']):
+                    columns[i] = others.iloc[:, pos]
+            names = meta['columns']
+            df = pd.DataFrame(
+                {names[i]: columns[i] for i in range(len(names))},
+                index=pd.RangeIndex(meta.get('rows', 0))
+            )
+        return df, meta.get('log', [])
+    except Exception:
+        return None
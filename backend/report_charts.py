@@ -0,0 +1,109 @@
+"""
+Report charts for ASDP (AI Survey Data Processor) Application
+Ministry of Statistics and Programme Implementation (MoSPI)
+
+Draws the plot aggregates from DataProcessor.generate_plot_data (histograms,
+the missing-value bar chart and the correlation heatmap) as ReportLab vector
+drawings. A drawing is a PDF flowable as it is and renders to inline SVG for
+the HTML report, so both formats share one chart definition and nothing is
+rasterized.
+"""
+
+from reportlab.graphics.shapes import Drawing, Line, Rect, String
+from reportlab.lib import colors
+
+WIDTH = 460
+HEIGHT = 200
+PAD_LEFT = 48
+PAD_BOTTOM = 36
+BAR_COLOR = colors.HexColor('#667eea')
+MISSING_COLOR = colors.HexColor('#f5576c')
+
+
+def _tick(value):
+    if value is None:
+        return ''
+    magnitude = abs(value)
+    if magnitude >= 1e7:
+        return f"{value / 1e7:.1f} Cr"
+    if magnitude >= 1e5:
+        return f"{value / 1e5:.1f} L"
+    if magnitude >= 1000:
+        return f"{value / 1000:.1f}k"
+    return str(int(value)) if float(value).is_integer() else f"{value:.2f}"
+
+
+def _bars(values, tick_labels, color):
+    """Vertical bars scaled to the largest value; ``tick_labels`` is [(bar position, text)]"""
+    drawing = Drawing(WIDTH, HEIGHT)
+    inner_w = WIDTH - PAD_LEFT - 8
+    inner_h = HEIGHT - PAD_BOTTOM - 8
+    top = max([1] + [v for v in values if v is not None])
+    bar_w = inner_w / max(1, len(values))
+    drawing.add(Line(PAD_LEFT, PAD_BOTTOM, WIDTH - 8, PAD_BOTTOM, strokeColor=colors.grey))
+    drawing.add(String(PAD_LEFT - 4, PAD_BOTTOM + inner_h - 8, _tick(top), fontSize=7, textAnchor='end'))
+    drawing.add(String(PAD_LEFT - 4, PAD_BOTTOM, '0', fontSize=7, textAnchor='end'))
+    for i, value in enumerate(values):
+        height = (value or 0) / top * inner_h
+        drawing.add(Rect(PAD_LEFT + i * bar_w + 0.5, PAD_BOTTOM, max(0.5, bar_w - 1), height,
+                         fillColor=color, strokeColor=None))
+    for position, label in tick_labels:
+        drawing.add(String(PAD_LEFT + position * bar_w, PAD_BOTTOM - 12, str(label), fontSize=7, textAnchor='middle'))
+    return drawing
+
+
+def _histogram(plot):
+    edges, counts = plot['edges'], plot['counts']
+    step = max(1, -(-len(counts) // 6))
+    ticks = [(i, _tick(edge)) for i, edge in enumerate(edges) if i % step == 0 or i == len(counts)]
+    return _bars(counts, ticks, BAR_COLOR)
+
+
+def _missing(plot):
+    labels = [label if len(str(label)) <= 12 else f"{str(label)[:11]}…" for label in plot['labels']]
+    return _bars(plot['values'], [(i + 0.5, label) for i, label in enumerate(labels)], MISSING_COLOR)
+
+
+def _heatmap(plot):
+    columns, matrix = plot['columns'], plot['matrix']
+    cell = min(48, 360 // max(1, len(columns)))
+    offset = 72
+    size = offset + cell * len(columns)
+    drawing = Drawing(size, size)
+    for i, column in enumerate(columns):
+        label = str(column)[:12]
+        y = size - offset - (i + 1) * cell
+        drawing.add(String(offset - 4, y + cell / 2 - 3, label, fontSize=7, textAnchor='end'))
+        drawing.add(String(offset + i * cell + cell / 2, size - offset + 6, label, fontSize=7, textAnchor='middle'))
+        for j, value in enumerate(matrix[i]):
+            if value is None:
+                fill = colors.HexColor('#e9ecef')
+            else:
+                base = BAR_COLOR if value >= 0 else MISSING_COLOR
+                fill = colors.Color(base.red, base.green, base.blue, alpha=min(1.0, abs(value)))
+            drawing.add(Rect(offset + j * cell, y, cell - 1, cell - 1, fillColor=fill, strokeColor=None))
+            text = '–' if value is None else f"{value:.2f}"
+            drawing.add(String(offset + j * cell + cell / 2, y + cell / 2 - 3, text, fontSize=7, textAnchor='middle'))
+    return drawing
+
+
+_DRAWERS = {'histogram': _histogram, 'bar': _missing, 'heatmap': _heatmap}
+
+
+def chart_drawings(plots):
+    """``[(title, Drawing)]`` for every plot aggregate that can be drawn; others are skipped"""
+    drawings = []
+    for plot in (plots or {}).values():
+        drawer = _DRAWERS.get(plot.get('type')) if isinstance(plot, dict) else None
+        if drawer is None:
+            continue
+        drawings.append((plot.get('title', ''), drawer(plot)))
+    return drawings
+
+
+def to_svg(drawing, chart_id):
+    """Inline SVG markup for ``drawing`` (XML prolog dropped, clip path id made unique)"""
+    from reportlab.graphics import renderSVG
+    markup = renderSVG.drawToString(drawing)
+    markup = markup[markup.index('<svg'):]
+    return markup.replace('id="clip"', f'id="clip-{chart_id}"').replace('url(#clip)', f'url(#clip-{chart_id})')
@@ -0,0 +1,330 @@
+"""
+Streaming summaries for ASDP (AI Survey Data Processor) Application
+Ministry of Statistics and Programme Implementation (MoSPI)
+
+Fixed-size, mergeable summaries of numeric columns, updated one chunk of rows
+at a time: auto-ranging fixed-bin histograms, pairwise co-moment matrices (for
+correlations) and t-digest quantiles. Their size does not depend on the row
+count, so they are built while a file is parsed or streamed and reused for the
+plots instead of re-reading (or sampling) the rows.
+"""
+
+import numpy as np
+
+HISTOGRAM_BINS = 64
+DISPLAY_BINS = 32
+DIGEST_COMPRESSION = 200
+PLOT_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+PLOT_COLUMNS = 5
+
+
+def _finite(values):
+    values = np.asarray(values, dtype='float64').ravel()
+    return values[np.isfinite(values)]
+
+
+class StreamingHistogram:
+    """Equal-width bins over a range that doubles as values arrive
+
+    The first update spans its own min..max. A later value outside the range
+    widens it by summing neighbouring bins in pairs (doubling the width)
+    until it fits. Counts therefore stay exact for the current bins while
+    the number of bins stays fixed.
+    """
+
+    def __init__(self, bins=HISTOGRAM_BINS):
+        self.bins = int(bins) + int(bins) % 2
+        self.lo = None
+        self.width = None
+        self.counts = np.zeros(self.bins, dtype='int64')
+
+    @property
+    def hi(self):
+        return self.lo + self.width * self.bins
+
+    def _grow(self, left):
+        merged = self.counts.reshape(-1, 2).sum(axis=1)
+        pad = np.zeros(self.bins // 2, dtype='int64')
+        if left:
+            self.lo -= self.width * self.bins
+            self.counts = np.concatenate([pad, merged])
+        else:
+            self.counts = np.concatenate([merged, pad])
+        self.width *= 2
+
+    def _cover(self, vmin, vmax):
+        if self.lo is None:
+            if vmax > vmin:
+                self.lo, self.width = vmin, (vmax - vmin) / self.bins
+            else:
+                # Constant so far: centre a narrow range on the value
+                self.width = max(abs(vmin), 1.0) / self.bins
+                self.lo = vmin - self.width * self.bins / 2
+        tolerance = self.width * 1e-9
+        while vmin < self.lo - tolerance:
+            self._grow(left=True)
+        while vmax > self.hi + tolerance:
+            self._grow(left=False)
+
+    def _add(self, values, weights=None):
+        idx = np.clip(np.floor((values - self.lo) / self.width).astype('int64'), 0, self.bins - 1)
+        self.counts += np.bincount(idx, weights=weights, minlength=self.bins).astype('int64')
+
+    def update(self, values):
+        values = _finite(values)
+        if values.size:
+            self._cover(values.min(), values.max())
+            self._add(values)
+        return self
+
+    def merge(self, other):
+        """Fold ``other`` in; exact when the grids line up, else within one bin width"""
+        if other.lo is None:
+            return self
+        self._cover(other.lo, other.hi)
+        while self.width < other.width:
+            self._grow(left=False)
+            self._cover(other.lo, other.hi)
+        occupied = np.flatnonzero(other.counts)
+        centres = other.lo + (occupied + 0.5) * other.width
+        self._add(centres, other.counts[occupied])
+        return self
+
+    def edges_counts(self, max_bins=DISPLAY_BINS):
+        """Occupied span as (edges, counts), adjacent bins summed to at most ``max_bins``"""
+        occupied = np.flatnonzero(self.counts)
+        if self.lo is None or not occupied.size:
+            return np.zeros(0), np.zeros(0, dtype='int64')
+        first, last = occupied[0], occupied[-1] + 1
+        counts = self.counts[first:last]
+        width = self.width
+        while len(counts) > max_bins:
+            if len(counts) % 2:
+                counts = np.append(counts, 0)
+            counts = counts.reshape(-1, 2).sum(axis=1)
+            width *= 2
+        edges = self.lo + first * self.width + width * np.arange(len(counts) + 1)
+        return edges, counts
+
+
+class TDigest:
+    """Merging t-digest: weighted centroids, small in the tails, for approximate quantiles
+
+    Each update sorts the existing centroids together with the new values and
+    regroups them. A group holds the values that share an integer step of the
+    arcsine scale function k(q) = compression / (2 pi) * asin(2q - 1), so
+    there are at most about compression / 2 centroids. Those in the tails
+    cover very few values, which keeps extreme quantiles accurate.
+    """
+
+    def __init__(self, compression=DIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def _compress(self, means, weights):
+        """Regroup centroids that are already sorted by mean"""
+        total = weights.sum()
+        midpoints = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * midpoints - 1, -1, 1))
+        groups = np.floor(k - k[0]).astype('int64')
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def update(self, values):
+        values = _finite(values)
+        if values.size:
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            # Sorting the chunk and splicing in the (few) centroids beats an argsort of both
+            values = np.sort(values)
+            positions = np.searchsorted(values, self.means)
+            self._compress(np.insert(values, positions, self.means), np.insert(np.ones(values.size), positions, self.weights))
+        return self
+
+    def merge(self, other):
+        if other.weights.size:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            means = np.concatenate([self.means, other.means])
+            order = np.argsort(means, kind='stable')
+            self._compress(means[order], np.concatenate([self.weights, other.weights])[order])
+        return self
+
+    def quantile(self, quantiles):
+        """Interpolated quantiles; NaN before any values were seen"""
+        quantiles = np.atleast_1d(np.asarray(quantiles, dtype='float64'))
+        if not self.weights.size:
+            return np.full(quantiles.shape, np.nan)
+        total = self.weights.sum()
+        centres = np.cumsum(self.weights) - self.weights / 2
+        return np.interp(
+            quantiles * total,
+            np.r_[0.0, centres, total],
+            np.r_[self.min, self.means, self.max]
+        )
+
+
+class CoMoments:
+    """Pairwise-complete sums for means, variances and correlations of k columns
+
+    For every column pair the sketch keeps the row count and the first,
+    second and cross moments over the rows where both values are present.
+    Values are shifted by a per-column constant taken from the first chunk,
+    which keeps the single-pass sums numerically stable. Correlations
+    therefore match ``DataFrame.corr()``. Memory is O(k^2) whatever the row
+    count.
+    """
+
+    def __init__(self, k):
+        self.k = int(k)
+        self.shift = None
+        self.n = np.zeros((self.k, self.k))
+        self.sums = np.zeros((self.k, self.k))     # sum of x_i where x_i and x_j present
+        self.squares = np.zeros((self.k, self.k))  # sum of x_i^2 where both present
+        self.cross = np.zeros((self.k, self.k))    # sum of x_i * x_j where both present
+
+    def update(self, values):
+        values = np.asarray(values, dtype='float64').reshape(-1, self.k)
+        if not values.size:
+            return self
+        valid = np.isfinite(values)
+        if self.shift is None:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                shift = np.where(valid, values, 0.0).sum(axis=0) / valid.sum(axis=0)
+            self.shift = np.where(np.isfinite(shift), shift, 0.0)
+        filled = np.where(valid, values - self.shift, 0.0)
+        present = valid.astype('float64')
+        self.n += present.T @ present
+        self.sums += filled.T @ present
+        self.squares += (filled * filled).T @ present
+        self.cross += filled.T @ filled
+        return self
+
+    def merge(self, other):
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift.copy()
+        # Re-express other's sums around this sketch's shift
+        d = (other.shift - self.shift)[:, None]
+        self.n += other.n
+        self.sums += other.sums + d * other.n
+        self.squares += other.squares + 2 * d * other.sums + d * d * other.n
+        self.cross += other.cross + d.T * other.sums + d * other.sums.T + d * d.T * other.n
+        return self
+
+    def correlation(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            n = np.where(self.n > 1, self.n, np.nan)
+            cov = self.cross - self.sums * self.sums.T / n
+            var = self.squares - self.sums * self.sums / n
+            corr = cov / np.sqrt(var * var.T)
+        return np.clip(corr, -1.0, 1.0)
+
+
+class FrameSketch:
+    """Missing counts for every column plus histograms, quantiles and correlations
+    for the first few numeric columns, built chunk by chunk"""
+
+    def __init__(self, columns, numeric_columns):
+        self.columns = list(columns)
+        self.numeric_columns = list(numeric_columns)
+        self.rows = 0
+        self.missing = np.zeros(len(self.columns), dtype='int64')
+        self.histograms = [StreamingHistogram() for _ in self.numeric_columns]
+        self.digests = [TDigest() for _ in self.numeric_columns]
+        self.comoments = CoMoments(len(self.numeric_columns))
+
+    def update(self, frame, numeric_values=None):
+        """Add a chunk of rows; ``numeric_values`` overrides the numeric block (rows x numeric columns)"""
+        self.rows += len(frame)
+        self.missing += frame[self.columns].isnull().sum().to_numpy(dtype='int64')
+        if numeric_values is None:
+            numeric_values = frame[self.numeric_columns].to_numpy(dtype='float64', na_value=np.nan)
+        for i in range(len(self.numeric_columns)):
+            self.histograms[i].update(numeric_values[:, i])
+            self.digests[i].update(numeric_values[:, i])
+        self.comoments.update(numeric_values)
+        return self
+
+    def merge(self, other):
+        if other.columns != self.columns or other.numeric_columns != self.numeric_columns:
+            raise ValueError("Sketches cover different columns")
+        self.rows += other.rows
+        self.missing += other.missing
+        for mine, theirs in zip(self.histograms + self.digests, other.histograms + other.digests):
+            mine.merge(theirs)
+        self.comoments.merge(other.comoments)
+        return self
+
+    def select(self, numeric_columns):
+        """Keep only the given numeric columns (used when a column turns out not to be numeric)"""
+        keep = [self.numeric_columns.index(col) for col in numeric_columns]
+        self.numeric_columns = list(numeric_columns)
+        self.histograms = [self.histograms[i] for i in keep]
+        self.digests = [self.digests[i] for i in keep]
+        moments = CoMoments(len(keep))
+        if self.comoments.shift is not None:
+            grid = np.ix_(keep, keep)
+            moments.shift = self.comoments.shift[keep]
+            moments.n, moments.sums = self.comoments.n[grid], self.comoments.sums[grid]
+            moments.squares, moments.cross = self.comoments.squares[grid], self.comoments.cross[grid]
+        self.comoments = moments
+        return self
+
+    def to_plots(self):
+        """Plot payloads in the /clean ``plots`` format (plot_mode 'data')"""
+        def clean(values):
+            return [None if not np.isfinite(v) else float(v) for v in values]
+
+        plots = {}
+        for column, histogram, digest in zip(self.numeric_columns, self.histograms, self.digests):
+            edges, counts = histogram.edges_counts()
+            plots[f'dist_{column}'] = {
+                'type': 'histogram',
+                'title': f'Distribution of {column}',
+                'column': str(column),
+                'edges': clean(edges),
+                'counts': counts.tolist(),
+                'quantiles': dict(zip([str(q) for q in PLOT_QUANTILES], clean(digest.quantile(PLOT_QUANTILES))))
+            }
+        if len(self.numeric_columns) > 1:
+            plots['correlation'] = {
+                'type': 'heatmap',
+                'title': 'Correlation Matrix',
+                'columns': [str(c) for c in self.numeric_columns],
+                'matrix': [clean(row) for row in self.comoments.correlation()]
+            }
+        missing = [(str(c), int(m)) for c, m in zip(self.columns, self.missing) if m > 0]
+        if missing:
+            plots['missing'] = {
+                'type': 'bar',
+                'title': 'Missing Values by Column',
+                'labels': [c for c, _ in missing],
+                'values': [m for _, m in missing]
+            }
+        return plots
+
+
+def sketch_frame(frame, chunk_rows=100000, plot_columns=PLOT_COLUMNS):
+    """FrameSketch of a DataFrame, fed in row chunks so temporaries stay bounded"""
+    numeric_columns = list(frame.select_dtypes(include=['number']).columns[:plot_columns])
+    sketch = FrameSketch(frame.columns, numeric_columns)
+    # The whole column is at hand: start each histogram on its exact range
+    for histogram, column in zip(sketch.histograms, numeric_columns):
+        values = frame[column].to_numpy(dtype='float64', na_value=np.nan)
+        finite = np.isfinite(values)
+        if finite.any():
+            histogram._cover(values[finite].min(), values[finite].max())
+    chunk_rows = max(1, int(chunk_rows))
+    for start in range(0, len(frame), chunk_rows):
+        sketch.update(frame.iloc[start:start + chunk_rows])
+    return sketch
@@ -0,0 +1,504 @@
+"""
+Statistical kernels for ASDP (AI Survey Data Processor) Application
+Ministry of Statistics and Programme Implementation (MoSPI)
+
+Batched NumPy implementations of the estimates reported by DataProcessor. All
+functions work on a 2-D float block (rows x columns) with NaN marking missing
+values, so all selected columns are reduced together (in cache-sized column
+blocks) instead of with one pandas reduction per column.
+"""
+
+import numpy as np
+
+Z_SCORE_95 = 1.96
+# Elements per column block; keeps the temporary (rows x block) arrays cache-sized
+BLOCK_ELEMENTS = 256 * 1024
+
+
+def _safe_divide(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = numerator / denominator
+    return np.where(denominator > 0, result, np.nan)
+
+
+def column_statistics(values, weights=None, n_total=None):
+    """Unweighted and weighted mean/std/SE for every column of ``values``
+
+    ``values`` is a 2-D float array with NaN for missing entries. ``weights`` is an
+    optional 1-D array; only rows with a finite, positive weight contribute to the
+    weighted statistics. ``n_total`` is the row count used for the unweighted SE
+    (defaults to the number of rows, matching the original per-column code).
+
+    Returns a dict of 1-D arrays keyed ``mean``, ``std``, ``se`` and, when weights
+    are given, ``w_mean``, ``w_std``, ``w_se``, ``w_n``.
+    """
+    values = np.asarray(values, dtype='float64')
+    if values.ndim == 1:
+        values = values[:, None]
+    n_rows, n_cols = values.shape
+    n_total = n_rows if n_total is None else n_total
+
+    out = {key: np.full(n_cols, np.nan) for key in ('mean', 'std', 'se')}
+    if weights is not None:
+        w = np.asarray(weights, dtype='float64').ravel()
+        w = np.where(np.isfinite(w) & (w > 0), w, 0.0)
+        w_rows = (w > 0).astype('float64')
+        for key in ('w_mean', 'w_std', 'w_se', 'w_n'):
+            out[key] = np.full(n_cols, np.nan)
+
+    block_cols = max(1, BLOCK_ELEMENTS // max(n_rows, 1))
+    for start in range(0, n_cols, block_cols):
+        block = values[:, start:start + block_cols]
+        cols = slice(start, start + block.shape[1])
+        valid = ~np.isnan(block)
+        filled = np.where(valid, block, 0.0)
+
+        # Unweighted: NaN-aware sums over the whole block at once
+        n = valid.sum(axis=0)
+        mean = _safe_divide(filled.sum(axis=0), n)
+        dev = np.where(valid, block - mean, 0.0)
+        ss = np.einsum('ij,ij->j', dev, dev)
+        std = np.sqrt(_safe_divide(ss, n - 1))
+        out['mean'][cols] = mean
+        out['std'][cols] = std
+        out['se'][cols] = std / np.sqrt(n_total) if n_total > 0 else np.nan
+
+        if weights is not None:
+            # Weighted reductions as matrix-vector products over the valid entries
+            valid_f = valid.astype('float64')
+            sum_w = w @ valid_f
+            w_n = w_rows @ valid_f
+            w_mean = _safe_divide(w @ filled, sum_w)
+            w_dev = np.where(valid, block - w_mean, 0.0)
+            w_var = _safe_divide(w @ (w_dev * w_dev), sum_w)
+            w_std = np.sqrt(w_var)
+            out['w_mean'][cols] = w_mean
+            out['w_std'][cols] = w_std
+            out['w_se'][cols] = _safe_divide(w_std, np.sqrt(w_n))
+            out['w_n'][cols] = w_n
+    return out
+
+
+def grouped_statistics(values, group_codes, n_groups, weights=None):
+    """Per-domain unweighted and weighted mean/std/SE for every column
+
+    ``group_codes`` assigns each row a domain 0..n_groups-1 (negative codes are
+    ignored). Rows are sorted by domain once and every reduction is a single
+    ``np.add.reduceat`` over the sorted block, so the cost does not grow with a
+    Python loop over domains. Unweighted SEs use the domain row count, mirroring
+    the whole-sample estimates. Returns a dict of (n_groups x columns) arrays plus
+    ``rows`` (domain sizes).
+    """
+    values = np.asarray(values, dtype='float64')
+    if values.ndim == 1:
+        values = values[:, None]
+    codes = np.asarray(group_codes, dtype='int64').ravel()
+    keep = codes >= 0
+    if not keep.all():
+        values, codes = values[keep], codes[keep]
+        weights = None if weights is None else np.asarray(weights, dtype='float64').ravel()[keep]
+
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if len(order) else np.array([], dtype='int64')
+    present = sorted_codes[starts]
+    block = values[order]
+    valid = ~np.isnan(block)
+    filled = np.where(valid, block, 0.0)
+
+    def reduce(array):
+        out = np.zeros((n_groups,) + array.shape[1:])
+        if len(starts):
+            out[present] = np.add.reduceat(array, starts, axis=0)
+        return out
+
+    rows = np.bincount(codes, minlength=n_groups)
+    n = reduce(valid.astype('float64'))
+    mean = _safe_divide(reduce(filled), n)
+    dev = np.where(valid, block - mean[sorted_codes], 0.0)
+    std = np.sqrt(_safe_divide(reduce(dev * dev), n - 1))
+    result = {
+        'rows': rows,
+        'n': n,
+        'mean': mean,
+        'std': std,
+        'se': _safe_divide(std, np.sqrt(rows)[:, None]),
+    }
+    if weights is not None:
+        w = np.asarray(weights, dtype='float64').ravel()[order]
+        w = np.where(np.isfinite(w) & (w > 0), w, 0.0)[:, None]
+        w_valid = valid * w
+        sum_w = reduce(w_valid)
+        w_n = reduce((valid & (w > 0)).astype('float64'))
+        w_mean = _safe_divide(reduce(filled * w), sum_w)
+        w_dev = np.where(valid, block - w_mean[sorted_codes], 0.0)
+        w_std = np.sqrt(_safe_divide(reduce(w_dev * w_dev * w), sum_w))
+        result.update({
+            'w_mean': w_mean,
+            'w_std': w_std,
+            'w_se': _safe_divide(w_std, np.sqrt(w_n)),
+            'w_n': w_n,
+        })
+    return result
+
+
+def estimate_entry(mean, std, se):
+    """Format one estimate the way the API and reports expect it"""
+    mean, std, se = float(mean), float(std), float(se)
+    return {
+        'mean': mean,
+        'std': std,
+        'se': se,
+        'ci_95_lower': mean - Z_SCORE_95 * se,
+        'ci_95_upper': mean + Z_SCORE_95 * se
+    }
+
+
+def finite_list(values):
+    """``values`` as a list with NaN and infinity replaced by None (strict JSON has no NaN)"""
+    values = np.asarray(values, dtype='float64')
+    return np.where(np.isfinite(values), values, None).tolist()
+
+
+def domain_entry(mean, std, se):
+    """Columnar estimate_entry for per-domain arrays; statistics a domain cannot define are None
+
+    A one-row domain has no standard deviation, so its std, se and interval
+    come out as None rather than NaN.
+    """
+    mean, std, se = (np.asarray(a, dtype='float64') for a in (mean, std, se))
+    return {
+        'mean': finite_list(mean),
+        'std': finite_list(std),
+        'se': finite_list(se),
+        'ci_95_lower': finite_list(mean - Z_SCORE_95 * se),
+        'ci_95_upper': finite_list(mean + Z_SCORE_95 * se)
+    }
+
+
+# ---------------------------------------------------------------------------
+# Design-based variance (stratified cluster designs and replicate weights)
+# ---------------------------------------------------------------------------
+
+REPLICATE_METHODS = ('jackknife', 'brr', 'fay', 'bootstrap')
+# Upper bound on design-generated replicate multipliers held at once (replicates x PSUs)
+MAX_MULTIPLIER_ELEMENTS = 32 * 1024 * 1024
+MAX_JACKKNIFE_REPLICATES = 5000
+
+
+def _codes(labels, n_rows):
+    """Integer codes 0..k-1 for a label array (None means a single group)"""
+    if labels is None:
+        return np.zeros(n_rows, dtype='int64')
+    _, codes = np.unique(np.asarray(labels), return_inverse=True)
+    return codes.astype('int64').ravel()
+
+
+def design_index(strata, clusters, n_rows):
+    """Map rows to PSUs nested in strata
+
+    Returns ``(psu_of_row, stratum_of_psu)``. PSU labels are nested within strata,
+    so the same cluster id in two strata is two PSUs. Without clusters every row
+    is its own PSU.
+    """
+    stratum_codes = _codes(strata, n_rows)
+    cluster_codes = np.arange(n_rows, dtype='int64') if clusters is None else _codes(clusters, n_rows)
+    width = int(cluster_codes.max()) + 1 if n_rows else 1
+    pairs = stratum_codes * width + cluster_codes
+    unique_pairs, psu_of_row = np.unique(pairs, return_inverse=True)
+    # unique_pairs is sorted, so PSUs come out grouped by stratum
+    return psu_of_row.ravel(), (unique_pairs // width).astype('int64')
+
+
+def _group_sums(block, group_of_row, n_groups):
+    """Sum the rows of ``block`` within each group with one sort + reduceat"""
+    order = np.argsort(group_of_row, kind='stable')
+    sorted_groups = group_of_row[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    sums = np.zeros((n_groups, block.shape[1]))
+    if len(order):
+        sums[sorted_groups[starts]] = np.add.reduceat(block[order], starts, axis=0)
+    return sums
+
+
+def _weighted_parts(values, weights):
+    values = np.asarray(values, dtype='float64')
+    if values.ndim == 1:
+        values = values[:, None]
+    w = np.asarray(weights, dtype='float64').ravel()
+    w = np.where(np.isfinite(w) & (w > 0), w, 0.0)
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    return values, w, valid, filled
+
+
+def taylor_variance(values, weights, strata=None, clusters=None):
+    """Taylor-linearized SE of the weighted mean of every column
+
+    Uses the with-replacement approximation for stratified cluster designs:
+    ``var = sum_h n_h/(n_h-1) * sum_j (z_hj - zbar_h)^2`` over PSU totals of the
+    linearized variable. Missing values are handled as domain estimation (they
+    contribute zero to the linearized variable). Strata with a single PSU add no
+    variance and are counted in ``singleton_strata``.
+    """
+    values, w, valid, filled = _weighted_parts(values, weights)
+    n_rows = values.shape[0]
+    psu_of_row, stratum_of_psu = design_index(strata, clusters, n_rows)
+    n_psu = len(stratum_of_psu)
+    n_strata = int(stratum_of_psu.max()) + 1 if n_psu else 0
+
+    weighted_valid = valid * w[:, None]
+    sum_w = weighted_valid.sum(axis=0)
+    mean = _safe_divide(w @ filled, sum_w)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = np.where(valid, (values - mean) * w[:, None], 0.0) / np.where(sum_w > 0, sum_w, np.nan)
+
+    psu_totals = _group_sums(z, psu_of_row, n_psu)
+    psu_per_stratum = np.bincount(stratum_of_psu, minlength=n_strata)
+    stratum_means = _group_sums(psu_totals, stratum_of_psu, n_strata) / np.maximum(psu_per_stratum, 1)[:, None]
+    centered = psu_totals - stratum_means[stratum_of_psu]
+    n_h = psu_per_stratum[stratum_of_psu].astype('float64')
+    factor = np.where(n_h > 1, n_h / np.maximum(n_h - 1, 1), 0.0)
+    variance = (factor[:, None] * centered * centered).sum(axis=0)
+    return {
+        'mean': mean,
+        'se': np.sqrt(variance),
+        'method': 'taylor',
+        'n_psu': n_psu,
+        'n_strata': n_strata,
+        'df': n_psu - n_strata,
+        'singleton_strata': int((psu_per_stratum == 1).sum()),
+    }
+
+
+def _hadamard(size):
+    """Sylvester Hadamard matrix of the smallest power-of-two order >= size"""
+    matrix = np.ones((1, 1))
+    while matrix.shape[0] < size:
+        matrix = np.block([[matrix, matrix], [matrix, -matrix]])
+    return matrix
+
+
+def replicate_multipliers(stratum_of_psu, method='jackknife', n_replicates=100, rho=0.5, seed=42):
+    """PSU-level weight multipliers for design-generated replicates
+
+    Returns ``(A, scale, rscales)`` where ``A`` is (replicates x PSUs) and the
+    variance is ``scale * sum_r rscales[r] * (theta_r - theta)^2``.
+    """
+    n_psu = len(stratum_of_psu)
+    n_strata = int(stratum_of_psu.max()) + 1 if n_psu else 0
+    psu_per_stratum = np.bincount(stratum_of_psu, minlength=n_strata)
+
+    if method == 'jackknife':
+        # Delete-one-PSU (JKn): drop PSU j, reweight the rest of its stratum by n_h/(n_h-1)
+        droppable = np.flatnonzero(psu_per_stratum[stratum_of_psu] > 1)
+        if len(droppable) > MAX_JACKKNIFE_REPLICATES:
+            raise ValueError(
+                f"Jackknife would need {len(droppable)} replicates; specify a cluster column "
+                "or supply replicate weights"
+            )
+        n_h = psu_per_stratum[stratum_of_psu[droppable]].astype('float64')
+        multipliers = np.ones((len(droppable), n_psu))
+        same_stratum = stratum_of_psu[droppable][:, None] == stratum_of_psu[None, :]
+        multipliers[same_stratum] = np.repeat(n_h / (n_h - 1), same_stratum.sum(axis=1))
+        multipliers[np.arange(len(droppable)), droppable] = 0.0
+        return multipliers, 1.0, (n_h - 1) / n_h
+
+    if method in ('brr', 'fay'):
+        if n_psu and np.any(psu_per_stratum != 2):
+            raise ValueError("BRR requires exactly 2 PSUs in every stratum")
+        rho = rho if method == 'fay' else 0.0
+        hadamard = _hadamard(n_strata + 1)[:, 1:n_strata + 1]
+        # First PSU of each stratum (PSUs are grouped by stratum) gets the Hadamard sign
+        first_psu = np.r_[True, stratum_of_psu[1:] != stratum_of_psu[:-1]]
+        signs = hadamard[:, stratum_of_psu] * np.where(first_psu, 1.0, -1.0)[None, :]
+        multipliers = np.where(signs > 0, 2.0 - rho, rho)
+        n_rep = multipliers.shape[0]
+        return multipliers, 1.0 / (n_rep * (1.0 - rho) ** 2), np.ones(n_rep)
+
+    if method == 'bootstrap':
+        # Rao-Wu rescaling bootstrap: resample n_h-1 PSUs with replacement per stratum
+        rng = np.random.default_rng(seed)
+        multipliers = np.ones((n_replicates, n_psu))
+        order = np.argsort(stratum_of_psu, kind='stable')
+        starts = np.r_[0, np.cumsum(psu_per_stratum)]
+        for h in np.flatnonzero(psu_per_stratum > 1):
+            members = order[starts[h]:starts[h + 1]]
+            n_h = len(members)
+            draws = rng.integers(0, n_h, size=(n_replicates, n_h - 1))
+            flat = (np.arange(n_replicates)[:, None] * n_h + draws).ravel()
+            counts = np.bincount(flat, minlength=n_replicates * n_h).reshape(n_replicates, n_h)
+            multipliers[:, members] = counts * (n_h / (n_h - 1))
+        return multipliers, 1.0 / n_replicates, np.ones(n_replicates)
+
+    raise ValueError(f"Replicate method must be one of {', '.join(REPLICATE_METHODS)}")
+
+
+def _replicate_totals(replicate_weights, filled, valid_f, columns):
+    block = replicate_weights[:, columns]
+    return block.T @ filled, block.T @ valid_f
+
+
+def replicate_variance(values, weights, replicate_weights=None, strata=None, clusters=None,
+                       method='jackknife', n_replicates=100, rho=0.5, seed=42,
+                       scale=None, rscales=None, workers=1):
+    """Replicate-weight SE of the weighted mean of every column
+
+    With ``replicate_weights`` (rows x R) the replicate means for all columns are
+    two matrix products, ``W_r.T @ Y`` and ``W_r.T @ valid``. Without them,
+    replicates are generated from the design and applied to PSU totals, so the
+    cost is independent of the row count. ``workers > 1`` splits supplied
+    replicates across a thread pool; NumPy releases the GIL in matrix products,
+    so the data block is shared rather than copied into each worker. This only
+    helps when NumPy is linked against a single-threaded BLAS.
+    """
+    values, w, valid, filled = _weighted_parts(values, weights)
+    valid_f = valid.astype('float64')
+    theta = _safe_divide(w @ filled, w @ valid_f)
+
+    if replicate_weights is not None:
+        rep = np.asarray(replicate_weights, dtype='float64')
+        rep = np.where(np.isfinite(rep) & (rep > 0), rep, 0.0)
+        n_rep = rep.shape[1]
+        if workers and workers > 1 and n_rep > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            chunks = np.array_split(np.arange(n_rep), min(workers, n_rep))
+            with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+                parts = list(pool.map(lambda cols: _replicate_totals(rep, filled, valid_f, cols), chunks))
+            numerators = np.vstack([p[0] for p in parts])
+            denominators = np.vstack([p[1] for p in parts])
+        else:
+            numerators, denominators = rep.T @ filled, rep.T @ valid_f
+        if scale is None:
+            defaults = {
+                'jackknife': (n_rep - 1) / n_rep,
+                'brr': 1.0 / n_rep,
+                'fay': 1.0 / (n_rep * (1.0 - rho) ** 2),
+                'bootstrap': 1.0 / n_rep,
+            }
+            if method not in defaults:
+                raise ValueError(f"Replicate method must be one of {', '.join(REPLICATE_METHODS)}")
+            scale = defaults[method]
+        rscales = np.ones(n_rep) if rscales is None else np.asarray(rscales, dtype='float64')
+        meta = {'n_replicates': n_rep, 'replicate_source': 'supplied'}
+    else:
+        psu_of_row, stratum_of_psu = design_index(strata, clusters, values.shape[0])
+        n_psu = len(stratum_of_psu)
+        y_totals = _group_sums(filled * w[:, None], psu_of_row, n_psu)
+        w_totals = _group_sums(valid_f * w[:, None], psu_of_row, n_psu)
+        if method == 'bootstrap':
+            # Generate bootstrap replicates in batches so replicates x PSUs stays bounded
+            per_batch = max(1, MAX_MULTIPLIER_ELEMENTS // max(n_psu, 1))
+            numerators, denominators = [], []
+            for batch, start in enumerate(range(0, n_replicates, per_batch)):
+                multipliers, _, _ = replicate_multipliers(
+                    stratum_of_psu, method=method, n_replicates=min(per_batch, n_replicates - start),
+                    seed=[seed, batch]
+                )
+                numerators.append(multipliers @ y_totals)
+                denominators.append(multipliers @ w_totals)
+            numerators, denominators = np.vstack(numerators), np.vstack(denominators)
+            default_scale, default_rscales = 1.0 / n_replicates, np.ones(n_replicates)
+        else:
+            multipliers, default_scale, default_rscales = replicate_multipliers(
+                stratum_of_psu, method=method, n_replicates=n_replicates, rho=rho, seed=seed
+            )
+            numerators, denominators = multipliers @ y_totals, multipliers @ w_totals
+        scale = default_scale if scale is None else scale
+        rscales = default_rscales if rscales is None else np.asarray(rscales, dtype='float64')
+        meta = {'n_replicates': numerators.shape[0], 'replicate_source': 'design', 'n_psu': n_psu}
+
+    theta_r = _safe_divide(numerators, denominators)
+    deviations = theta_r - theta[None, :]
+    variance = scale * np.nansum(rscales[:, None] * deviations * deviations, axis=0)
+    result = {'mean': theta, 'se': np.sqrt(variance), 'method': method}
+    result.update(meta)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Quantiles and outlier flags
+# ---------------------------------------------------------------------------
+
+OUTLIER_METHODS = ('iqr', 'zscore')
+
+
+def column_quantiles(values, quantiles):
+    """Linear-interpolated quantiles of every column, ignoring NaN
+
+    Matches ``Series.quantile`` (and ``np.nanquantile``). Instead of sorting,
+    NaNs are treated as +inf and each column block is partitioned in place at
+    just the ranks the requested quantiles need; columns are grouped by their
+    non-missing count so the ranks are shared. Returns a (len(quantiles) x
+    columns) array.
+    """
+    values = np.asarray(values, dtype='float64')
+    if values.ndim == 1:
+        values = values[:, None]
+    quantiles = np.atleast_1d(np.asarray(quantiles, dtype='float64'))
+    n_rows, n_cols = values.shape
+    out = np.full((len(quantiles), n_cols), np.nan)
+    block_cols = max(1, BLOCK_ELEMENTS // max(n_rows, 1))
+    for start in range(0, n_cols, block_cols):
+        # Transposed copy: each partition runs over contiguous memory, in place
+        block = values[:, start:start + block_cols].T.copy(order='C')
+        nan = np.isnan(block)
+        counts = n_rows - nan.sum(axis=1)
+        if nan.any():
+            block[nan] = np.inf
+        for n in np.unique(counts):
+            if n == 0:
+                continue
+            cols = np.flatnonzero(counts == n)
+            part = block[cols] if len(cols) < len(block) else block
+            position = quantiles * (n - 1)
+            lower = np.floor(position).astype('int64')
+            # One single-rank partition per distinct rank, each on the slice right
+            # of the previous one (NumPy's multi-rank partition is far slower);
+            # the next order statistic is then just the minimum of the remainder.
+            low, high = {}, {}
+            offset = 0
+            for rank in np.unique(lower):
+                part[:, offset:].partition(rank - offset, axis=1)
+                low[rank] = part[:, rank]
+                high[rank] = part[:, rank + 1:].min(axis=1) if rank + 1 < n else low[rank]
+                offset = rank + 1
+            fraction = (position - lower)[:, None]
+            low = np.array([low[rank] for rank in lower])
+            high = np.array([high[rank] for rank in lower])
+            with np.errstate(invalid='ignore'):
+                out[:, start + cols] = np.where(fraction > 0, low + (high - low) * fraction, low)
+    return out
+
+
+def iqr_bounds(values, threshold=1.5):
+    """``(lower, upper)`` fences Q1 - t*IQR and Q3 + t*IQR of every column, from one quantile pass"""
+    q1, q3 = column_quantiles(values, [0.25, 0.75])
+    iqr = q3 - q1
+    return q1 - threshold * iqr, q3 + threshold * iqr
+
+
+def outlier_mask(values, method='iqr', threshold=1.5):
+    """Boolean (rows x columns) outlier flags for every column at once
+
+    ``iqr`` flags values outside [Q1 - t*IQR, Q3 + t*IQR]; ``zscore`` flags
+    |x - mean| / std > t using the population std (columns with zero or
+    undefined std have no outliers). Missing values are never flagged.
+    """
+    values = np.asarray(values, dtype='float64')
+    if values.ndim == 1:
+        values = values[:, None]
+    if method == 'iqr':
+        lower, upper = iqr_bounds(values, threshold)
+        with np.errstate(invalid='ignore'):
+            return (values < lower) | (values > upper)
+    if method == 'zscore':
+        valid = ~np.isnan(values)
+        n = valid.sum(axis=0)
+        mean = _safe_divide(np.where(valid, values, 0.0).sum(axis=0), n)
+        dev = np.where(valid, values - mean, 0.0)
+        std = np.sqrt(_safe_divide(np.einsum('ij,ij->j', dev, dev), n))
+        usable = np.isfinite(std) & (std > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (np.abs(dev) / np.where(usable, std, np.inf) > threshold) & valid & usable
+    raise ValueError(f"Outlier method must be one of {OUTLIER_METHODS}")
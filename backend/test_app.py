@@ -5,17 +5,88 @@ Ministry of Statistics and Programme Implementation (MoSPI)
 """
 
 import unittest
+import json
+import gzip
 import pandas as pd
 import numpy as np
 import tempfile
+import shutil
 import os
 import sys
+import time
+import zipfile
 from io import BytesIO
+from unittest import mock
 
 # Add the current directory to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app import DataProcessor
+# The app creates its database and upload folders on import; keep both out of the working tree.
+# Worker processes spawned by the tests re-import this module and inherit the parent's folder.
+if 'ASDP_TEST_ROOT' not in os.environ:
+    os.environ['ASDP_TEST_ROOT'] = tempfile.mkdtemp(prefix='asdp-tests-')
+_TEST_ROOT = os.environ['ASDP_TEST_ROOT']
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_TEST_ROOT, 'app.db')
+os.environ['UPLOAD_FOLDER'] = os.path.join(_TEST_ROOT, 'uploads')
+
+import app as app_module
+from app import app, DataProcessor, ProcessorRegistry
+import artifact_store
+import sketches
+
+
+def tearDownModule():
+    shutil.rmtree(_TEST_ROOT, ignore_errors=True)
+
+
+class AppTestCase(unittest.TestCase):
+    """Base for tests that go through the web app
+
+    Every test starts with empty tables, its own upload folder tree, processor
+    registry and artifact store, and gets app.config restored afterwards, so
+    tests never see each other's rows or files.
+    """
+
+    FOLDERS = {
+        'AVATAR_FOLDER': 'avatars',
+        'PROCESSOR_CACHE_FOLDER': 'processor_cache',
+        'JOB_FOLDER': 'jobs',
+        'REPORT_CACHE_FOLDER': 'reports',
+        'BATCH_FOLDER': 'batches',
+        'ARTIFACT_FOLDER': 'artifacts',
+    }
+
+    def setUp(self):
+        from app import db
+        saved_config = dict(app.config)
+        self.addCleanup(lambda: (app.config.clear(), app.config.update(saved_config)))
+        root = tempfile.mkdtemp(dir=_TEST_ROOT)
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        app.config['UPLOAD_FOLDER'] = root
+        for key, name in self.FOLDERS.items():
+            app.config[key] = os.path.join(root, name)
+            os.makedirs(app.config[key])
+        replacements = {
+            'processors': ProcessorRegistry(app.config['PROCESSOR_CACHE_FOLDER'], max_entries=app.config['PROCESSOR_CACHE_SIZE']),
+            'run_artifacts': artifact_store.ArtifactStore(app.config['ARTIFACT_FOLDER']),
+            '_admin_counts': {'at': 0.0, 'counts': None},
+        }
+        for name, value in replacements.items():
+            patcher = mock.patch.object(app_module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+        self.client = app.test_client()
+
+    def _upload_frame(self, frame, name='d.csv', client=None):
+        """POST ``frame`` as a CSV file to /upload (as ``client``, default self.client); returns the JSON body"""
+        buffer = BytesIO(frame.to_csv(index=False).encode('utf-8'))
+        response = (client or self.client).post('/upload', data={'file': (buffer, name)}, content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
 
 class TestDataProcessor(unittest.TestCase):
     """Test cases for the DataProcessor class"""
@@ -55,6 +126,128 @@ class TestDataProcessor(unittest.TestCase):
             # Clean up
             os.unlink(tmp_filename)
     
+    def test_load_data_uses_parse_cache(self):
+        """Second load of the same file is served from the columnar snapshot"""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'survey.csv')
+            frame = self.test_data.copy()
+            frame['region'] = ['north', 'south'] * 5
+            frame['amount'] = ['₹1,200', '₹3,400'] * 5
+            frame.to_csv(path, index=False)
+
+            self.assertTrue(self.processor.load_data(path))
+            self.assertTrue(os.path.isdir(path + '.cache'))
+
+            cached = DataProcessor()
+            self.assertTrue(cached.load_data(path))
+            pd.testing.assert_frame_equal(cached.data, self.processor.data)
+            self.assertIn('Auto-converted numeric-like columns: amount', cached.cleaning_log)
+
+            # Cached numeric columns can still be modified in place
+            cached.impute_missing_values(method='mean')
+            self.assertFalse(cached.data['age'].isnull().any())
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_snapshot_round_trip(self):
+        """Snapshots load exactly as parsed; frames they cannot reproduce are not cached"""
+        import parse_cache
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'survey.csv')
+            frame = pd.DataFrame({'code': pd.Series([b'a', np.nan, b'b'], dtype=object), 'x': [1.0, np.nan, 2.0]})
+            self.assertIsNotNone(parse_cache.save_snapshot(frame, path, 'k1'))
+            cached, _ = parse_cache.load_snapshot(path, 'k1')
+            pd.testing.assert_frame_equal(cached, frame)
+            self.assertTrue(isinstance(cached['code'].iloc[1], float))
+
+            # Integer headers (Excel without a header row) and duplicate names
+            self.assertIsNone(parse_cache.save_snapshot(pd.DataFrame([[1, 2]]), path, 'k2'))
+            self.assertIsNone(parse_cache.save_snapshot(pd.DataFrame([[1, 2]], columns=['a', 'a']), path, 'k3'))
+            self.assertIsNone(parse_cache.load_snapshot(path, 'k2'))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_summarize_file_chunked(self):
+        """Chunked scan reports the same summary as a full load"""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as tmp_file:
+            frame = self.test_data.copy()
+            frame['amount'] = ['1,200', '3,400', None, '5,600', '7,800'] * 2
+            frame.to_csv(tmp_file.name, index=False)
+            tmp_filename = tmp_file.name
+
+        try:
+            summary = self.processor.summarize_file(tmp_filename, chunksize=3)
+            full = DataProcessor()
+            self.assertTrue(full.load_data(tmp_filename, use_cache=False, optimize=False))
+            self.assertEqual(summary['rows'], 10)
+            self.assertEqual(summary['columns'], 6)
+            self.assertEqual(summary['column_names'], full.data.columns.tolist())
+            self.assertEqual(summary['data_types'], full.data.dtypes.astype(str).to_dict())
+            self.assertEqual(summary['missing_values'], full.detect_missing_values())
+
+            # Plot aggregates built while streaming agree with the full load's
+            plots = full.generate_plot_data()
+            self.assertEqual(set(summary['plots']), set(plots))
+            self.assertEqual(summary['plots']['missing'], plots['missing'])
+            np.testing.assert_allclose(
+                np.array(summary['plots']['correlation']['matrix'], dtype=float),
+                np.array(plots['correlation']['matrix'], dtype=float)
+            )
+            for column in ('age', 'income'):
+                self.assertEqual(sum(summary['plots'][f'dist_{column}']['counts']), full.data[column].notna().sum())
+        finally:
+            os.unlink(tmp_filename)
+
+    def test_numeric_inference(self):
+        """Indian digit grouping, currency markers and percentages are parsed; text columns are left alone"""
+        import type_inference
+        frame = pd.DataFrame({
+            'name': ['Asha', 'Ravi', 'Meena', 'Arjun', 'Kiran'],
+            'income': ['₹1,20,000', 'Rs. 4,500', 'INR 2,50,00,000', '-₹3,200', None],
+            'share': ['45%', '12.5%', '0%', '100%', '7%'],
+        })
+        converted = type_inference.coerce_numeric_columns(frame)
+        self.assertEqual(converted, ['income', 'share'])
+        self.assertEqual(frame['income'].tolist()[:4], [120000.0, 4500.0, 25000000.0, -3200.0])
+        self.assertTrue(np.isnan(frame['income'].iloc[4]))
+        self.assertEqual(frame['share'].tolist(), [45.0, 12.5, 0.0, 100.0, 7.0])
+        self.assertFalse(pd.api.types.is_numeric_dtype(frame['name'].dtype))
+
+        # The pandas fallback (no pyarrow) reads values the same way
+        values = pd.Series(['₹1,20,000', ' Rs. 1,200', '1e5', '.5', 'abc', 'nan', None, 7], dtype=object)
+        with mock.patch.object(type_inference, '_pyarrow_compute', return_value=(None, None)):
+            fallback = type_inference.parse_numeric(values)
+        pd.testing.assert_series_equal(type_inference.parse_numeric(values), fallback)
+
+    def test_optimize_memory(self):
+        """Optional dtype optimization shrinks the frame without changing estimates"""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'survey.csv')
+            frame = self.test_data.copy()
+            frame['education_level'] = ['Primary', 'Secondary', 'Graduate', 'Primary', 'Secondary'] * 2
+            frame.to_csv(path, index=False)
+            plain = DataProcessor()
+            self.assertTrue(plain.load_data(path, use_cache=False, optimize=False))
+            compact = DataProcessor()
+            self.assertTrue(compact.load_data(path, use_cache=False, optimize=True))
+
+            self.assertEqual(compact.data['education'].dtype, np.int8)
+            self.assertEqual(compact.data['weight'].dtype, np.float64)  # 1.1 has no exact float32
+            self.assertIsInstance(compact.data['education_level'].dtype, pd.CategoricalDtype)
+            self.assertTrue(any(entry.startswith('Optimized memory:') for entry in compact.cleaning_log))
+            self.assertLess(compact.data.memory_usage(deep=True).sum(), plain.data.memory_usage(deep=True).sum())
+
+            config = {'imputation': {'method': 'mean'}, 'weights': {'column': 'weight'}, 'group_by': ['education_level']}
+            expected = plain.run_pipeline(config)
+            result = compact.run_pipeline(config)
+            self.assertEqual(result['estimates'], expected['estimates'])
+            self.assertEqual(result['domain_estimates'], expected['domain_estimates'])
+        finally:
+            shutil.rmtree(tmp_dir)
+
     def test_detect_missing_values(self):
         """Test missing value detection"""
         self.processor.data = self.test_data
@@ -79,6 +272,39 @@ class TestDataProcessor(unittest.TestCase):
         # Check that the imputed values are reasonable
         self.assertGreater(self.processor.data.loc[2, 'age'], 0)
         self.assertGreater(self.processor.data.loc[5, 'income'], 0)
+
+    def test_approximate_knn_imputation(self):
+        """Approximate KNN fills from the nearest complete-case donors"""
+        rng = np.random.default_rng(0)
+        latent = rng.normal(size=(400, 1))
+        frame = pd.DataFrame(latent @ np.ones((1, 4)) + 0.1 * rng.normal(size=(400, 4)), columns=list('abcd'))
+        missing = rng.random(frame.shape) < 0.1
+        masked = frame.mask(missing)
+        self.processor.data = masked.copy()
+        self.processor.impute_missing_values(method='knn_approx')
+        imputed = self.processor.data.to_numpy()
+        self.assertFalse(np.isnan(imputed).any())
+        np.testing.assert_allclose(imputed[~missing], frame.to_numpy()[~missing])
+
+        # Brute-force reference: mean of the 5 nearest complete rows on the observed columns
+        complete = masked.dropna().to_numpy()
+        for row in np.flatnonzero(missing.any(axis=1))[:20]:
+            observed = ~missing[row]
+            if not observed.any():
+                continue
+            dist = ((complete[:, observed] - frame.to_numpy()[row, observed]) ** 2).sum(axis=1)
+            nearest = complete[np.argsort(dist, kind='stable')[:5]]
+            np.testing.assert_allclose(imputed[row, ~observed], nearest[:, ~observed].mean(axis=0))
+
+        # Above KNN_EXACT_MAX_ROWS, 'knn' switches to the approximate search
+        app.config['KNN_EXACT_MAX_ROWS'] = 100
+        try:
+            self.processor.data = masked.copy()
+            self.processor.impute_missing_values(method='knn')
+        finally:
+            app.config['KNN_EXACT_MAX_ROWS'] = 20000
+        np.testing.assert_allclose(self.processor.data.to_numpy(), imputed)
+        self.assertIn('approximate KNN', self.processor.cleaning_log[-1])
     
     def test_detect_outliers(self):
         """Test outlier detection"""
@@ -88,6 +314,50 @@ class TestDataProcessor(unittest.TestCase):
         # Should detect the outlier in income
         self.assertIn('income', outliers_report)
         self.assertGreater(outliers_report['income']['count'], 0)
+
+    def test_detect_outliers_matches_per_column_reference(self):
+        """Vectorized IQR/z-score flags match the per-column pandas filters"""
+        rng = np.random.default_rng(3)
+        frame = pd.DataFrame(rng.standard_t(3, size=(501, 6)), columns=list('abcdef'), index=np.arange(501) * 2)
+        frame = frame.mask(rng.random(frame.shape) < 0.1)
+        frame['f'] = 1.0
+        self.processor.data = frame
+        for method, threshold in (('iqr', 1.5), ('zscore', 2.0)):
+            report = self.processor.detect_outliers(method=method, threshold=threshold)
+            self.assertEqual(list(report), list(frame.columns))
+            for column in frame.columns:
+                series = frame[column]
+                if method == 'iqr':
+                    q1, q3 = series.quantile(0.25), series.quantile(0.75)
+                    flagged = (series < q1 - threshold * (q3 - q1)) | (series > q3 + threshold * (q3 - q1))
+                else:
+                    std = series.std(ddof=0)
+                    flagged = ((series - series.mean()) / std).abs() > threshold if std > 0 else series != series
+                self.assertEqual(report[column]['count'], int(flagged.sum()))
+                self.assertAlmostEqual(report[column]['percentage'], flagged.mean() * 100)
+                self.assertEqual(report.indices(column), series.index[flagged].tolist())
+
+    def test_multivariate_isolation_forest(self):
+        """One forest across columns flags joint outliers and is reused from the cache"""
+        rng = np.random.default_rng(5)
+        latent = rng.normal(size=(1000, 1))
+        frame = pd.DataFrame(np.hstack([latent, latent]) + 0.05 * rng.normal(size=(1000, 2)), columns=['x', 'y'])
+        frame.loc[0, ['x', 'y']] = [2.0, -2.0]  # Unremarkable per column, far off the joint trend
+        frame.loc[1, 'x'] = np.nan
+        self.processor.data = frame
+        report = self.processor.detect_outliers(method='isolation_forest_multivariate')
+        self.assertIn(0, report.indices('x'))
+        self.assertEqual(report.indices('x'), report.indices('y'))
+        self.assertEqual(len(self.processor._models), 1)
+
+        model = next(iter(self.processor._models.values()))
+        self.processor.detect_outliers(method='isolation_forest_multivariate')
+        self.assertEqual(len(self.processor._models), 1)
+        self.assertIs(next(iter(self.processor._models.values())), model)
+
+        # New batches are scored with the fitted model
+        batch = pd.DataFrame({'x': [0.1, 3.0], 'y': [0.1, -3.0]})
+        self.assertEqual(self.processor.score_outliers(batch).tolist(), [False, True])
     
     def test_handle_outliers(self):
         """Test outlier handling"""
@@ -99,7 +369,23 @@ class TestDataProcessor(unittest.TestCase):
         # Check that the extreme outlier is clipped
         max_income = self.processor.data['income'].max()
         self.assertLess(max_income, 500000)  # Should be clipped
-    
+
+    def test_remove_outliers_single_mask(self):
+        """Removal uses fences from the unfiltered data, keeps missing values and ignores column order"""
+        frame = pd.DataFrame({
+            'a': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 100.0, None],
+            'b': [10.0, 11.0, 12.0, -90.0, 14.0, 15.0, 16.0, 17.0, 18.0],
+        })
+        results = []
+        for order in (['a', 'b'], ['b', 'a']):
+            processor = DataProcessor()
+            processor.data = frame[order].copy()
+            processor.handle_outliers(method='remove')
+            results.append(processor.data[['a', 'b']])
+        pd.testing.assert_frame_equal(results[0], results[1])
+        self.assertEqual(results[0].index.tolist(), [0, 1, 2, 4, 5, 6, 8])
+        self.assertIn('removed 2 rows; values outside the IQR fences: b 1, a 1', processor.cleaning_log[-1])
+
     def test_apply_weights(self):
         """Test weight application"""
         self.processor.data = self.test_data
@@ -134,10 +420,147 @@ class TestDataProcessor(unittest.TestCase):
                 self.assertIn('ci_95_lower', est[est_type])
                 self.assertIn('ci_95_upper', est[est_type])
     
+    def test_calculate_estimates_matches_per_column_reference(self):
+        """Batched kernel reproduces the per-column pandas computations"""
+        self.processor.data = self.test_data
+        self.processor.apply_weights('weight')
+        estimates = self.processor.calculate_estimates()
+
+        for column in ['age', 'income']:
+            x = self.test_data[column]
+            self.assertAlmostEqual(estimates[column]['unweighted']['mean'], x.mean())
+            self.assertAlmostEqual(estimates[column]['unweighted']['std'], x.std())
+            self.assertAlmostEqual(estimates[column]['unweighted']['se'], x.std() / np.sqrt(len(x)))
+
+            mask = x.notna()
+            xv, wv = x[mask], self.test_data['weight'][mask]
+            w_mean = (xv * wv).sum() / wv.sum()
+            w_std = np.sqrt((((xv - w_mean) ** 2) * wv).sum() / wv.sum())
+            self.assertAlmostEqual(estimates[column]['weighted']['mean'], w_mean)
+            self.assertAlmostEqual(estimates[column]['weighted']['std'], w_std)
+            self.assertAlmostEqual(estimates[column]['weighted']['se'], w_std / np.sqrt(len(xv)))
+
+    def test_design_based_standard_errors(self):
+        """Taylor and replicate SEs honour strata and clusters"""
+        rng = np.random.default_rng(7)
+        frame = pd.DataFrame({
+            'stratum': np.repeat(['a', 'b', 'c', 'd'], 25),
+            'psu': np.tile(np.repeat([1, 2], [12, 13]), 4),
+            'score': rng.normal(50, 10, 100),
+            'weight': rng.uniform(0.5, 2.0, 100),
+        })
+        self.processor.data = frame
+        self.processor.apply_weights('weight')
+        simple = self.processor.calculate_estimates(columns=['score'])['score']['weighted']
+
+        design = {'strata': 'stratum', 'cluster': 'psu'}
+        taylor = self.processor.calculate_estimates(columns=['score'], design=design)['score']['weighted']
+        self.assertEqual(taylor['se_method'], 'taylor')
+        self.assertAlmostEqual(taylor['mean'], simple['mean'])
+        self.assertNotAlmostEqual(taylor['se'], simple['se'])
+        self.assertAlmostEqual(taylor['ci_95_upper'] - taylor['mean'], 1.96 * taylor['se'])
+
+        # Hand-computed Taylor linearization over PSU totals
+        z = frame['weight'] * (frame['score'] - taylor['mean']) / frame['weight'].sum()
+        totals = z.groupby([frame['stratum'], frame['psu']]).sum()
+        variance = sum(
+            len(g) / (len(g) - 1) * ((g - g.mean()) ** 2).sum()
+            for _, g in totals.groupby(level=0)
+        )
+        self.assertAlmostEqual(taylor['se'], np.sqrt(variance))
+
+        for method in ('jackknife', 'brr', 'bootstrap'):
+            replicate = self.processor.calculate_estimates(columns=['score'], design=dict(design, method=method))
+            self.assertEqual(replicate['score']['weighted']['se_method'], method)
+            self.assertGreater(replicate['score']['weighted']['se'], 0)
+
+    def test_supplied_replicate_weights(self):
+        """Replicate weight columns reproduce the design-generated jackknife"""
+        import survey_stats
+        rng = np.random.default_rng(3)
+        frame = pd.DataFrame({'psu': np.repeat(np.arange(10), 5), 'score': rng.normal(size=50), 'weight': 1.0})
+        psu_of_row, stratum_of_psu = survey_stats.design_index(None, frame['psu'].to_numpy(), len(frame))
+        multipliers, _, _ = survey_stats.replicate_multipliers(stratum_of_psu, 'jackknife')
+        for r in range(multipliers.shape[0]):
+            frame[f'repwt_{r}'] = multipliers[r, psu_of_row]
+
+        self.processor.data = frame
+        self.processor.apply_weights('weight')
+        supplied = self.processor.calculate_estimates(design={'replicate_weights': 'repwt_', 'method': 'jackknife'})
+        generated = self.processor.calculate_estimates(design={'cluster': 'psu', 'method': 'jackknife'})
+        self.assertNotIn('repwt_0', supplied)
+        self.assertAlmostEqual(supplied['score']['weighted']['se'], generated['score']['weighted']['se'])
+
+    def test_calculate_domain_estimates(self):
+        """Domain estimates match a per-domain pandas computation"""
+        frame = self.test_data.copy()
+        frame['region'] = ['north', 'south', 'east'] * 3 + ['north']
+        frame['gender'] = ['f', 'm'] * 5
+        self.processor.data = frame
+        self.processor.apply_weights('weight')
+        result = self.processor.calculate_domain_estimates(['region', 'gender'], columns=['age', 'income'])
+
+        self.assertEqual(result['group_by'], ['region', 'gender'])
+        keys = list(zip(result['keys']['region'], result['keys']['gender']))
+        self.assertEqual(keys, sorted(keys))
+        for i, (region, gender) in enumerate(keys):
+            sub = frame[(frame['region'] == region) & (frame['gender'] == gender)]
+            self.assertEqual(result['rows'][i], len(sub))
+            age = result['estimates']['age']
+            self.assertAlmostEqual(age['unweighted']['mean'][i], sub['age'].mean())
+            valid = sub['income'].notna()
+            w_mean = (sub['income'][valid] * sub['weight'][valid]).sum() / sub['weight'][valid].sum() if valid.any() else np.nan
+            weighted = result['estimates']['income']['weighted']['mean'][i]
+            np.testing.assert_allclose(np.nan if weighted is None else weighted, w_mean, equal_nan=True)
+
+    def test_domain_estimates_are_strict_json(self):
+        """One-row domains and a missing group key serialize as null, never as a bare NaN"""
+        frame = self.test_data.copy()
+        frame['region'] = ['north'] * 8 + ['south', None]
+        self.processor.data = frame
+        result = self.processor.calculate_domain_estimates('region', columns=['age'])
+        self.assertEqual(result['keys']['region'], ['north', 'south', None])
+        self.assertEqual(result['rows'], [8, 1, 1])
+        age = result['estimates']['age']['unweighted']
+        self.assertEqual(age['mean'][1], 65.0)
+        self.assertIsNone(age['std'][1])
+        self.assertIsNone(age['ci_95_lower'][1])
+
+        def reject(constant):
+            raise ValueError(f"non-standard JSON constant {constant}")
+        # The same serializer /clean responses go through
+        body = json.loads(app.json.dumps({'domain_estimates': result}), parse_constant=reject)
+        self.assertIsNone(body['domain_estimates']['keys']['region'][2])
+
+    def test_run_pipeline_is_idempotent_and_memoized(self):
+        """Reruns start from the loaded data and reuse unchanged steps"""
+        self.processor.data = self.test_data.copy()
+        config = {
+            'imputation': {'method': 'mean'},
+            'outliers': {'detection_method': 'iqr', 'handling_method': 'winsorize'},
+            'weights': {'column': 'weight'},
+        }
+        first = self.processor.run_pipeline(config)
+        self.assertTrue(all(not step['cached'] for step in first['steps']))
+        # The loaded frame is never modified by cleaning
+        self.assertTrue(self.processor.source_data['age'].isnull().any())
+
+        second = self.processor.run_pipeline(config)
+        self.assertTrue(all(step['cached'] for step in second['steps']))
+        self.assertEqual(first['estimates'], second['estimates'])
+        self.assertEqual(first['cleaning_log'], second['cleaning_log'])
+
+        changed = self.processor.run_pipeline(dict(config, estimate_columns=['age']))
+        cached = {step['step']: step['cached'] for step in changed['steps']}
+        self.assertTrue(cached['impute'] and cached['outliers'] and cached['weights'] and cached['plots'])
+        self.assertFalse(cached['estimates'])
+        self.assertEqual(list(changed['estimates']), ['age'])
+        self.assertEqual(changed['estimates']['age'], first['estimates']['age'])
+
     def test_generate_visualizations(self):
         """Test visualization generation"""
         self.processor.data = self.test_data
-        plots = self.processor.generate_visualizations()
+        plots = self.processor.generate_visualizations(mode='html')
         
         # Should generate some plots
         self.assertGreater(len(plots), 0)
@@ -146,6 +569,24 @@ class TestDataProcessor(unittest.TestCase):
         for plot_name, plot_html in plots.items():
             self.assertIsInstance(plot_html, str)
             self.assertIn('<div', plot_html)
+
+    def test_generate_plot_data(self):
+        """Plot aggregates cover the full data and serialize as plain JSON"""
+        self.processor.data = self.test_data
+        plots = self.processor.generate_visualizations(mode='data')
+        self.assertEqual(set(plots), {'dist_id', 'dist_age', 'dist_income', 'dist_education', 'dist_weight', 'correlation', 'missing'})
+
+        income = plots['dist_income']
+        self.assertEqual(income['type'], 'histogram')
+        self.assertEqual(len(income['edges']), len(income['counts']) + 1)
+        self.assertEqual(sum(income['counts']), self.test_data['income'].notna().sum())
+        self.assertEqual(income['edges'][-1], 500000)
+
+        corr = plots['correlation']
+        self.assertEqual(corr['columns'], ['id', 'age', 'income', 'education', 'weight'])
+        self.assertAlmostEqual(corr['matrix'][1][2], self.test_data['age'].corr(self.test_data['income']))
+        self.assertEqual(plots['missing'], {'type': 'bar', 'title': 'Missing Values by Column', 'labels': ['age', 'income'], 'values': [1, 1]})
+        json.loads(json.dumps(plots, allow_nan=False))
     
     def test_generate_reports(self):
         """Test report generation"""
@@ -180,13 +621,718 @@ class TestDataProcessor(unittest.TestCase):
         self.assertIn('outliers', log_text.lower())
         self.assertIn('weights', log_text.lower())
 
+class TestSketches(unittest.TestCase):
+    """Test cases for the streaming plot sketches"""
+
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        frame = pd.DataFrame({'a': rng.normal(size=5000), 'b': rng.lognormal(size=5000)})
+        frame['c'] = frame['a'] * 3 + rng.normal(size=5000)
+        self.frame = frame.mask(rng.random(frame.shape) < 0.05)
+
+    def test_sketch_matches_full_data(self):
+        """Correlations are exact, histograms exact on their bins, quantiles within t-digest error"""
+        sketch = sketches.sketch_frame(self.frame, chunk_rows=700)
+        np.testing.assert_allclose(sketch.comoments.correlation(), self.frame.corr().to_numpy())
+        edges, counts = sketch.histograms[0].edges_counts()
+        expected, expected_edges = np.histogram(self.frame['a'].dropna(), bins=len(counts), range=(edges[0], edges[-1]))
+        np.testing.assert_array_equal(counts, expected)
+        values = np.sort(self.frame['b'].dropna().to_numpy())
+        ranks = np.searchsorted(values, sketch.digests[1].quantile(sketches.PLOT_QUANTILES)) / len(values)
+        np.testing.assert_allclose(ranks, sketches.PLOT_QUANTILES, atol=0.005)
+
+    def test_merge_equals_single_pass(self):
+        """Sketches of two halves merge into the sketch of the whole"""
+        whole = sketches.sketch_frame(self.frame)
+        merged = sketches.sketch_frame(self.frame.iloc[:2000]).merge(sketches.sketch_frame(self.frame.iloc[2000:]))
+        self.assertEqual(merged.rows, whole.rows)
+        np.testing.assert_array_equal(merged.missing, whole.missing)
+        np.testing.assert_allclose(merged.comoments.correlation(), whole.comoments.correlation())
+        for mine, theirs in zip(merged.histograms, whole.histograms):
+            self.assertEqual(mine.counts.sum(), theirs.counts.sum())
+        np.testing.assert_allclose(merged.digests[0].quantile(0.5), whole.digests[0].quantile(0.5), rtol=0.05)
+
+
+class TestProcessorRegistry(unittest.TestCase):
+    """Test cases for the per-dataset processor registry"""
+
+    def setUp(self):
+        self.spill_dir = tempfile.mkdtemp()
+        self.registry = ProcessorRegistry(self.spill_dir, max_entries=2)
+
+    def _processor(self, value):
+        processor = DataProcessor()
+        processor.data = pd.DataFrame({'x': [value, value + 1]})
+        return processor
+
+    def test_datasets_are_isolated(self):
+        """Each dataset key gets its own processor"""
+        self.registry.put(1, self._processor(10))
+        self.registry.put(2, self._processor(20))
+        self.assertEqual(self.registry.get(1).data['x'].iloc[0], 10)
+        self.assertEqual(self.registry.get(2).data['x'].iloc[0], 20)
+
+    def test_lru_eviction_spills_and_restores(self):
+        """Evicted processors are restored from disk with their state"""
+        first = self._processor(1)
+        first.cleaning_log.append('cleaned')
+        self.registry.put(1, first)
+        self.registry.put(2, self._processor(2))
+        self.registry.put(3, self._processor(3))
+        self.assertNotIn('1', self.registry._entries)
+        self.assertTrue(os.path.exists(os.path.join(self.spill_dir, '1.pkl')))
+        restored = self.registry.get(1)
+        self.assertEqual(restored.cleaning_log, ['cleaned'])
+        self.assertEqual(restored.data['x'].tolist(), [1, 2])
+
+    def test_loader_used_on_miss(self):
+        """Unknown keys are loaded through the supplied loader"""
+        def loader(processor):
+            processor.data = pd.DataFrame({'x': [42]})
+            return True
+        with self.registry.checkout(7, loader=loader) as processor:
+            self.assertEqual(processor.data['x'].iloc[0], 42)
+        self.assertIsNone(self.registry.get(8, loader=lambda p: False))
+
+    def test_lock_table_is_bounded(self):
+        """Keys share a fixed set of lock stripes instead of one lock each"""
+        for key in range(500):
+            self.registry.put(key, self._processor(key))
+        self.assertEqual(len(self.registry._locks), ProcessorRegistry.LOCK_STRIPES)
+        self.assertIs(self.registry._key_lock('5'), self.registry._key_lock('5'))
+
+
+class TestDatasetRequests(AppTestCase):
+    """Test cases for resolving the dataset a request refers to"""
+
+    def setUp(self):
+        super().setUp()
+        frame = pd.DataFrame({'age': [25, 30, None, 40], 'weight': [1.0, 1.2, 0.8, 1.0]})
+        self.dataset_id = self._upload_frame(frame, 'resolve.csv')['dataset_id']
+
+    def test_unknown_or_malformed_id(self):
+        """A bad dataset_id is an error, never another user's latest upload"""
+        config = {'imputation': {'method': 'mean'}}
+        self.assertEqual(self.client.post('/clean', json={'dataset_id': 'abc', 'config': config}).status_code, 400)
+        self.assertEqual(self.client.post('/clean', json={'dataset_id': 10 ** 9, 'config': config}).status_code, 404)
+        self.assertEqual(self.client.post('/download_data', json={'dataset_id': 10 ** 9}).status_code, 404)
+
+    def test_sync_clean_publishes_state(self):
+        """Another worker replays a synchronous /clean from its own copy; no frames are written"""
+        from app import db, Dataset, processors, _dataset_loader
+        response = self.client.post('/clean', json={'dataset_id': self.dataset_id, 'config': {'imputation': {'method': 'mean'}}})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(os.path.exists(processors._spill_path(str(self.dataset_id))))
+
+        other_worker = ProcessorRegistry(app.config['PROCESSOR_CACHE_FOLDER'])
+        with app.app_context():
+            ds = db.session.get(Dataset, self.dataset_id)
+            processor = other_worker.get(self.dataset_id, loader=_dataset_loader(ds))
+        self.assertEqual(int(processor.data['age'].isna().sum()), 0)
+        self.assertEqual(processor.estimates, processors.get(self.dataset_id).estimates)
+
+    def test_other_users_dataset(self):
+        """Another user, or an anonymous client, cannot use a dataset by guessing its id"""
+        from app import db, User
+        with app.app_context():
+            for name in ('alice', 'bob'):
+                user = User(username=name, role='user')
+                user.set_password('secret')
+                db.session.add(user)
+            db.session.commit()
+        alice, bob = app.test_client(), app.test_client()
+        alice.post('/login', json={'username': 'alice', 'password': 'secret'})
+        bob.post('/login', json={'username': 'bob', 'password': 'secret'})
+        dataset_id = self._upload_frame(pd.DataFrame({'age': [25, 30], 'weight': [1.0, 1.2]}), 'alice.csv', alice)['dataset_id']
+        self.assertEqual(alice.post('/clean', json={'dataset_id': dataset_id, 'config': {}}).status_code, 200)
+
+        for client in (bob, app.test_client()):
+            self.assertEqual(client.post('/clean', json={'dataset_id': dataset_id, 'config': {}}).status_code, 404)
+            self.assertEqual(client.post('/report', json={'dataset_id': dataset_id, 'format': 'html'}).status_code, 404)
+            self.assertEqual(client.post('/download_data', json={'dataset_id': dataset_id}).status_code, 404)
+        # Without an id, Bob never falls back to Alice's upload; anonymous uploads stay with their session
+        self.assertEqual(bob.post('/clean', json={'config': {}}).status_code, 400)
+        self.assertEqual(bob.post('/clean', json={'dataset_id': self.dataset_id, 'config': {}}).status_code, 404)
+        self.assertEqual(self.client.post('/clean', json={'dataset_id': self.dataset_id, 'config': {}}).status_code, 200)
+
+
+class TestBackgroundJobs(AppTestCase):
+    """Test cases for asynchronous /clean and /report jobs"""
+
+    def setUp(self):
+        super().setUp()
+        app.config['JOB_WORKERS'] = 0  # run jobs on a thread inside the test process
+        frame = pd.DataFrame({'age': [25, 30, None, 40, 45], 'weight': [1.0, 1.2, 0.8, 1.0, 1.1]})
+        self.dataset_id = self._upload_frame(frame, 'jobs.csv')['dataset_id']
+
+    def _wait(self, job_id, timeout=60):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            status = self.client.get(f'/jobs/{job_id}').get_json()
+            if status['status'] in ('succeeded', 'failed'):
+                return status
+            time.sleep(0.05)
+        self.fail('job did not finish')
+
+    def test_async_clean_reports_progress_and_result(self):
+        """/clean with async returns a job id; the result matches a synchronous run"""
+        config = {'imputation': {'method': 'mean'}, 'weights': {'column': 'weight'}}
+        response = self.client.post('/clean', json={'dataset_id': self.dataset_id, 'config': config, 'async': True})
+        self.assertEqual(response.status_code, 202)
+        status = self._wait(response.get_json()['job_id'])
+        self.assertEqual(status['status'], 'succeeded')
+        self.assertEqual(status['percent'], 100)
+        self.assertEqual([step['step'] for step in status['progress']], ['impute', 'weights', 'estimates', 'plots'])
+        self.assertTrue(all(step['status'] == 'done' for step in status['progress']))
+
+        result = self.client.get(status['result_url']).get_json()
+        sync = self.client.post('/clean', json={'dataset_id': self.dataset_id, 'config': config}).get_json()
+        self.assertEqual(result['estimates'], sync['estimates'])
+
+    def test_async_report(self):
+        """/report with async produces a downloadable PDF"""
+        response = self.client.post('/report', json={'dataset_id': self.dataset_id, 'format': 'pdf', 'async': True})
+        status = self._wait(response.get_json()['job_id'])
+        self.assertEqual(status['status'], 'succeeded')
+        result = self.client.get(status['result_url'])
+        self.assertEqual(result.mimetype, 'application/pdf')
+        self.assertTrue(result.data.startswith(b'%PDF'))
+        result.close()
+
+    def test_async_html_report_is_streamed(self):
+        """An HTML job result is streamed from its file like a synchronous /report"""
+        response = self.client.post('/report', json={'dataset_id': self.dataset_id, 'format': 'html', 'async': True})
+        status = self._wait(response.get_json()['job_id'])
+        result = self.client.get(status['result_url'])
+        self.assertTrue(result.is_streamed)
+        self.assertIn('<html', result.get_json()['html_content'].lower())
+        result.close()
+
+    def test_unknown_job(self):
+        self.assertEqual(self.client.get('/jobs/missing').status_code, 404)
+
+
+class TestReportCache(AppTestCase):
+    """Test cases for cached /report rendering"""
+
+    def setUp(self):
+        super().setUp()
+        frame = pd.DataFrame({'age': [25, 30, None, 40, 45], 'weight': [1.0, 1.2, 0.8, 1.0, 1.1]})
+        self.dataset_id = self._upload_frame(frame, 'report.csv')['dataset_id']
+
+    def test_report_etag_and_cache(self):
+        """Repeated reports are served from cache; If-None-Match gets a 304 until the results change"""
+        body = {'dataset_id': self.dataset_id, 'format': 'html'}
+        first = self.client.post('/report', json=body)
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers['ETag'].strip('"')
+        second = self.client.post('/report', json=body)
+        self.assertEqual(second.get_json(), first.get_json())
+        self.assertEqual(second.headers['ETag'].strip('"'), etag)
+
+        not_modified = self.client.post('/report', json=body, headers={'If-None-Match': f'"{etag}"'})
+        self.assertEqual(not_modified.status_code, 304)
+        # Only the two reports actually sent are recorded
+        from app import db, ReportRecord
+        with app.app_context():
+            self.assertEqual(db.session.query(ReportRecord).count(), 2)
+
+        pdf = self.client.post('/report', json={'dataset_id': self.dataset_id, 'format': 'pdf'})
+        self.assertTrue(pdf.data.startswith(b'%PDF'))
+        self.assertNotEqual(pdf.headers['ETag'].strip('"'), etag)
+        pdf.close()
+
+        self.client.post('/clean', json={'dataset_id': self.dataset_id, 'config': {'imputation': {'method': 'mean'}}})
+        changed = self.client.post('/report', json=body, headers={'If-None-Match': f'"{etag}"'})
+        self.assertEqual(changed.status_code, 200)
+        self.assertIn('Imputed missing values', changed.get_json()['html_content'])
+
+    def test_report_with_plots(self):
+        """include_plots embeds the run's charts in both formats and is part of the ETag"""
+        self.client.post('/clean', json={'dataset_id': self.dataset_id, 'config': {}})
+        body = {'dataset_id': self.dataset_id, 'format': 'html'}
+        plain = self.client.post('/report', json=body)
+        charts = self.client.post('/report', json=dict(body, include_plots=True))
+        self.assertNotIn('<svg', plain.get_json()['html_content'])
+        self.assertIn('<svg', charts.get_json()['html_content'])
+        self.assertIn('Distribution of age', charts.get_json()['html_content'])
+        self.assertNotEqual(plain.headers['ETag'], charts.headers['ETag'])
+
+        pdf = self.client.post('/report', json={'dataset_id': self.dataset_id, 'format': 'pdf', 'include_plots': True})
+        self.assertTrue(pdf.data.startswith(b'%PDF'))
+        pdf.close()
+
+    def test_etag_needs_no_plots(self):
+        """A conditional GET with plots is answered without drawing them; template changes bust the cache"""
+        self.client.post('/clean', json={'dataset_id': self.dataset_id, 'config': {'plot_mode': 'html'}})
+        body = {'dataset_id': self.dataset_id, 'format': 'html', 'include_plots': True}
+        etag = self.client.post('/report', json=body).headers['ETag']
+        with mock.patch.object(DataProcessor, 'report_plots', side_effect=AssertionError('plots drawn')):
+            self.assertEqual(self.client.post('/report', json=body, headers={'If-None-Match': etag}).status_code, 304)
+        with mock.patch.object(DataProcessor, 'REPORT_TEMPLATE_VERSION', DataProcessor.REPORT_TEMPLATE_VERSION + 1):
+            self.assertEqual(self.client.post('/report', json=body, headers={'If-None-Match': etag}).status_code, 200)
+
+
+class TestDataExport(AppTestCase):
+    """Test cases for streamed /download_data exports"""
+
+    def setUp(self):
+        super().setUp()
+        self.frame = pd.DataFrame({
+            'age': [25.0, 30.0, None, 40.0, 45.0],
+            'region': ['north', 'south', None, 'east', 'west'],
+            'weight': [1.0, 1.2, 0.8, 1.0, 1.1]
+        })
+        self.dataset_id = self._upload_frame(self.frame, 'export.csv')['dataset_id']
+        app.config['EXPORT_CHUNK_ROWS'] = 2  # several chunks even for a tiny frame
+
+    def _download(self, **params):
+        response = self.client.post('/download_data', json=dict(params, dataset_id=self.dataset_id))
+        data = response.get_data()
+        response.close()
+        return response, data
+
+    def test_csv_matches_single_pass(self):
+        """Chunked CSV, plain or compressed, is byte-identical to one to_csv call"""
+        import gzip
+        expected = self.frame.to_csv(index=False).encode('utf-8')
+        response, data = self._download()
+        self.assertEqual(response.mimetype, 'text/csv')
+        self.assertIn('.csv', response.headers['Content-Disposition'])
+        self.assertEqual(data, expected)
+        response, data = self._download(compression='gzip')
+        self.assertIn('.csv.gz', response.headers['Content-Disposition'])
+        self.assertEqual(gzip.decompress(data), expected)
+
+    def test_columnar_formats(self):
+        """Parquet and Feather round-trip the frame when pyarrow is installed"""
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.skipTest('pyarrow not installed')
+        for fmt in ('parquet', 'feather'):
+            response, data = self._download(format=fmt, compression='zstd')
+            self.assertEqual(response.status_code, 200)
+            restored = pd.read_parquet(BytesIO(data)) if fmt == 'parquet' else pd.read_feather(BytesIO(data))
+            pd.testing.assert_frame_equal(restored, self.frame, check_dtype=False)
+
+    def test_unsupported_options(self):
+        self.assertEqual(self._download(format='xml')[0].status_code, 400)
+        self.assertEqual(self._download(format='feather', compression='gzip')[0].status_code, 400)
+
+
+class TestExcelUpload(AppTestCase):
+    """Test cases for Excel uploads with sheet and header-row selection"""
+
+    def setUp(self):
+        from openpyxl import Workbook
+        super().setUp()
+        workbook = Workbook()
+        notes = workbook.active
+        notes.title = 'Notes'
+        notes.append(['Household survey, round 3'])
+        survey = workbook.create_sheet('Survey')
+        survey.append(['Ministry of Statistics'])
+        survey.append([None])
+        survey.append(['age', 'income', 'district'])
+        for row in ([25, '₹1,20,000', 'Pune'], [31, '₹45,000', 'Agra'], [None, '₹2,50,000', 'Pune']):
+            survey.append(row)
+        self.buffer = BytesIO()
+        workbook.save(self.buffer)
+
+    def _upload(self, **fields):
+        self.buffer.seek(0)
+        data = dict(fields, file=(BytesIO(self.buffer.getvalue()), 'survey.xlsx'))
+        return self.client.post('/upload', data=data, content_type='multipart/form-data')
+
+    def test_sheet_and_header_row(self):
+        """The chosen sheet and header row are used on upload and on every reload"""
+        response = self._upload(sheet='Survey', header_row='2')
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        summary = body['summary']
+        self.assertEqual(summary['column_names'], ['age', 'income', 'district'])
+        self.assertEqual(summary['rows'], 3)
+        self.assertEqual(summary['sheets'], ['Notes', 'Survey'])
+        self.assertEqual(summary['data_types']['income'], 'float64')
+
+        # A reload from disk (e.g. after registry eviction) reads the same sheet
+        from app import db, Dataset, _dataset_loader
+        with app.app_context():
+            ds = db.session.get(Dataset, body['dataset_id'])
+            reloaded = DataProcessor()
+            self.assertTrue(_dataset_loader(ds)(reloaded))
+        self.assertEqual(reloaded.data['income'].tolist(), [120000.0, 45000.0, 250000.0])
+
+    def test_unknown_sheet(self):
+        response = self._upload(sheet='Missing')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Available sheets: Notes, Survey', response.get_json()['details'])
+        self.assertEqual(self._upload(header_row='-1').status_code, 400)
+
+
+class TestBatchUpload(AppTestCase):
+    """Test cases for multi-file and ZIP uploads combined into one dataset"""
+
+    def setUp(self):
+        super().setUp()
+        app.config['BATCH_WORKERS'] = 0  # parse in the test process unless a test needs the pool
+
+    @staticmethod
+    def _csv(frame):
+        return frame.to_csv(index=False).encode('utf-8')
+
+    def _post(self, files, **fields):
+        data = dict(fields, files=[(BytesIO(content), name) for name, content in files])
+        return self.client.post('/upload_batch', data=data, content_type='multipart/form-data')
+
+    def test_zip_and_files_combined(self):
+        """ZIP members and loose files become one dataset tagged by source file"""
+        pune = pd.DataFrame({'age': [25, 31], 'income': ['₹1,20,000', '₹45,000']})
+        agra = pd.DataFrame({'income': ['₹2,50,000', None, '₹60,000'], 'age': [40, None, 52]})
+        archive = BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr('round3/pune.csv', self._csv(pune))
+            zf.writestr('round3/agra.csv', self._csv(agra))
+            zf.writestr('__MACOSX/round3/._pune.csv', b'junk')
+            zf.writestr('round3/README.txt', b'notes')
+        nagpur = pd.DataFrame({'age': [28], 'income': ['Rs. 80,000']})
+        response = self._post([('round3.zip', archive.getvalue()), ('nagpur.csv', self._csv(nagpur))])
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        summary = body['summary']
+        self.assertEqual(summary['rows'], 6)
+        self.assertEqual(summary['column_names'], ['age', 'income', 'source_file'])
+        self.assertEqual(summary['data_types']['income'], 'float64')
+        self.assertEqual([f['rows'] for f in summary['files']], [2, 3, 1])
+
+        from app import db, Dataset, _dataset_loader
+        with app.app_context():
+            ds = db.session.get(Dataset, body['dataset_id'])
+            reloaded = DataProcessor()
+            self.assertTrue(_dataset_loader(ds)(reloaded))
+        self.assertEqual(reloaded.data['source_file'].astype(str).tolist(),
+                         ['round3/pune.csv'] * 2 + ['round3/agra.csv'] * 3 + ['nagpur.csv'])
+        self.assertEqual(reloaded.data['income'].tolist()[:3], [120000.0, 45000.0, 250000.0])
+
+        # The snapshot and a fresh parse of the combined CSV agree with the upload-time frame
+        uploaded = app_module.processors.get(body['dataset_id']).data
+        app.config['PARSE_CACHE_ENABLED'] = False
+        with app.app_context():
+            reparsed = DataProcessor()
+            self.assertTrue(_dataset_loader(ds)(reparsed))
+        for frame in (reloaded.data, reparsed.data):
+            self.assertEqual(frame.dtypes.to_dict(), uploaded.dtypes.to_dict())
+            self.assertEqual(frame['source_file'].cat.categories.tolist(),
+                             uploaded['source_file'].cat.categories.tolist())
+
+    def test_incompatible_schemas(self):
+        """Column and type differences are reported per file and nothing is registered"""
+        base = pd.DataFrame({'age': [25, 31], 'district': ['Pune', 'Agra']})
+        renamed = pd.DataFrame({'age': [40], 'dist': ['Agra']})
+        retyped = pd.DataFrame({'age': ['forty'], 'district': ['Agra']})
+        response = self._post([('a.csv', self._csv(base)), ('b.csv', self._csv(renamed)), ('c.csv', self._csv(retyped))])
+        self.assertEqual(response.status_code, 400)
+        details = response.get_json()['details']
+        self.assertIn('b.csv: missing columns district (present in a.csv)', details)
+        self.assertIn('c.csv: column age is text but numeric in a.csv', details)
+        self.assertEqual(self._post([('notes.txt', b'x')]).status_code, 400)
+
+    def test_parallel_parse(self):
+        """Files parsed in the worker pool give the same dataset as a serial parse"""
+        files = [(f'district_{i}.csv', self._csv(pd.DataFrame({'age': [20 + i, 30 + i], 'weight': [1.0, 1.5]})))
+                 for i in range(3)]
+        serial = self._post(files).get_json()['summary']
+        app.config['BATCH_WORKERS'] = 2
+        parallel = self._post(files).get_json()['summary']
+        self.assertEqual(parallel['rows'], 6)
+        self.assertEqual(parallel['missing_values'], serial['missing_values'])
+        self.assertEqual(parallel['files'], serial['files'])
+
+
+class TestMigrations(unittest.TestCase):
+    """Test cases for schema migrations and SQLite connection settings"""
+
+    def test_upgrade_legacy_database(self):
+        """A database from an older release gains the new columns and indexes, once"""
+        from sqlalchemy import create_engine, inspect, text
+        from app import db
+        import migrations
+        tmp_dir = tempfile.mkdtemp()
+        engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'legacy.db')}")
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(
+                    "CREATE TABLE user (id INTEGER PRIMARY KEY, username VARCHAR(80) NOT NULL UNIQUE, "
+                    "email VARCHAR(120) UNIQUE, password_hash VARCHAR(255) NOT NULL, role VARCHAR(20), created_at DATETIME)"
+                ))
+                conn.execute(text(
+                    "CREATE TABLE dataset (id INTEGER PRIMARY KEY, filename VARCHAR(255) NOT NULL, filepath VARCHAR(1024) NOT NULL, "
+                    "rows INTEGER, columns INTEGER, uploaded_at DATETIME, owner_id INTEGER REFERENCES user (id))"
+                ))
+                conn.execute(text("INSERT INTO dataset (filename, filepath) VALUES ('old.csv', 'uploads/old.csv')"))
+            # Same order as app startup: create_all adds missing tables, migrations fix the old ones
+            db.metadata.create_all(engine)
+            self.assertEqual(migrations.upgrade(engine), [1, 2, 3, 4, 5])
+
+            inspector = inspect(engine)
+            self.assertIn('profile_image', {col['name'] for col in inspector.get_columns('user')})
+            self.assertIn('read_options', {col['name'] for col in inspector.get_columns('dataset')})
+            dataset_indexes = {index['name'] for index in inspector.get_indexes('dataset')}
+            self.assertTrue({'ix_dataset_uploaded_at', 'ix_dataset_owner_id'} <= dataset_indexes)
+            with engine.connect() as conn:
+                self.assertEqual(conn.execute(text("SELECT filename FROM dataset")).scalar(), 'old.csv')
+
+            self.assertEqual(migrations.upgrade(engine), [])
+            self.assertEqual(migrations.applied_versions(engine), {1, 2, 3, 4, 5})
+        finally:
+            engine.dispose()
+            shutil.rmtree(tmp_dir)
+
+    def test_sqlite_connection_settings(self):
+        """App connections use the write-ahead log and wait for locks instead of failing"""
+        from app import db
+        with app.app_context():
+            with db.engine.connect() as conn:
+                self.assertEqual(conn.exec_driver_sql('PRAGMA journal_mode').scalar(), 'wal')
+                self.assertEqual(conn.exec_driver_sql('PRAGMA busy_timeout').scalar(), app.config['SQLITE_BUSY_TIMEOUT_MS'])
+
+
+class TestAdminSummary(AppTestCase):
+    """Test cases for the admin dashboard queries"""
+
+    def setUp(self):
+        from app import db, User, Dataset, ProcessingRun
+        super().setUp()
+        self.tag = f"adm{time.time_ns()}"
+        with app.app_context():
+            admin = User(username=f"{self.tag}_admin", role='admin')
+            admin.set_password('secret')
+            owner = User(username=f"{self.tag}_owner", role='user')
+            owner.set_password('secret')
+            db.session.add_all([admin, owner])
+            db.session.flush()
+            for i in range(25):
+                ds = Dataset(filename=f"{self.tag}_{i}.csv", filepath='unused', rows=i, columns=2, owner_id=owner.id)
+                db.session.add(ds)
+                db.session.flush()
+                db.session.add(ProcessingRun(dataset_id=ds.id, user_id=owner.id, estimates={'x': i}, plots_count=i))
+            db.session.commit()
+        response = self.client.post('/login', json={'username': f"{self.tag}_admin", 'password': 'secret'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_summary_query_count(self):
+        """Relationships are joined in, so the query count does not grow with the rows listed"""
+        from sqlalchemy import event
+        from app import db
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        app.config['ADMIN_RECENT_SIZE'] = 20
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            body = self.client.get('/admin/summary').get_json()
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+            app.config['ADMIN_RECENT_SIZE'] = 10
+        self.assertEqual(len(body['latest']), 20)
+        self.assertEqual(body['latest'][0]['owner'], f"{self.tag}_owner")
+        self.assertEqual(body['recent_runs'][0]['dataset'], f"{self.tag}_24.csv")
+        self.assertIsNotNone(body['next_cursors']['latest'])
+        self.assertGreaterEqual(body['datasets'], 25)
+        # Session user, counts (possibly cached) and one query per listing
+        self.assertLessEqual(len(statements), 5)
+
+    def test_cursor_pagination_and_filters(self):
+        seen = []
+        cursor = None
+        while True:
+            query = f"/admin/datasets?q={self.tag}_&limit=10" + (f"&cursor={cursor}" if cursor else '')
+            page = self.client.get(query).get_json()
+            seen.extend(item['filename'] for item in page['items'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(seen, [f"{self.tag}_{i}.csv" for i in reversed(range(25))])
+
+        runs = self.client.get(f"/admin/runs?q={self.tag}_7.csv").get_json()['items']
+        self.assertEqual([run['plots_count'] for run in runs], [7])
+        users = self.client.get(f"/admin/users?q={self.tag}&role=user").get_json()['items']
+        self.assertEqual([user['username'] for user in users], [f"{self.tag}_owner"])
+        self.assertEqual(self.client.get('/admin/users?cursor=abc').status_code, 400)
+
+
+class TestRunArtifacts(AppTestCase):
+    """Test cases for run outputs kept in the artifact store"""
+
+    def setUp(self):
+        super().setUp()
+        frame = pd.DataFrame({'age': [25, 30, None, 40, 45], 'weight': [1.0, 1.2, 0.8, 1.0, 1.1]})
+        self.dataset_id = self._upload_frame(frame, 'runs.csv')['dataset_id']
+
+    def _clean(self):
+        config = {'imputation': {'method': 'mean'}, 'weights': {'column': 'weight'}}
+        return self.client.post('/clean', json={'dataset_id': self.dataset_id, 'config': config}).get_json()
+
+    def test_identical_runs_share_artifacts(self):
+        """Repeated runs point to the same stored files and leave the inline columns empty"""
+        from app import db, ProcessingRun
+        first, second = self._clean(), self._clean()
+        with app.app_context():
+            runs = [db.session.get(ProcessingRun, body['run_id']) for body in (first, second)]
+            self.assertEqual(runs[0].artifacts['estimates']['digest'], runs[1].artifacts['estimates']['digest'])
+            self.assertIsNone(runs[0].estimates)
+            self.assertEqual(runs[0].artifact('estimates'), first['estimates'])
+
+        details = self.client.get(f"/runs/{first['run_id']}").get_json()
+        self.assertEqual(set(details['artifacts']), set(ProcessingRun.ARTIFACTS))
+        self.assertNotIn('estimates', details)
+
+    def test_artifact_download(self):
+        """Gzip-accepting clients get the stored bytes; others get plain JSON; the digest revalidates"""
+        body = self._clean()
+        url = f"/runs/{body['run_id']}/artifacts/estimates"
+        compressed = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(compressed.data)), body['estimates'])
+        etag = compressed.headers['ETag']
+        compressed.close()
+
+        plain = self.client.get(url)
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertEqual(plain.get_json(), body['estimates'])
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+        self.assertEqual(self.client.get(f"/runs/{body['run_id']}/artifacts/secrets").status_code, 404)
+
+    def test_legacy_run_and_offload(self):
+        """Runs with inline JSON are served as they are and moved into the store by offload-runs"""
+        from app import db, ProcessingRun
+        with app.app_context():
+            run = ProcessingRun(dataset_id=self.dataset_id, estimates={'age': {'mean': 35.0}}, plots_count=0)
+            db.session.add(run)
+            db.session.commit()
+            run_id = run.id
+        self.assertEqual(self.client.get(f"/runs/{run_id}/artifacts/estimates").get_json(), {'age': {'mean': 35.0}})
+        self.assertEqual(self.client.get(f"/runs/{run_id}/artifacts/plots").status_code, 404)
+
+        result = app.test_cli_runner().invoke(args=['offload-runs'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        with app.app_context():
+            run = db.session.get(ProcessingRun, run_id)
+            self.assertIsNone(run.estimates)
+            self.assertEqual(set(run.artifacts), {'estimates'})
+        self.assertEqual(self.client.get(f"/runs/{run_id}/artifacts/estimates").get_json(), {'age': {'mean': 35.0}})
+
+
+class TestUploadDedup(AppTestCase):
+    """Test cases for reusing stored uploads with identical contents"""
+
+    def setUp(self):
+        from app import db, User
+        super().setUp()
+        self.frame = pd.DataFrame({'age': [25, 30, None, 40], 'weight': [1.0, 1.2, 0.8, 1.0]})
+        with app.app_context():
+            for name in ('alice', 'bob'):
+                user = User(username=name, role='user')
+                user.set_password('secret')
+                db.session.add(user)
+            db.session.commit()
+
+    def _login(self, username):
+        client = app.test_client()
+        response = client.post('/login', json={'username': username, 'password': 'secret'})
+        self.assertEqual(response.status_code, 200)
+        return client
+
+    def _upload(self, client, name='survey.csv'):
+        return self._upload_frame(self.frame, name, client)
+
+    def _filepath(self, dataset_id):
+        from app import db, Dataset
+        with app.app_context():
+            return db.session.get(Dataset, dataset_id).filepath
+
+    def _stored_csvs(self):
+        return sorted(name for name in os.listdir(app.config['UPLOAD_FOLDER']) if name.endswith('.csv'))
+
+    def test_identical_upload_reuses_file_and_parse(self):
+        """The second upload points at the first file and loads its snapshot without parsing"""
+        alice = self._login('alice')
+        first = self._upload(alice)
+        with mock.patch('pandas.read_csv', side_effect=AssertionError('parsed again')):
+            second = self._upload(alice, 'renamed.csv')
+        self.assertFalse(first['deduplicated'])
+        self.assertTrue(second['deduplicated'])
+        self.assertEqual(second['summary']['rows'], 4)
+        self.assertNotEqual(second['dataset_id'], first['dataset_id'])
+        self.assertEqual(self._filepath(second['dataset_id']), self._filepath(first['dataset_id']))
+        # The second upload's own copy was removed
+        self.assertEqual(self._stored_csvs(), [os.path.basename(self._filepath(first['dataset_id']))])
+
+    def test_other_users_files(self):
+        """By default only the uploader's own files are reused; global reuse never reports a match"""
+        first = self._upload(self._login('alice'))
+        bob = self._login('bob')
+        separate = self._upload(bob)
+        self.assertFalse(separate['deduplicated'])
+        self.assertNotEqual(self._filepath(separate['dataset_id']), self._filepath(first['dataset_id']))
+        anonymous = self._upload(self.client)
+        self.assertFalse(anonymous['deduplicated'])
+        self.assertEqual(len(self._stored_csvs()), 3)
+
+        app.config['UPLOAD_DEDUP'] = 'global'
+        shared = self._upload(self._login('bob'))
+        self.assertFalse(shared['deduplicated'])
+        self.assertEqual(len(self._stored_csvs()), 3)
+
+    def test_dedup_off(self):
+        app.config['UPLOAD_DEDUP'] = 'off'
+        alice = self._login('alice')
+        first, second = self._upload(alice), self._upload(alice)
+        self.assertFalse(second['deduplicated'])
+        self.assertNotEqual(self._filepath(second['dataset_id']), self._filepath(first['dataset_id']))
+
+    def test_missing_column_is_logged(self):
+        """A database error (here: migrations not run) skips deduplication and is logged, not hidden"""
+        from sqlalchemy import text
+        from app import db
+        alice = self._login('alice')
+        with app.app_context():
+            db.session.execute(text('DROP INDEX ix_dataset_content_hash'))
+            db.session.execute(text('ALTER TABLE dataset DROP COLUMN content_hash'))
+            db.session.commit()
+        with self.assertLogs(app.logger, level='WARNING') as logs:
+            body = self._upload(alice)
+        self.assertFalse(body['deduplicated'])
+        self.assertIn('content_hash', logs.output[0])
+
+
 def run_tests():
     """Run all tests"""
     print("Running tests for ASDP (AI Survey Data Processor) Application...")
     print("=" * 70)
     
     # Create test suite
-    test_suite = unittest.TestLoader().loadTestsFromTestCase(TestDataProcessor)
+    loader = unittest.TestLoader()
+    test_suite = unittest.TestSuite([
+        loader.loadTestsFromTestCase(TestDataProcessor),
+        loader.loadTestsFromTestCase(TestSketches),
+        loader.loadTestsFromTestCase(TestProcessorRegistry),
+        loader.loadTestsFromTestCase(TestDatasetRequests),
+        loader.loadTestsFromTestCase(TestBackgroundJobs),
+        loader.loadTestsFromTestCase(TestReportCache),
+        loader.loadTestsFromTestCase(TestDataExport),
+        loader.loadTestsFromTestCase(TestExcelUpload),
+        loader.loadTestsFromTestCase(TestBatchUpload),
+        loader.loadTestsFromTestCase(TestMigrations),
+        loader.loadTestsFromTestCase(TestAdminSummary),
+        loader.loadTestsFromTestCase(TestRunArtifacts),
+        loader.loadTestsFromTestCase(TestUploadDedup),
+    ])
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
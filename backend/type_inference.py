@@ -0,0 +1,136 @@
+"""
+Type inference for ASDP (AI Survey Data Processor) Application
+Ministry of Statistics and Programme Implementation (MoSPI)
+
+Finds text columns that really hold numbers ("₹1,20,000", "Rs. 4,500", "45%")
+and converts them. Each column is probed on a strided sample first, so
+obviously textual columns (names, districts, free text) are never parsed in
+full. Candidates are parsed with one compiled pattern that strips whitespace,
+digit grouping commas (Western or Indian lakh/crore grouping), currency
+symbols and Rs/INR prefixes; with pyarrow the strip, validation and float
+cast all run in Arrow's vectorized kernels.
+"""
+
+import re
+
+NUMERIC_THRESHOLD = 0.8
+SAMPLE_SIZE = 1000
+# Columns whose sample is this far below the threshold are not parsed in full
+SAMPLE_MARGIN = 0.3
+
+# Decoration around a number: a leading Rs/Rs./INR code, whitespace (incl. NBSP),
+# grouping commas, currency symbols and a percent sign
+_STRIP = r"^\s*(?:rs\.?|inr)\s*|[\s\u00a0,₹$€£¥%]"
+_STRIP_RE = re.compile(_STRIP, re.IGNORECASE)
+_STRIP_RE2 = "(?i)" + _STRIP.replace("\\u00a0", "\\x{00a0}")
+_NUMBER_RE2 = r"^[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?$"
+
+
+def _pyarrow_compute():
+    try:
+        import pyarrow as pa  # type: ignore
+        import pyarrow.compute as pc  # type: ignore
+        return pa, pc
+    except Exception:
+        return None, None
+
+
+def text_columns(frame):
+    """Object and string columns (pandas 3 reads text as the ``str`` dtype)"""
+    return list(frame.select_dtypes(include=['object', 'string']).columns)
+
+
+def parse_numeric(series):
+    """float64 Series with the numeric reading of every value, NaN where there is none"""
+    import pandas as pd  # Lazy import
+    import numpy as np  # Lazy import
+    pa, pc = _pyarrow_compute()
+    if pa is not None:
+        try:
+            values = series if isinstance(series.dtype, pd.StringDtype) else series.astype(str)
+            arr = pa.array(values, type=pa.string(), from_pandas=True)
+            cleaned = pc.replace_substring_regex(arr, _STRIP_RE2, '')
+            valid = pc.match_substring_regex(cleaned, _NUMBER_RE2)
+            numbers = pc.cast(pc.if_else(valid, cleaned, pa.scalar(None, pa.string())), pa.float64())
+            return pd.Series(numbers.to_numpy(zero_copy_only=False).astype(np.float64, copy=False), index=series.index, name=series.name)
+        except Exception:
+            pass  # fall back to the pandas path
+    cleaned = series.astype(str).str.replace(_STRIP_RE, '', regex=True)
+    return pd.to_numeric(cleaned, errors='coerce').astype('float64')
+
+
+def _sample(series, size):
+    step = max(1, len(series) // size)
+    return series.iloc[::step][:size]
+
+
+def looks_numeric(series, threshold=NUMERIC_THRESHOLD, sample_size=SAMPLE_SIZE):
+    """Cheap screen: does a strided sample of ``series`` come close to ``threshold``?"""
+    if len(series) == 0:
+        return False
+    sample = _sample(series, sample_size)
+    return parse_numeric(sample).notna().mean() >= threshold - SAMPLE_MARGIN
+
+
+def coerce_numeric_columns(frame, threshold=NUMERIC_THRESHOLD, sample_size=SAMPLE_SIZE):
+    """Convert text columns where at least ``threshold`` of all rows parse as numbers
+
+    Modifies ``frame`` in place and returns the converted column names. The
+    threshold counts missing values as non-numeric, as load_data always has.
+    """
+    converted = []
+    for col in text_columns(frame):
+        series = frame[col]
+        if not looks_numeric(series, threshold, sample_size):
+            continue
+        numeric = parse_numeric(series)
+        if numeric.notna().mean() >= threshold:
+            frame[col] = numeric
+            converted.append(col)
+    return converted
+
+
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+
+def frame_memory(frame):
+    """Bytes held by ``frame``, counting string contents"""
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+def optimize_dtypes(frame, category_max_ratio=CATEGORY_MAX_RATIO):
+    """Shrink ``frame`` in place without changing any value; returns what was converted
+
+    Integers are downcast to the smallest type that holds their range,
+    floats to float32 only when every value survives the round trip exactly
+    (Likert scores, codes and rounded amounts usually do), and text columns
+    with few distinct values become categoricals. Computations upcast to
+    float64 again, so estimates are unaffected.
+    """
+    import numpy as np  # Lazy import
+    import pandas as pd  # Lazy import
+    downcast = []
+    categorical = []
+    for col in frame.columns:
+        series = frame[col]
+        dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+            continue
+        if pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype):
+            smaller = pd.to_numeric(series, downcast='integer')
+            if smaller.dtype.itemsize < dtype.itemsize:
+                frame[col] = smaller
+                downcast.append(col)
+        elif pd.api.types.is_float_dtype(dtype) and dtype == np.float64:
+            values = series.to_numpy()
+            compact = values.astype(np.float32)
+            if np.array_equal(compact.astype(np.float64), values, equal_nan=True):
+                frame[col] = pd.Series(compact, index=series.index, name=series.name)
+                downcast.append(col)
+        elif pd.api.types.is_object_dtype(dtype) or isinstance(dtype, pd.StringDtype):
+            distinct = series.nunique(dropna=True)
+            if len(series) and distinct <= category_max_ratio * len(series):
+                frame[col] = series.astype('category')
+                categorical.append(col)
+    return {'downcast': downcast, 'categorical': categorical}
@@ -0,0 +1,106 @@
+// Draws the plot aggregates returned by /upload and /clean (plot_mode 'data') as plain SVG.
+// Older responses (plot_mode 'html') carry Plotly HTML strings instead.
+
+const WIDTH = 640
+const HEIGHT = 260
+const PAD = { left: 56, right: 16, top: 12, bottom: 44 }
+
+const formatTick = (v) => {
+	if (v === null || v === undefined) return ''
+	const a = Math.abs(v)
+	if (a >= 1e7) return `${(v / 1e7).toFixed(1)} Cr`
+	if (a >= 1e5) return `${(v / 1e5).toFixed(1)} L`
+	if (a >= 1000) return `${(v / 1000).toFixed(1)}k`
+	return Number.isInteger(v) ? String(v) : v.toFixed(2)
+}
+
+function Bars({ labels, values, tickLabels, color }){
+	const max = Math.max(1, ...values)
+	const innerW = WIDTH - PAD.left - PAD.right
+	const innerH = HEIGHT - PAD.top - PAD.bottom
+	const barW = innerW / Math.max(1, values.length)
+	return (
+		<svg viewBox={`0 0 ${WIDTH} ${HEIGHT}`} width="100%" role="img">
+			<line x1={PAD.left} y1={PAD.top + innerH} x2={WIDTH - PAD.right} y2={PAD.top + innerH} stroke="#adb5bd" />
+			<text x={PAD.left - 6} y={PAD.top + 10} textAnchor="end" fontSize="11">{formatTick(max)}</text>
+			<text x={PAD.left - 6} y={PAD.top + innerH} textAnchor="end" fontSize="11">0</text>
+			{values.map((v, i) => {
+				const h = (v / max) * innerH
+				return (
+					<rect key={i} x={PAD.left + i * barW + 1} y={PAD.top + innerH - h} width={Math.max(1, barW - 2)} height={h} fill={color}>
+						<title>{`${labels[i]}: ${v}`}</title>
+					</rect>
+				)
+			})}
+			{tickLabels.map(([pos, label], i) => (
+				<text key={i} x={PAD.left + pos * barW} y={HEIGHT - PAD.bottom + 16} textAnchor="middle" fontSize="11">{label}</text>
+			))}
+		</svg>
+	)
+}
+
+function Histogram({ plot }){
+	const { edges, counts } = plot
+	if (!counts.length) return <p className="text-muted">No values</p>
+	const labels = counts.map((_, i) => `${formatTick(edges[i])} – ${formatTick(edges[i + 1])}`)
+	const step = Math.max(1, Math.ceil(counts.length / 6))
+	const ticks = edges.map((e, i) => [i, formatTick(e)]).filter(([i]) => i % step === 0 || i === counts.length)
+	const q = plot.quantiles || {}
+	return (
+		<div>
+			<Bars labels={labels} values={counts} tickLabels={ticks} color="#667eea" />
+			{q['0.5'] !== undefined && (
+				<p className="small text-muted mb-0">
+					{`Median ${formatTick(q['0.5'])} · IQR ${formatTick(q['0.25'])} – ${formatTick(q['0.75'])} · 1st–99th percentile ${formatTick(q['0.01'])} – ${formatTick(q['0.99'])}`}
+				</p>
+			)}
+		</div>
+	)
+}
+
+function MissingBars({ plot }){
+	const ticks = plot.labels.map((l, i) => [i + 0.5, l])
+	return <Bars labels={plot.labels} values={plot.values} tickLabels={ticks} color="#f5576c" />
+}
+
+function Heatmap({ plot }){
+	const { columns, matrix } = plot
+	const cell = 56
+	const offset = 96
+	const size = offset + cell * columns.length
+	const color = (v) => {
+		if (v === null) return '#e9ecef'
+		const t = Math.min(1, Math.abs(v))
+		return v >= 0 ? `rgba(102,126,234,${t})` : `rgba(245,87,108,${t})`
+	}
+	return (
+		<svg viewBox={`0 0 ${size} ${size}`} width="100%" style={{ maxWidth: size }} role="img">
+			{columns.map((c, i) => (
+				<g key={c}>
+					<text x={offset - 6} y={offset + i * cell + cell / 2 + 4} textAnchor="end" fontSize="11">{c}</text>
+					<text x={offset + i * cell + cell / 2} y={offset - 8} textAnchor="middle" fontSize="11">{c}</text>
+				</g>
+			))}
+			{matrix.map((row, i) => row.map((v, j) => (
+				<g key={`${i}-${j}`}>
+					<rect x={offset + j * cell} y={offset + i * cell} width={cell - 2} height={cell - 2} fill={color(v)} />
+					<text x={offset + j * cell + cell / 2} y={offset + i * cell + cell / 2 + 4} textAnchor="middle" fontSize="11">{v === null ? '–' : v.toFixed(2)}</text>
+				</g>
+			)))}
+		</svg>
+	)
+}
+
+export default function PlotView({ plot }){
+	if (typeof plot === 'string') return <div dangerouslySetInnerHTML={{ __html: plot }} />
+	const body = plot.type === 'histogram' ? <Histogram plot={plot} />
+		: plot.type === 'heatmap' ? <Heatmap plot={plot} />
+		: plot.type === 'bar' ? <MissingBars plot={plot} />
+		: null
+	return (
+		<div>
+			<h6 className="mb-2">{plot.title}</h6>
+			{body}
+		</div>
+	)
+}
@@ -1,4 +1,4 @@
-import { useEffect, useMemo, useState } from 'react'
+import { useCallback, useEffect, useState } from 'react'
 import Navbar from '../components/Navbar.jsx'
 import BackButton from '../components/BackButton.jsx'
 import LogoutButton from '../components/LogoutButton.jsx'
@@ -8,6 +8,9 @@ export default function Admin(){
 	const [summary, setSummary] = useState(null)
 	const [error, setError] = useState('')
 	const [filter, setFilter] = useState('')
+	const [userQuery, setUserQuery] = useState('')
+	// Cursor of the next page per list (null once the list is exhausted)
+	const [cursors, setCursors] = useState({})
 
 	const fmt = (iso)=>{
 		try{
@@ -26,9 +29,39 @@ export default function Admin(){
 			const data = await res.json();
 			if(!res.ok) throw new Error(data.error || `HTTP ${res.status}`)
 			setSummary(data)
+			setCursors(data.next_cursors || {})
 		}).catch((e)=> setError(e.message))
 	}, [])
 
+	// Lists map to their paginated endpoints: summary key -> /admin/<kind>
+	const LISTS = { latest: 'datasets', recent_runs: 'runs', all_users: 'users' }
+
+	const loadPage = useCallback(async (key, { q = '', append = false } = {}) => {
+		const params = new URLSearchParams()
+		if (q) params.set('q', q)
+		if (append && cursors[key]) params.set('cursor', cursors[key])
+		try{
+			const res = await fetch(`${API_BASE_URL}/admin/${LISTS[key]}?${params}`, { credentials:'include' })
+			const data = await res.json()
+			if(!res.ok) throw new Error(data.error || `HTTP ${res.status}`)
+			setSummary(s => !s ? s : { ...s, [key]: append ? [...s[key], ...data.items] : data.items })
+			setCursors(c => ({ ...c, [key]: data.next_cursor }))
+		}catch(e){ setError(e.message) }
+	}, [cursors])
+
+	// Filters run on the server so they cover every row, not just the loaded page
+	useEffect(() => {
+		if(!summary) return
+		const timer = setTimeout(() => loadPage('recent_runs', { q: filter }), 300)
+		return () => clearTimeout(timer)
+	}, [filter])
+
+	useEffect(() => {
+		if(!summary) return
+		const timer = setTimeout(() => loadPage('all_users', { q: userQuery }), 300)
+		return () => clearTimeout(timer)
+	}, [userQuery])
+
 	async function updateRole(userId, role){
 		const form = new FormData(); form.append('role', role)
 		const res = await fetch(`${API_BASE_URL}/admin/user/${userId}/role`, { method:'POST', body: form, credentials:'include' })
@@ -36,10 +69,11 @@ export default function Admin(){
 		setSummary(s => !s ? s : { ...s, all_users: s.all_users.map(u => u.id === userId ? { ...u, role } : u) })
 	}
 
-	const filteredRuns = useMemo(()=>{
-		if(!summary) return []
-		return (summary.recent_runs || []).filter(r => (r.dataset || '—').toLowerCase().includes(filter.toLowerCase()))
-	}, [summary, filter])
+	const loadMore = (key, q = '') => cursors[key] && (
+		<div className="text-center">
+			<button className="btn btn-outline-secondary btn-sm" onClick={()=> loadPage(key, { q, append: true })}>Load more</button>
+		</div>
+	)
 
 	return (
 		<div>
@@ -107,6 +141,7 @@ export default function Admin(){
 										</tbody>
 									</table>
 								</div>
+								{loadMore('latest')}
 							</div>
 						</div>
 						<div className="col-lg-6">
@@ -121,7 +156,7 @@ export default function Admin(){
 											<tr><th>Dataset</th><th>User</th><th>Success</th><th>Plots</th><th>Time</th></tr>
 										</thead>
 										<tbody>
-											{filteredRuns.map((r)=>(
+											{(summary.recent_runs || []).map((r)=>(
 												<tr key={r.id}>
 													<td>{r.dataset || '—'}</td>
 													<td>
@@ -136,12 +171,16 @@ export default function Admin(){
 										</tbody>
 									</table>
 								</div>
+								{loadMore('recent_runs', filter)}
 							</div>
 						</div>
 					</div>
 
 					<div className="card p-3 mt-3">
-						<h5 className="mb-2">User management</h5>
+						<div className="d-flex justify-content-between align-items-center mb-2">
+							<h5 className="mb-0">User management</h5>
+							<input className="form-control form-control-sm" style={{maxWidth:220}} placeholder="Search username or email" value={userQuery} onChange={(e)=>setUserQuery(e.target.value)} />
+						</div>
 						<div className="table-responsive">
 							<table className="table table-striped table-hover align-middle">
 								<thead><tr><th>Username</th><th>Email</th><th>Role</th><th>Action</th></tr></thead>
@@ -164,6 +203,7 @@ export default function Admin(){
 								</tbody>
 							</table>
 						</div>
+						{loadMore('all_users', userQuery)}
 					</div>
 				</>
 			)}
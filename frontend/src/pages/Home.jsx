@@ -1,8 +1,24 @@
 import { useCallback, useMemo, useRef, useState } from 'react'
 import Navbar from '../components/Navbar.jsx'
+import PlotView from '../components/PlotView.jsx'
 import { API_BASE_URL } from '../config.js'
 
+// /download_data options: label -> request parameters and file extension
+const EXPORT_FORMATS = {
+	'CSV': { params: { format: 'csv' }, extension: 'csv' },
+	'CSV (gzip)': { params: { format: 'csv', compression: 'gzip' }, extension: 'csv.gz' },
+	'Parquet': { params: { format: 'parquet' }, extension: 'parquet' },
+	'Feather': { params: { format: 'feather' }, extension: 'feather' },
+}
+
 const isNumericType = (t) => typeof t === 'string' && (t.includes('float') || t.includes('int'))
+// Upload error details: a message, a list of schema conflicts, or reasons keyed by file
+const errorDetails = (details) => {
+	if (!details) return ''
+	if (Array.isArray(details)) return details.join('; ')
+	if (typeof details === 'object') return Object.entries(details).map(([name, reason]) => `${name}: ${reason}`).join('; ')
+	return String(details)
+}
 
 export default function Home(){
 	const [summary, setSummary] = useState(null)
@@ -16,7 +32,13 @@ export default function Home(){
 	const [busy, setBusy] = useState(false)
 	const [results, setResults] = useState(null)
 	const [toasts, setToasts] = useState([])
+	const [exportFormat, setExportFormat] = useState('CSV')
 	const fileInputRef = useRef(null)
+	// Last uploaded file, re-sent when another Excel sheet or header row is chosen
+	const lastFile = useRef(null)
+	const [sheetChoice, setSheetChoice] = useState({ sheet: '', header_row: 0 })
+	// Last report per dataset and format with its ETag, reused when /report answers 304
+	const reportCache = useRef({})
 
 	const numericColumns = useMemo(() => {
 		if (!summary) return []
@@ -31,21 +53,27 @@ export default function Home(){
 
 	const handleDrop = useCallback(async (evt) => {
 		evt.preventDefault()
-		const file = evt.dataTransfer?.files?.[0]
-		if (!file) return
-		await uploadFile(file)
+		const files = evt.dataTransfer?.files
+		if (!files?.length) return
+		await uploadFiles(files)
 	}, [])
 
-	const uploadFile = useCallback(async (file) => {
+	const uploadFile = useCallback(async (file, options = {}) => {
 		const form = new FormData()
 		form.append('file', file)
+		Object.entries(options).forEach(([key, value]) => form.append(key, value))
+		lastFile.current = file
 		setBusy(true)
 		try {
 			const res = await fetch(`${API_BASE_URL}/upload`, { method: 'POST', body: form, credentials:'include' })
 			const text = await res.text()
 			const data = (() => { try { return JSON.parse(text) } catch { return { success: false, error: text } } })()
-			if (!res.ok || !data.success) throw new Error(data.error || `HTTP ${res.status}`)
+			if (!res.ok || !data.success) throw new Error([data.error, errorDetails(data.details)].filter(Boolean).join(': ') || `HTTP ${res.status}`)
 			setSummary(data.summary)
+			if (data.summary.sheets) {
+				const sheet = data.summary.sheets[data.summary.sheet] ?? data.summary.sheet
+				setSheetChoice({ sheet, header_row: options.header_row ?? 0 })
+			}
 			setDatasetId(data.dataset_id || null)
 			notify('success', 'File uploaded successfully')
 		} catch (e) {
@@ -55,6 +83,45 @@ export default function Home(){
 		}
 	}, [notify])
 
+	// Several files, or a ZIP of district files, are combined into one dataset by /upload_batch
+	const uploadFiles = useCallback(async (fileList) => {
+		const files = Array.from(fileList)
+		if (files.length === 1 && !/\.zip$/i.test(files[0].name)) return uploadFile(files[0])
+		const form = new FormData()
+		files.forEach((file) => form.append('files', file))
+		lastFile.current = null
+		setBusy(true)
+		try {
+			const res = await fetch(`${API_BASE_URL}/upload_batch`, { method: 'POST', body: form, credentials:'include' })
+			const text = await res.text()
+			const data = (() => { try { return JSON.parse(text) } catch { return { success: false, error: text } } })()
+			if (!res.ok || !data.success) throw new Error([data.error, errorDetails(data.details)].filter(Boolean).join(': ') || `HTTP ${res.status}`)
+			setSummary(data.summary)
+			setDatasetId(data.dataset_id || null)
+			notify('success', `Combined ${data.summary.files.length} files`)
+		} catch (e) {
+			notify('error', `Upload failed: ${e.message}`)
+		} finally {
+			setBusy(false)
+		}
+	}, [notify, uploadFile])
+
+	const waitForJob = useCallback(async (jobId) => {
+		for (;;) {
+			const res = await fetch(`${API_BASE_URL}/jobs/${jobId}`, { credentials:'include' })
+			const job = await res.json()
+			if (!res.ok) throw new Error(job.error || `HTTP ${res.status}`)
+			if (job.status === 'failed') throw new Error(job.error || 'Job failed')
+			if (job.status === 'succeeded') {
+				const out = await fetch(`${API_BASE_URL}${job.result_url}`, { credentials:'include' })
+				const data = await out.json()
+				if (!out.ok || data.error) throw new Error(data.error || `HTTP ${out.status}`)
+				return data
+			}
+			await new Promise((resolve) => setTimeout(resolve, 1000))
+		}
+	}, [])
+
 	const startProcessing = useCallback(async () => {
 		setBusy(true)
 		setResults(null)
@@ -67,10 +134,12 @@ export default function Home(){
 			}
 		}
 		if (datasetId) payload.dataset_id = datasetId
+		payload.async = true
 		try {
 			const res = await fetch(`${API_BASE_URL}/clean`, { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(payload), credentials:'include' })
-			const data = await res.json()
+			let data = await res.json()
 			if (!res.ok || data.error) throw new Error(data.error || `HTTP ${res.status}`)
+			if (data.job_id) data = await waitForJob(data.job_id)
 			setResults(data)
 			notify('success', 'Processing completed')
 		} catch (e) {
@@ -78,24 +147,37 @@ export default function Home(){
 		} finally {
 			setBusy(false)
 		}
-	}, [config, datasetId, notify])
+	}, [config, datasetId, notify, waitForJob])
 
 	const generateReport = useCallback(async (format) => {
 		try {
-			const res = await fetch(`${API_BASE_URL}/report`, { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify({ format }), credentials:'include' })
+			const cacheKey = `${datasetId}:${format}`
+			const cached = reportCache.current[cacheKey]
+			const headers = { 'Content-Type': 'application/json' }
+			if (cached) headers['If-None-Match'] = cached.etag
+			const res = await fetch(`${API_BASE_URL}/report`, { method: 'POST', headers, body: JSON.stringify(datasetId ? { format, dataset_id: datasetId, include_plots: true } : { format, include_plots: true }), credentials:'include' })
+			const notModified = res.status === 304 && cached
+			const remember = (content) => {
+				const etag = res.headers.get('etag')
+				if (etag) reportCache.current[cacheKey] = { etag, content }
+			}
 			if (format === 'pdf') {
-				if (!res.ok || !(res.headers.get('content-type') || '').includes('application/pdf')) {
+				if (!notModified && (!res.ok || !(res.headers.get('content-type') || '').includes('application/pdf'))) {
 					const text = await res.text(); throw new Error(text || `HTTP ${res.status}`)
 				}
-				const blob = await res.blob()
+				const blob = notModified ? cached.content : await res.blob()
+				if (!notModified) remember(blob)
 				const url = URL.createObjectURL(blob)
 				const a = document.createElement('a')
 				a.href = url
 				a.download = `survey_report_${new Date().toISOString().slice(0,19).replace(/:/g,'-')}.pdf`
 				a.click()
 			} else {
-				const data = await res.json()
-				if (!res.ok || data.error) throw new Error(data.error || `HTTP ${res.status}`)
+				const data = notModified ? cached.content : await res.json()
+				if (!notModified) {
+					if (!res.ok || data.error) throw new Error(data.error || `HTTP ${res.status}`)
+					remember(data)
+				}
 				const w = window.open()
 				w.document.write(data.html_content)
 				w.document.close()
@@ -103,22 +185,26 @@ export default function Home(){
 		} catch (e) {
 			notify('error', `Report failed: ${e.message}`)
 		}
-	}, [notify])
+	}, [datasetId, notify])
 
 	const downloadData = useCallback(async () => {
 		try {
-			const res = await fetch(`${API_BASE_URL}/download_data`, { method: 'POST', credentials:'include' })
-			if (!res.ok) throw new Error(`HTTP ${res.status}`)
+			const { params, extension } = EXPORT_FORMATS[exportFormat]
+			const res = await fetch(`${API_BASE_URL}/download_data`, { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(datasetId ? { ...params, dataset_id: datasetId } : params), credentials:'include' })
+			if (!res.ok) {
+				const data = await res.json().catch(() => ({}))
+				throw new Error(data.error || `HTTP ${res.status}`)
+			}
 			const blob = await res.blob()
 			const url = URL.createObjectURL(blob)
 			const a = document.createElement('a')
 			a.href = url
-			a.download = `processed_data_${new Date().toISOString().slice(0,19).replace(/:/g,'-')}.csv`
+			a.download = `processed_data_${new Date().toISOString().slice(0,19).replace(/:/g,'-')}.${extension}`
 			a.click()
 		} catch (e) {
 			notify('error', `Download failed: ${e.message}`)
 		}
-	}, [notify])
+	}, [datasetId, exportFormat, notify])
 
 	return (
 		<div className="container-fluid">
@@ -159,8 +245,8 @@ export default function Home(){
 					>
 						<i className="fas fa-cloud-upload-alt feature-icon" style={{fontSize:'2rem', color:'#3498db'}}></i>
 						<h4>Drag & Drop your survey data file here</h4>
-						<p className="text-muted">Supports CSV, Excel (.xlsx, .xls) files up to 16MB</p>
-						<input ref={fileInputRef} type="file" accept=".csv,.xlsx,.xls" style={{display:'none'}} onChange={(e)=>{ const f=e.target.files?.[0]; if(f) uploadFile(f) }} />
+						<p className="text-muted">Supports CSV, Excel (.xlsx, .xls) files up to 16MB; choose several files or a ZIP to combine district files</p>
+						<input ref={fileInputRef} type="file" multiple accept=".csv,.xlsx,.xls,.zip" style={{display:'none'}} onChange={(e)=>{ const files=e.target.files; if(files?.length) uploadFiles(files) }} />
 						<button className="btn btn-primary" disabled={busy}>
 							<i className="fas fa-folder-open"></i> Choose File
 						</button>
@@ -200,6 +286,31 @@ export default function Home(){
 								</div>
 							</div>
 						</div>
+						{summary.files && (
+							<p className="text-muted mt-2 mb-0">Combined from {summary.files.length} files: {summary.files.map((f)=>`${f.name} (${f.rows.toLocaleString()})`).join(', ')}</p>
+						)}
+						{summary.sheets && (
+							<div className="d-flex align-items-end gap-2 mt-3">
+								<div>
+									<label className="form-label mb-1">Sheet</label>
+									<select className="form-select" value={sheetChoice.sheet} onChange={(e)=>setSheetChoice((c)=>({ ...c, sheet: e.target.value }))}>
+										{summary.sheets.map((name)=>(<option key={name} value={name}>{name}</option>))}
+									</select>
+								</div>
+								<div>
+									<label className="form-label mb-1">Header row (0 = first)</label>
+									<input type="number" min="0" className="form-control" value={sheetChoice.header_row} onChange={(e)=>setSheetChoice((c)=>({ ...c, header_row: e.target.value }))} />
+								</div>
+								<button className="btn btn-outline-primary" disabled={busy || !lastFile.current} onClick={()=>uploadFile(lastFile.current, sheetChoice)}>Reload sheet</button>
+							</div>
+						)}
+						{Object.keys(summary.plots || {}).length > 0 && (
+							<div className="row mt-3">
+								{Object.entries(summary.plots).map(([name, plot]) => (
+									<div key={name} className="col-md-6 mb-3"><PlotView plot={plot} /></div>
+								))}
+							</div>
+						)}
 					</div>
 				)}
 
@@ -248,6 +359,7 @@ export default function Home(){
 										<option value="iqr">Interquartile Range (IQR)</option>
 										<option value="zscore">Z-Score</option>
 										<option value="isolation_forest">Isolation Forest</option>
+										<option value="isolation_forest_multivariate">Isolation Forest (all columns)</option>
 									</select>
 								</div>
 								<div className="col-md-4">
@@ -361,8 +473,8 @@ export default function Home(){
 							<h5><i className="fas fa-chart-bar"></i> Data Visualizations</h5>
 							{Object.keys(results.plots || {}).length > 0 ? (
 								<div>
-									{Object.entries(results.plots).map(([name, html]) => (
-										<div key={name} className="mb-4" dangerouslySetInnerHTML={{ __html: html }} />
+									{Object.entries(results.plots).map(([name, plot]) => (
+										<div key={name} className="mb-4"><PlotView plot={plot} /></div>
 									))}
 								</div>
 							) : (<p className="text-muted">No visualizations available</p>)}
@@ -372,6 +484,9 @@ export default function Home(){
 						<div className="text-center mt-4">
 							<button className="btn btn-primary me-3" onClick={()=>generateReport('pdf')}><i className="fas fa-file-pdf"></i> Download PDF Report</button>
 							<button className="btn btn-primary me-3" onClick={()=>generateReport('html')}><i className="fas fa-file-code"></i> Generate HTML Report</button>
+							<select className="form-select d-inline-block w-auto me-2" value={exportFormat} onChange={(e)=>setExportFormat(e.target.value)}>
+								{Object.keys(EXPORT_FORMATS).map((label)=>(<option key={label} value={label}>{label}</option>))}
+							</select>
 							<button className="btn btn-primary" onClick={downloadData}><i className="fas fa-download"></i> Download Processed Data</button>
 						</div>
 					</div>